@@ -1,17 +1,33 @@
 import streamlit as st
 import pandas as pd
-import io
-import plotly.express as px
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Callable, Optional
+from datetime import datetime
 
 # Imports dos serviços
 from services.api_client import get_wms_client
-from services.data_processor import process_agendamentos_data, create_agendamentos_summary, filter_agendamentos
+from services.data_processor import process_agendamentos_data
+from services.sync import get_agendamentos_sync
+from services.cache import get_agendamentos_cache
+from services.snapshot import load_snapshot, save_snapshot
+from services.filter_engine import filter_cache_key, filter_dataframe, get_filter_index
+from services.summary_cube import SummaryCube, get_summary_cube
+from services.view_cache import cached_view
 
 # Imports dos módulos core
-from src.core.utils import get_base64_image
-from src.core.config import PAGE_TITLE, PAGE_ICON
+from src.core.utils import get_image_url
+from src.core.timing import start_run, timed
+from src.core.config import PAGE_TITLE, PAGE_ICON, BACKGROUND_IMAGE_PATH, SERVE_STATIC_ASSETS, MSG_LOADING, MSG_NO_DATA, PROGRESSIVE_POLL_SECONDS, SHOW_TIMING_PANEL, TIMING_PANEL_QUERY_PARAM
+
+# Imports dos componentes de UI
+from src.ui.components import (
+    render_export_buttons,
+    render_paginated_table,
+    render_pie_chart,
+    render_bar_chart,
+    render_line_chart,
+    render_app_styles,
+    render_timing_panel,
+)
 
 # Configuração da página
 st.set_page_config(
@@ -20,103 +36,284 @@ st.set_page_config(
     layout="wide"
 )
 
-# Carrega a imagem de fundo
-background_image = get_base64_image("assets/background.png")
+# Estilo CSS personalizado (imagem de fundo como data URI ou arquivo estático)
+render_app_styles(get_image_url(
+    BACKGROUND_IMAGE_PATH,
+    serve_static=SERVE_STATIC_ASSETS and st.get_option("server.enableStaticServing")
+))
 
-# Estilo CSS personalizado
-st.markdown(f"""
-    <style>
-        /* Imagem de fundo */
-        .stApp {{
-            background-image: url("data:image/png;base64,{background_image}");
-            background-size: cover;
-            background-position: center;
-            background-repeat: no-repeat;
-            background-attachment: fixed;
-        }}
-        
-        /* Sidebar com fundo branco */
-        section[data-testid="stSidebar"] {{
-            background-color: white;
-        }}
-        
-        /* Container principal - UM ÚNICO BLOCO BRANCO */
-        .block-container {{
-            background-color: white;
-            padding: 2rem;
-            margin: 2rem auto;
-            border-radius: 15px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-            max-width: 98%;
-        }}
-        
-        /* Remove padding extra */
-        .main {{
-            padding: 0;
-        }}
-        
-        /* Centraliza o título */
-        h1 {{
-            text-align: center;
-        }}
-        
-        /* Ajusta tamanho dos títulos e valores das métricas */
-        div[data-testid="stMetric"] label {{
-            font-size: 1.2rem !important;
-            font-weight: 600 !important;
-        }}
-        
-        div[data-testid="stMetric"] div[data-testid="stMetricValue"] {{
-            font-size: 2rem !important;
-        }}
-        
-        /* Botões */
-        div.stButton > button {{
-            width: 100%;
-        }}
-    </style>
-""", unsafe_allow_html=True)
+# Chave do cache para a carga completa (sem diconsulta)
+CACHE_KEY_TODOS = "todos"
+
+def _carregar_via_sync():
+    """
+    Carrega (ou atualiza incrementalmente) o histórico completo
+    """
+    sync = get_agendamentos_sync()
+    sync.incremental_sync()
+    # Persiste o snapshot para o próximo cold start
+    save_snapshot(sync.df)
+    return sync.df
+
+def carregar_dados_locais():
+    """
+    Retorna os últimos dados conhecidos sem chamar a API
+    
+    Usa o estado de sincronização compartilhado ou, após um restart do
+    servidor, restaura o snapshot local em disco.
+    """
+    sync = get_agendamentos_sync()
+    if not sync.has_data:
+        snapshot = load_snapshot()
+        if snapshot is not None:
+            df_snapshot, meta = snapshot
+            sync.restore(df_snapshot, meta['written_at'])
+    return sync.df if sync.has_data and not sync.df.empty else None
 
-def carregar_agendamentos():
+def carregar_agendamentos(
+    data_consulta: Optional[str] = None,
+    loader: Optional[Callable[[], pd.DataFrame]] = None,
+    falha: Optional[Exception] = None
+):
     """
-    Carrega todos os agendamentos disponíveis da API WMS
+    Carrega os agendamentos da API WMS usando o cache compartilhado
+    
+    Se a API falhar, exibe o último conjunto de dados válido (com aviso).
+    
+    Args:
+        data_consulta: Período "dd.mm.aaaa - dd.mm.aaaa" (None para todos)
+        loader: Carga do histórico completo em cache miss (padrão: _carregar_via_sync)
+        falha: Erro já ocorrido na carga em segundo plano; vai direto para
+            os dados locais, sem nova chamada à API
     """
-    client = get_wms_client()
+    cache = get_agendamentos_cache()
+    chave = data_consulta or CACHE_KEY_TODOS
     try:
-        # Busca todos os dados da API
-        dados_brutos = client.get_agendamentos(todos=True)
-        if not dados_brutos:
-            return pd.DataFrame()
+        if falha is not None:
+            raise falha
+        if not data_consulta:
+            df = cache.get_or_load(chave, loader or _carregar_via_sync)
+        else:
+            df = cache.get_or_load(
+                chave,
+                lambda: process_agendamentos_data(get_wms_client().fetch_agendamentos(data_consulta=data_consulta))
+            )
         
-        # Processa os dados
-        return process_agendamentos_data(dados_brutos)
+        # Não mantém resultados vazios no cache
+        if df.empty:
+            cache.invalidate(chave)
+        return df
     except Exception as e:
+        # API indisponível: exibe o último conjunto de dados válido, se houver
+        df_local = None if data_consulta else carregar_dados_locais()
+        if df_local is not None:
+            _avisar_dados_antigos(e)
+            return df_local
         st.error(f"❌ Erro ao carregar agendamentos: {str(e)}")
         return pd.DataFrame()
 
+def _avisar_dados_antigos(erro: Exception):
+    """Avisa que a API falhou e os dados exibidos são da última sincronização"""
+    ultima_sync = get_agendamentos_sync().last_sync
+    st.warning(
+        f"⚠️ API WMS indisponível ({erro}). "
+        f"Exibindo os dados de {ultima_sync.strftime('%d/%m/%Y %H:%M')}."
+    )
+
+def atualizar_agendamentos(progress_callback=None):
+    """
+    Invalida o cache e atualiza buscando apenas a janela recente (dtalteracao)
+    
+    Returns:
+        Tupla (DataFrame, resumo com novos/atualizados); resumo é None se a
+        API falhou e os dados exibidos são os da última sincronização
+    """
+    resumo = {}
+    
+    def _atualizar():
+        sync = get_agendamentos_sync()
+        resumo.update(sync.incremental_sync(progress_callback=progress_callback))
+        save_snapshot(sync.df)
+        return sync.df
+    
+    get_agendamentos_cache().invalidate(CACHE_KEY_TODOS)
+    df = carregar_agendamentos(loader=_atualizar)
+    return df, (resumo or None)
+
+def acompanhar_carga_inicial():
+    """
+    Acompanha a carga inicial feita em segundo plano
+    
+    Enquanto a API é consultada, exibe o aviso de carregamento e verifica o
+    término periodicamente (sem bloquear o restante da página). Ao terminar,
+    troca os dados da sessão pelos da API ou registra a falha.
+    """
+    cache = get_agendamentos_cache()
+    if cache.is_refreshing(CACHE_KEY_TODOS):
+        if st.session_state['df_origem'] == 'local':
+            ultima_sync = get_agendamentos_sync().last_sync
+            st.caption(
+                f"🕒 Exibindo dados salvos em {ultima_sync.strftime('%d/%m/%Y %H:%M')}; "
+                "atualizando pela API em segundo plano..."
+            )
+        else:
+            st.info(f"⏳ {MSG_LOADING}")
+        _aguardar_carga_inicial()
+        return
+    
+    # Dados do cache compartilhado (ou, se a carga falhou, os últimos válidos)
+    erro = cache.last_error(CACHE_KEY_TODOS)
+    st.session_state['df_original'] = carregar_agendamentos(falha=erro)
+    if erro is not None:
+        # O aviso continua nas próximas execuções até uma atualização bem-sucedida
+        st.session_state['df_origem'] = 'erro'
+        st.session_state['erro_carga'] = erro
+    else:
+        st.session_state['df_origem'] = 'api'
+
+# Verifica periodicamente o término da carga inicial e recarrega a página
+@st.fragment(run_every=PROGRESSIVE_POLL_SECONDS)
+def _aguardar_carga_inicial():
+    if not get_agendamentos_cache().is_refreshing(CACHE_KEY_TODOS):
+        st.rerun()
+
+def _avisar_falha_carga(erro: Exception):
+    """Exibe a falha da carga inicial (com ou sem dados locais)"""
+    if not st.session_state['df_original'].empty:
+        _avisar_dados_antigos(erro)
+    else:
+        st.error(f"❌ Erro ao carregar agendamentos: {str(erro)}")
+
+def render_graficos(df_original: pd.DataFrame, df_filtrado: pd.DataFrame, filtros: dict, chave_filtro: tuple):
+    """
+    Renderiza a aba de gráficos (resumo e figuras memoizadas por dataset + filtros)
+    
+    Args:
+        df_original: DataFrame completo
+        df_filtrado: DataFrame com os filtros aplicados
+        filtros: Valores dos filtros (ver filter_dataframe)
+        chave_filtro: Chave do resultado do filtro (ver filter_cache_key)
+    """
+    # Resumo e gráficos vêm do cubo pré-agregado do dataset. A busca por
+    # transportadora não é dimensão do cubo: nesse caso agrega só as
+    # linhas filtradas (uma única passada, reaproveitada entre reruns)
+    filtros_cubo = dict(
+        data_inicio=filtros['data_inicio'],
+        data_fim=filtros['data_fim'],
+        status=filtros['status'],
+        deposito=filtros['deposito']
+    )
+    with timed("resumo"):
+        if filtros['transportadora']:
+            cubo = cached_view(chave_filtro, 'cubo', lambda: SummaryCube(df_filtrado))
+        else:
+            cubo = get_summary_cube(df_original)
+        
+        # Métricas principais (uso defensivo .get() para evitar KeyError)
+        resumo = cubo.summary(**filtros_cubo)
+    
+    st.subheader("📈 Visão Geral")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("**Total de Pedidos**")
+        st.markdown(f"### {resumo.get('total_pedidos', 0)}")
+    with col2:
+        st.markdown("**Pedidos por Status**")
+        status_counts = resumo.get('status_counts', {})
+        if status_counts:
+            for status, qtd in status_counts.items():
+                st.write(f"**{status}:** {qtd}")
+        else:
+            st.write("N/A")
+    with col3:
+        st.markdown("**Último Agendamento**")
+        data_recente = resumo.get('data_recente')
+        if data_recente and pd.notna(data_recente):
+            st.markdown(f"### {data_recente.strftime('%d/%m/%Y')}")
+        else:
+            st.markdown("### N/A")
+    
+    st.markdown("---")
+    
+    # Gráficos
+    col_graf1, col_graf2 = st.columns(2)
+    
+    with col_graf1:
+        st.subheader("📊 Distribuição por Status")
+        if status_counts:
+            # Gráfico de pizza para status
+            render_pie_chart(status_counts, "Status dos Pedidos", cache_key=chave_filtro)
+    
+    with col_graf2:
+        st.subheader("📦 Pedidos por Depósito")
+        if 'Depósito' in df_filtrado.columns:
+            deposito_counts = cubo.deposito_counts(**filtros_cubo)
+            render_bar_chart(
+                deposito_counts.index,
+                deposito_counts.values,
+                "Quantidade por Depósito",
+                x_label='Depósito',
+                y_label='Quantidade',
+                cache_key=chave_filtro
+            )
+    
+    # Segunda linha de gráficos
+    col_graf3, col_graf4 = st.columns(2)
+    
+    with col_graf3:
+        st.subheader("📅 Pedidos ao Longo do Tempo")
+        if 'Data Agendamento' in df_filtrado.columns:
+            # Série diária do cubo agrupada por dia/semana/mês conforme o período
+            serie, granularidade = cubo.timeseries_counts(**filtros_cubo)
+            pedidos_por_periodo = pd.DataFrame({
+                'Data': serie.index.date,
+                'Quantidade': serie.to_numpy()
+            })
+            titulo = "Evolução de Pedidos" if granularidade == 'dia' else f"Evolução de Pedidos (por {granularidade.replace('mes', 'mês')})"
+            render_line_chart(pedidos_por_periodo, 'Data', 'Quantidade', titulo, cache_key=chave_filtro)
+    
+    with col_graf4:
+        st.subheader("📦 Top 5 Materiais")
+        if 'Descrição do Material' in df_filtrado.columns:
+            # O cubo já ignora descrições nulas e vazias
+            material_counts = cubo.top_materials(5, **filtros_cubo)
+            if not material_counts.empty:
+                render_bar_chart(
+                    material_counts.values,
+                    material_counts.index,
+                    "Top 5 Materiais Mais Agendados",
+                    x_label='Quantidade',
+                    y_label='Material',
+                    orientation='h',
+                    cache_key=chave_filtro
+                )
+            else:
+                st.info("Nenhum material com descrição disponível")
+
 def main():
     # Cabeçalho
     st.title("🚚 WMS SIGMA - Agendamentos de Materiais")
     
-    # Carrega dados automaticamente na primeira vez
+    cache = get_agendamentos_cache()
+    
+    # Primeira carga sem bloquear a página: exibe o que já existe (cache
+    # compartilhado ou snapshot local) e busca a API em segundo plano
     if 'df_original' not in st.session_state:
-        # Cria um placeholder para as mensagens
-        message_placeholder = st.empty()
-        with message_placeholder.container():
-            with st.spinner("Carregando dados da API..."):
-                df_all = carregar_agendamentos()
-                if df_all is not None and not df_all.empty:
-                    # Garantir tipagem correta de data
-                    if 'Data Agendamento' in df_all.columns:
-                        df_all['Data Agendamento'] = pd.to_datetime(df_all['Data Agendamento'], errors='coerce')
-                    st.session_state['df_original'] = df_all
-                else:
-                    st.session_state['df_original'] = pd.DataFrame()
-        
-        # Aguarda 3 segundos e limpa as mensagens
-        import time
-        time.sleep(3)
-        message_placeholder.empty()
+        if cache.contains(CACHE_KEY_TODOS):
+            st.session_state['df_original'] = carregar_agendamentos()
+            st.session_state['df_origem'] = 'api'
+        else:
+            df_local = carregar_dados_locais()
+            st.session_state['df_original'] = df_local if df_local is not None else pd.DataFrame()
+            st.session_state['df_origem'] = 'local' if df_local is not None else 'carregando'
+            cache.refresh_in_background(CACHE_KEY_TODOS, _carregar_via_sync)
+    
+    if st.session_state.get('df_origem') in ('local', 'carregando'):
+        acompanhar_carga_inicial()
+    elif st.session_state.get('df_origem') == 'erro' and not st.session_state.get('atualizar_dados'):
+        # Ao clicar em "Atualizar Dados" o resultado da nova tentativa é exibido no lugar
+        _avisar_falha_carga(st.session_state['erro_carga'])
     
     # Sidebar com filtros
     with st.sidebar:
@@ -137,9 +334,9 @@ def main():
         # Remove o subheader "Filtros Adicionais"
         # Opções de filtros mantidas sem o texto
         if 'df_original' in st.session_state and not st.session_state['df_original'].empty:
-            df_orig = st.session_state['df_original']
-            status_options = ["Todos"] + sorted(df_orig['Status da Entrega'].dropna().unique().tolist()) if 'Status da Entrega' in df_orig.columns else ["Todos"]
-            galpao_options = ["Todos"] + sorted(df_orig['Depósito'].dropna().unique().tolist()) if 'Depósito' in df_orig.columns else ["Todos"]
+            filter_index = get_filter_index(st.session_state['df_original'])
+            status_options = ["Todos"] + filter_index.status_values()
+            galpao_options = ["Todos"] + filter_index.deposito_values()
         else:
             status_options = ["Todos"] + ["AGENDADO", "CONFIRMADO", "CANCELADO", "FINALIZADO"]
             galpao_options = ["Todos"]
@@ -159,202 +356,101 @@ def main():
             placeholder="Digite para filtrar..."
         )
 
-        # Botão para atualizar dados manualmente (puxa TODOS os registros da API)
+        # Botão para atualizar dados manualmente (sincronização incremental por dtalteracao)
         st.markdown("---")
-        if st.button("🔄 Atualizar Dados", width="stretch"):
-            with st.spinner("Buscando todos os agendamentos disponíveis..."):
-                df_all = carregar_agendamentos()
+        if st.button("🔄 Atualizar Dados", key="atualizar_dados", width="stretch"):
+            with st.spinner("Buscando agendamentos alterados..."):
+                progresso = st.progress(0.0)
+                df_all, resumo = atualizar_agendamentos(
+                    lambda concluidas, total, periodo: progresso.progress(
+                        concluidas / total, text=f"Janela {concluidas}/{total}: {periodo}"
+                    )
+                )
+                progresso.empty()
                 if df_all is None or df_all.empty:
                     st.warning("⚠️ Nenhum dado encontrado na API")
                 else:
-                    # Garantir tipagem correta de data
-                    if 'Data Agendamento' in df_all.columns:
-                        df_all['Data Agendamento'] = pd.to_datetime(df_all['Data Agendamento'], errors='coerce')
                     st.session_state['df_original'] = df_all
-                    st.success(f"✅ {len(df_all)} registros carregados!")
+                    if resumo is not None:
+                        st.session_state['df_origem'] = 'api'
+                        st.success(
+                            f"✅ {len(df_all)} registros carregados "
+                            f"({resumo['novos']} novos, {resumo['atualizados']} atualizados)"
+                        )
+        
+        cache_stats = get_agendamentos_cache().stats()
+        st.caption(f"Cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses")
+        # Cliente em uso pela sincronização (síncrono ou assíncrono, ver USE_ASYNC_CLIENT)
+        api_stats = get_agendamentos_sync().client.resilience.stats()
+        if api_stats['retries'] or api_stats['breaker_trips']:
+            st.caption(
+                f"API: {api_stats['retries']} retries · {api_stats['reauths']} reautenticações · "
+                f"{api_stats['breaker_trips']} aberturas do circuito ({api_stats['breaker_state']})"
+            )
     
     # Conteúdo principal
     # Verifica se já carregamos os dados
     if 'df_original' not in st.session_state or st.session_state['df_original'].empty:
-        st.warning("⚠️ Nenhum dado disponível. Tente atualizar usando o botão na barra lateral.")
+        # Na primeira carga o aviso de carregamento já está na tela
+        if st.session_state.get('df_origem') != 'carregando':
+            st.warning(MSG_NO_DATA)
         return
 
     # DataFrame completo em memória
     df_original = st.session_state['df_original']
 
-    # Garante que coluna de data está no formato datetime (usando nome renomeado)
-    if 'Data Agendamento' in df_original.columns and not pd.api.types.is_datetime64_any_dtype(df_original['Data Agendamento']):
-        df_original['Data Agendamento'] = pd.to_datetime(df_original['Data Agendamento'], errors='coerce')
-
-    # Aplica filtros no DataFrame em memória
-    df_filtrado = df_original.copy()
-
-    # Filtro de período (usa apenas data)
-    if 'Data Agendamento' in df_filtrado.columns:
-        mask = (
-            (df_filtrado['Data Agendamento'].dt.date >= data_inicio) &
-            (df_filtrado['Data Agendamento'].dt.date <= data_fim)
-        )
-        df_filtrado = df_filtrado[mask]
-
-    # Filtro de status
-    if filtro_status and filtro_status != "Todos" and 'Status da Entrega' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['Status da Entrega'] == filtro_status]
-
-    # Filtro de galpão
-    if filtro_galpao and filtro_galpao != "Todos" and 'Depósito' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['Depósito'] == filtro_galpao]
-
-    # Filtro de transportadora (texto)
-    if filtro_transportadora:
-        if 'Transportadora' in df_filtrado.columns:
-            df_filtrado = df_filtrado[
-                df_filtrado['Transportadora'].str.contains(filtro_transportadora, case=False, na=False)
-            ]
+    # Aplica filtros usando o índice do dataset (sem varrer/copiar o DataFrame)
+    filtros = {
+        'data_inicio': data_inicio,
+        'data_fim': data_fim,
+        'status': filtro_status if filtro_status and filtro_status != "Todos" else None,
+        'deposito': filtro_galpao if filtro_galpao and filtro_galpao != "Todos" else None,
+        'transportadora': filtro_transportadora or None
+    }
+    with timed("filtro"):
+        df_filtrado = filter_dataframe(df_original, **filtros)
+        # Identifica o resultado do filtro (cache de exportações)
+        chave_filtro = filter_cache_key(df_original, **filtros)
 
     # Se não houver registros após filtros, avisar e terminar
     if df_filtrado is None or df_filtrado.empty:
         st.warning("⚠️ Nenhum registro encontrado com os filtros aplicados")
         return
 
-    # Adiciona os botões de exportação na sidebar (para o DataFrame filtrado)
+    # Adiciona os botões de exportação na sidebar (arquivos gerados só no clique)
     with st.sidebar:
-        st.markdown("---")
-        st.subheader("📥 Exportar")
-        csv_bytes = df_filtrado.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            "📥 Download CSV",
-            csv_bytes,
-            "agendamentos.csv",
-            "text/csv",
-            width="stretch"
-        )
-
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df_filtrado.to_excel(writer, index=False, sheet_name='Agendamentos')
-
-        st.download_button(
-            "📥 Download Excel",
-            buffer.getvalue(),
-            "agendamentos.xlsx",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            width="stretch"
-        )
+        render_export_buttons(df_filtrado, "agendamentos", cache_key=chave_filtro, sheet_name="Agendamentos")
 
     # Tabs: Gráficos e Dados
-    tab_graficos, tab_dados = st.tabs(["📊 Gráficos", "📋 Dados"])
+    # Abas com rerun na troca: só o conteúdo da aba aberta é construído
+    tab_graficos, tab_dados = st.tabs(["📊 Gráficos", "📋 Dados"], key="aba_principal", on_change="rerun")
 
-    with tab_graficos:
-        # Métricas principais (uso defensivo .get() para evitar KeyError)
-        resumo = create_agendamentos_summary(df_filtrado)
-        
-        st.subheader("📈 Visão Geral")
-        col1, col2, col3 = st.columns(3)
+    if tab_graficos.open:
+        with tab_graficos:
+            render_graficos(df_original, df_filtrado, filtros, chave_filtro)
 
-        with col1:
-            st.markdown("**Total de Pedidos**")
-            st.markdown(f"### {resumo.get('total_pedidos', 0)}")
-        with col2:
-            st.markdown("**Pedidos por Status**")
-            status_counts = resumo.get('status_counts', {})
-            if status_counts:
-                for status, qtd in status_counts.items():
-                    st.write(f"**{status}:** {qtd}")
-            else:
-                st.write("N/A")
-        with col3:
-            st.markdown("**Último Agendamento**")
-            data_recente = resumo.get('data_recente')
-            if data_recente and pd.notna(data_recente):
-                st.markdown(f"### {data_recente.strftime('%d/%m/%Y')}")
-            else:
-                st.markdown("### N/A")
-        
-        st.markdown("---")
-        
-        # Gráficos
-        col_graf1, col_graf2 = st.columns(2)
-        
-        with col_graf1:
-            st.subheader("📊 Distribuição por Status")
-            if status_counts:
-                # Gráfico de pizza para status
-                import plotly.express as px
-                fig_status = px.pie(
-                    names=list(status_counts.keys()),
-                    values=list(status_counts.values()),
-                    title="Status dos Pedidos"
-                )
-                st.plotly_chart(fig_status, width="stretch")
-        
-        with col_graf2:
-            st.subheader("📦 Pedidos por Depósito")
-            if 'Depósito' in df_filtrado.columns:
-                deposito_counts = df_filtrado['Depósito'].value_counts()
-                fig_deposito = px.bar(
-                    x=deposito_counts.index,
-                    y=deposito_counts.values,
-                    title="Quantidade por Depósito",
-                    labels={'x': 'Depósito', 'y': 'Quantidade'}
-                )
-                st.plotly_chart(fig_deposito, width="stretch")
-        
-        # Segunda linha de gráficos
-        col_graf3, col_graf4 = st.columns(2)
-        
-        with col_graf3:
-            st.subheader("📅 Pedidos ao Longo do Tempo")
-            if 'Data Agendamento' in df_filtrado.columns:
-                df_temp = df_filtrado.copy()
-                df_temp['Data'] = pd.to_datetime(df_temp['Data Agendamento']).dt.date
-                pedidos_por_dia = df_temp.groupby('Data').size().reset_index(name='Quantidade')
-                fig_tempo = px.line(
-                    pedidos_por_dia,
-                    x='Data',
-                    y='Quantidade',
-                    title="Evolução de Pedidos"
-                )
-                st.plotly_chart(fig_tempo, width="stretch")
-        
-        with col_graf4:
-            st.subheader("📦 Top 5 Materiais")
-            if 'Descrição do Material' in df_filtrado.columns:
-                # Filtra valores nulos e vazios antes de contar
-                df_material = df_filtrado[
-                    df_filtrado['Descrição do Material'].notna() & 
-                    (df_filtrado['Descrição do Material'] != '') &
-                    (df_filtrado['Descrição do Material'] != 'None')
-                ]
-                if not df_material.empty:
-                    material_counts = df_material['Descrição do Material'].value_counts().head(5)
-                    fig_material = px.bar(
-                        x=material_counts.values,
-                        y=material_counts.index,
-                        orientation='h',
-                        title="Top 5 Materiais Mais Agendados",
-                        labels={'x': 'Quantidade', 'y': 'Material'}
-                    )
-                    st.plotly_chart(fig_material, width="stretch")
-                else:
-                    st.info("Nenhum material com descrição disponível")
-
-    with tab_dados:
-        # Exibe o DataFrame filtrado atual
-        st.subheader("Resultados")
-        st.dataframe(
-            df_filtrado,
-            width="stretch",
-            column_config={
-                "Data Agendamento": st.column_config.DatetimeColumn("Data Agendamento"),
-                "Status da Entrega": st.column_config.TextColumn("Status da Entrega"),
-                "Depósito": st.column_config.TextColumn("Depósito"),
-                "Transportadora": st.column_config.TextColumn("Transportadora"),
-                "Peso (kg)": st.column_config.NumberColumn("Peso (kg)", format="%.2f"),
-                "Quantidade de Volume": st.column_config.NumberColumn("Quantidade de Volume")
-            }
-        )
+    if tab_dados.open:
+        with tab_dados:
+            # Exibe o DataFrame filtrado atual (somente a página atual vai ao navegador)
+            st.subheader("Resultados")
+            render_paginated_table(
+                df_filtrado,
+                key="dados",
+                cache_key=chave_filtro,
+                column_config={
+                    "Data Agendamento": st.column_config.DatetimeColumn("Data Agendamento"),
+                    "Status da Entrega": st.column_config.TextColumn("Status da Entrega"),
+                    "Depósito": st.column_config.TextColumn("Depósito"),
+                    "Transportadora": st.column_config.TextColumn("Transportadora"),
+                    "Peso (kg)": st.column_config.NumberColumn("Peso (kg)", format="%.2f"),
+                    "Quantidade de Volume": st.column_config.NumberColumn("Quantidade de Volume")
+                }
+            )
     # export buttons removed from tabs - available in sidebar
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Tempo por etapa: detalhamento desta execução do script
+    start_run()
+    main()
+    if SHOW_TIMING_PANEL or st.query_params.get(TIMING_PANEL_QUERY_PARAM) == "1":
+        render_timing_panel()
\ No newline at end of file
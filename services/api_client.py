@@ -1,8 +1,145 @@
+import time
 import requests
 import streamlit as st
 import pandas as pd
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Iterator, List, Callable, Tuple
+from datetime import datetime, date, timedelta
+from requests.adapters import HTTPAdapter
+
+from services.json_stream import iter_json_array, iter_lotes
+from services.resilience import CircuitOpenError, ResilientCaller
+from services.token_manager import TokenManager
+from src.core.config import (
+    API_TIMEOUT,
+    FETCH_WINDOW,
+    FETCH_MAX_WORKERS,
+    FETCH_WINDOW_TIMEOUT,
+    STREAM_CHUNK_BYTES,
+    STREAM_BATCH_SIZE,
+)
+from src.core.logger import log_api_call, log_error
+from src.core.timing import timed
+
+
+class WMSAPIError(Exception):
+    """Erro retornado pela API WMS (status HTTP ou formato de resposta)"""
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        details: str = "",
+        retry_after: Optional[float] = None,
+        retryable: bool = False
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+        # Segundos indicados pelo header Retry-After (429/503)
+        self.retry_after = retry_after
+        # Erro temporário sem status HTTP (ex.: login indisponível)
+        self.retryable = retryable
+
+
+def format_periodo_consulta(data_inicio: date, data_fim: date) -> str:
+    """
+    Formata um período no padrão do campo diconsulta da API
+    
+    Args:
+        data_inicio: Data inicial do período
+        data_fim: Data final do período
+        
+    Returns:
+        String no formato "dd.mm.aaaa - dd.mm.aaaa"
+    """
+    return f"{data_inicio.strftime('%d.%m.%Y')} - {data_fim.strftime('%d.%m.%Y')}"
+
+def split_periodo(data_inicio: date, data_fim: date, janela: str = FETCH_WINDOW) -> List[Tuple[date, date]]:
+    """
+    Divide um período em janelas consecutivas (dia, semana ou mês)
+    
+    Args:
+        data_inicio: Data inicial do período
+        data_fim: Data final do período (inclusiva)
+        janela: "dia", "semana" ou "mes"
+        
+    Returns:
+        Lista de tuplas (início, fim) cobrindo o período sem sobreposição
+    """
+    if janela not in ("dia", "semana", "mes"):
+        raise ValueError(f"Janela inválida: {janela}. Use 'dia', 'semana' ou 'mes'")
+    
+    janelas = []
+    inicio = data_inicio
+    while inicio <= data_fim:
+        if janela == "dia":
+            fim = inicio
+        elif janela == "semana":
+            fim = inicio + timedelta(days=6)
+        else:
+            # Último dia do mês corrente
+            proximo_mes = (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+            fim = proximo_mes - timedelta(days=1)
+        fim = min(fim, data_fim)
+        janelas.append((inicio, fim))
+        inicio = fim + timedelta(days=1)
+    return janelas
+
+def parse_lista_payload(data: Any) -> List[Dict[str, Any]]:
+    """
+    Extrai a lista de agendamentos do JSON de /agendamento/lista
+    
+    Args:
+        data: JSON decodificado (lista ou dicionário com "agendamentos")
+        
+    Returns:
+        List[Dict[str, Any]]: Lista de agendamentos
+        
+    Raises:
+        WMSAPIError: Resposta em formato inválido
+    """
+    # Processa baseado no tipo da resposta
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        agendamentos = data.get("agendamentos", [])
+        if not isinstance(agendamentos, list):
+            raise WMSAPIError("Campo 'agendamentos' não é uma lista")
+        return agendamentos
+    raise WMSAPIError("Formato de resposta inválido")
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o header Retry-After (em segundos) para float
+    
+    Args:
+        value: Valor do header ou None
+        
+    Returns:
+        Segundos de espera ou None se ausente/inválido
+    """
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+def merge_agendamentos(lotes: List[Optional[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Mescla lotes de agendamentos deduplicando por idagendamento
+    
+    Args:
+        lotes: Listas de agendamentos, na ordem das janelas
+        
+    Returns:
+        List[Dict[str, Any]]: Agendamentos únicos (em duplicidade prevalece o último lote)
+    """
+    agendamentos: Dict[Any, Dict[str, Any]] = {}
+    for lote in lotes:
+        for item in lote or []:
+            if item:
+                agendamentos[item.get("idagendamento", id(item))] = item
+    return list(agendamentos.values())
 
 class WMSAPIClient:
     def __init__(self, base_url: Optional[str] = None, login: Optional[str] = None, password: Optional[str] = None):
@@ -10,9 +147,16 @@ class WMSAPIClient:
         self.base_url = base_url or st.secrets["api_wms"]["BASE_URL"]
         self.login = login or st.secrets["api_wms"]["LOGIN"]
         self.password = password or st.secrets["api_wms"]["PASSWORD"]
-        self.token = None
-        self.token_expiry = None
         self.session = requests.Session()
+        # Token JWT renovado em segundo plano antes de expirar
+        self.token_manager = TokenManager(self._request_token)
+        # Retries com backoff e circuit breaker nas consultas à API
+        self.resilience = ResilientCaller()
+        
+        # Pool de conexões dimensionado para as buscas concorrentes por janela
+        adapter = HTTPAdapter(pool_connections=FETCH_MAX_WORKERS, pool_maxsize=FETCH_MAX_WORKERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
         # Headers padrão
         self.session.headers.update({
@@ -22,59 +166,60 @@ class WMSAPIClient:
     
     def _is_token_valid(self) -> bool:
         """Verifica se o token ainda é válido (25 minutos)"""
-        if not self.token or not self.token_expiry:
-            return False
-        
-        # Verifica se o token expirou (25 minutos de validade)
-        return datetime.now().timestamp() < self.token_expiry
+        return self.token_manager.is_valid()
     
-    def _login(self) -> bool:
-        """Faz login e obtém token JWT"""
+    def _request_token(self) -> Optional[str]:
+        """
+        Faz o POST em /login e retorna o token JWT
+        
+        Não exibe mensagens na interface; o resultado é registrado no log.
+        
+        Returns:
+            Token JWT ou None se a autenticação falhar
+        """
+        login_url = f"{self.base_url}/login"
+        payload = {
+            "login": self.login,
+            "password": self.password
+        }
+        
+        inicio = time.perf_counter()
         try:
-            login_url = f"{self.base_url}/login"
-            payload = {
-                "login": self.login,
-                "password": self.password
-            }
-            
-            response = self.session.post(login_url, json=payload, timeout=30)
+            response = self.session.post(login_url, json=payload, timeout=API_TIMEOUT)
             response.raise_for_status()
-            
             data = response.json()
-            
-            if data.get("autenticacao") and data.get("token"):
-                self.token = data["token"]
-                # Define expiração para 25 minutos a partir de agora
-                self.token_expiry = datetime.now().timestamp() + (25 * 60)
-                
-                # Atualiza headers com o token
-                self.session.headers.update({
-                    "Authorization": self.token
-                })
-                
-                st.success("✅ Autenticado com sucesso na API WMS")
-                
-                # Limpa a mensagem após 2 segundos
-                import time
-                time.sleep(2)
-                
-                return True
-            else:
-                st.error("❌ Falha na autenticação")
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            st.error(f"❌ Erro de conexão: {e}")
-            return False
-        except Exception as e:
-            st.error(f"❌ Erro inesperado: {e}")
-            return False
+        except (requests.exceptions.RequestException, ValueError) as e:
+            log_error(e, "login WMS")
+            return None
+        
+        duracao = time.perf_counter() - inicio
+        if data.get("autenticacao") and data.get("token"):
+            log_api_call("/login", True, duration=duracao, status_code=response.status_code)
+            return data["token"]
+        
+        log_api_call("/login", False, duration=duracao, status_code=response.status_code)
+        return None
+    
+    def _login(self) -> bool:
+        """Faz login e obtém token JWT (força a renovação)"""
+        return self.token_manager.refresh()
     
     def _ensure_authenticated(self) -> bool:
         """Garante que temos um token válido"""
-        if not self._is_token_valid():
-            return self._login()
-        return True
+        return self.token_manager.get_token() is not None
+    
+    def _require_token(self) -> str:
+        """
+        Retorna um token válido (fazendo login se necessário)
+        
+        Raises:
+            WMSAPIError: Login sem resposta válida (tratado como temporário,
+                pode ser indisponibilidade da API)
+        """
+        token = self.token_manager.get_token()
+        if token is None:
+            raise WMSAPIError("Falha na autenticação", retryable=True)
+        return token
     
     def get_agendamentos(self, data_consulta: Optional[str] = None, todos: bool = False) -> List[Dict[str, Any]]:
         """
@@ -124,54 +269,26 @@ class WMSAPIClient:
             return []
         
         try:
-            endpoint = f"{self.base_url}/agendamento/lista"
-            # Se não tem data_consulta, não inclui no payload
-            payload = {}
-            if data_consulta:
-                payload["diconsulta"] = data_consulta
+            agendamentos = self._fetch_lista(data_consulta)
             
-            response = self.session.post(endpoint, json=payload, timeout=30)
+            # Valida e retorna os agendamentos
+            if not agendamentos:
+                st.warning("⚠️ Nenhum agendamento encontrado no período")
+            # else:
+            #     st.success(f"✅ {len(agendamentos)} agendamentos encontrados")
             
-            # Verifica o código de status primeiro
-            if response.status_code != 200:
-                st.error(f"❌ Erro na API: Status {response.status_code}")
-                if response.text:
-                    st.error(f"Detalhes: {response.text}")
-                return []
-            
-            # Processa a resposta
-            try:
-                data = response.json()
-                
-                # Processa baseado no tipo da resposta
-                if isinstance(data, list):
-                    agendamentos = data
-                elif isinstance(data, dict):
-                    agendamentos = data.get("agendamentos", [])
-                    if not isinstance(agendamentos, list):
-                        st.error("❌ Campo 'agendamentos' não é uma lista")
-                        return []
-                else:
-                    st.error("❌ Formato de resposta inválido")
-                    return []
-                
-                # Valida e retorna os agendamentos
-                if not agendamentos:
-                    st.warning("⚠️ Nenhum agendamento encontrado no período")
-                # else:
-                #     st.success(f"✅ {len(agendamentos)} agendamentos encontrados")
-                
-                return agendamentos
-                
-            except ValueError as e:
-                st.error(f"❌ Erro ao decodificar JSON da resposta: {str(e)}")
-                return []
-            except Exception as e:
-                st.error(f"❌ Erro ao processar resposta: {str(e)}")
-                return []
+            return agendamentos
                 
+        except CircuitOpenError as e:
+            st.error(f"🔌 {e}")
+            return []
+        except WMSAPIError as e:
+            st.error(f"❌ {e}")
+            if e.details:
+                st.error(f"Detalhes: {e.details}")
+            return []
         except requests.exceptions.Timeout:
-            st.error("⏰ Timeout na requisição à API WMS (30s)")
+            st.error(f"⏰ Timeout na requisição à API WMS ({API_TIMEOUT}s)")
             return []
         except requests.exceptions.ConnectionError as e:
             st.error(f"🔌 Erro de conexão com a API WMS: {str(e)}")
@@ -180,6 +297,234 @@ class WMSAPIClient:
             st.error(f"❌ Erro inesperado ao fazer requisição: {str(e)}")
             return []
     
+    def fetch_agendamentos(self, data_consulta: Optional[str] = None, todos: bool = False) -> List[Dict[str, Any]]:
+        """
+        Busca agendamentos sem exibir mensagens na interface
+        
+        Mesmo comportamento de get_agendamentos, mas erros são propagados
+        como exceções (usado pela sincronização para manter os últimos dados
+        válidos quando a API falha).
+        
+        Args:
+            data_consulta: String no formato "dd.mm.aaaa - dd.mm.aaaa"
+                         Se None e todos=False, busca o dia atual
+            todos: Se True, busca todos os agendamentos
+            
+        Returns:
+            List[Dict[str, Any]]: Lista de agendamentos
+            
+        Raises:
+            WMSAPIError, CircuitOpenError, requests.exceptions.RequestException
+        """
+        if todos:
+            data_consulta = ""
+        elif not data_consulta:
+            hoje = datetime.now().strftime("%d.%m.%Y")
+            data_consulta = f"{hoje} - {hoje}"
+        return self._fetch_lista(data_consulta)
+    
+    def iter_agendamentos_lotes(
+        self,
+        data_consulta: Optional[str] = None,
+        todos: bool = False,
+        tamanho_lote: int = STREAM_BATCH_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Busca agendamentos lendo a resposta em streaming, em lotes
+        
+        O array ``agendamentos`` é decodificado item a item a partir de
+        ``response.iter_content``: o corpo completo nunca fica em memória,
+        apenas o lote atual. A abertura da requisição passa pelos retries e
+        pelo circuit breaker; uma falha no meio da leitura é propagada.
+        
+        Args:
+            data_consulta: String no formato "dd.mm.aaaa - dd.mm.aaaa"
+                         Se None e todos=False, busca o dia atual
+            todos: Se True, busca todos os agendamentos
+            tamanho_lote: Quantidade de agendamentos por lote
+            
+        Yields:
+            Listas com até ``tamanho_lote`` agendamentos
+            
+        Raises:
+            WMSAPIError, CircuitOpenError, requests.exceptions.RequestException
+        """
+        if todos:
+            data_consulta = ""
+        elif not data_consulta:
+            hoje = datetime.now().strftime("%d.%m.%Y")
+            data_consulta = f"{hoje} - {hoje}"
+        
+        inicio = time.perf_counter()
+        response = self.resilience.call(
+            lambda: self._post_lista(data_consulta, API_TIMEOUT, stream=True),
+            on_unauthorized=self.token_manager.invalidate
+        )
+        total = 0
+        with response:
+            try:
+                itens = iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_BYTES))
+                for lote in iter_lotes((item for item in itens if item), tamanho_lote):
+                    total += len(lote)
+                    yield lote
+            except ValueError as e:
+                raise WMSAPIError(f"Erro ao decodificar JSON da resposta: {str(e)}")
+        log_api_call("/agendamento/lista", True, total, duration=time.perf_counter() - inicio, status_code=200)
+    
+    def _fetch_lista(self, data_consulta: str, timeout: float = API_TIMEOUT) -> List[Dict[str, Any]]:
+        """
+        Faz o POST em /agendamento/lista com retries e circuit breaker
+        
+        Erros temporários (timeout, conexão, 429, 5xx) são repetidos com
+        backoff; em 401/502 o token é descartado e a requisição refeita com
+        um novo login. Com o circuito aberto a chamada falha imediatamente.
+        
+        Args:
+            data_consulta: String "dd.mm.aaaa - dd.mm.aaaa" ou vazia para todos
+            timeout: Timeout de cada tentativa em segundos
+            
+        Returns:
+            List[Dict[str, Any]]: Lista de agendamentos
+            
+        Raises:
+            WMSAPIError: Status diferente de 200 ou resposta em formato inválido
+            CircuitOpenError: API marcada como indisponível
+            requests.exceptions.RequestException: Erros de conexão/timeout
+        """
+        return self.resilience.call(
+            lambda: self._post_lista(data_consulta, timeout),
+            on_unauthorized=self.token_manager.invalidate
+        )
+    
+    def _post_lista(self, data_consulta: str, timeout: float = API_TIMEOUT, stream: bool = False) -> Any:
+        """
+        Faz uma única tentativa de POST em /agendamento/lista
+        
+        Não exibe mensagens na interface (pode rodar fora da thread do
+        Streamlit); erros são propagados como exceções.
+        
+        Args:
+            data_consulta: String "dd.mm.aaaa - dd.mm.aaaa" ou vazia para todos
+            timeout: Timeout da requisição em segundos
+            stream: Se True, retorna a resposta sem ler o corpo (status já validado)
+            
+        Returns:
+            List[Dict[str, Any]]: Lista de agendamentos (ou a resposta, com stream=True)
+            
+        Raises:
+            WMSAPIError: Status diferente de 200 ou resposta em formato inválido
+            requests.exceptions.RequestException: Erros de conexão/timeout
+        """
+        endpoint = f"{self.base_url}/agendamento/lista"
+        # Se não tem data_consulta, não inclui no payload
+        payload = {}
+        if data_consulta:
+            payload["diconsulta"] = data_consulta
+        
+        token = self._require_token()
+        
+        inicio = time.perf_counter()
+        # Token enviado por requisição (a sessão é compartilhada entre threads)
+        response = self.session.post(
+            endpoint, json=payload, headers={"Authorization": token}, timeout=timeout, stream=stream
+        )
+        
+        # Verifica o código de status primeiro
+        if response.status_code != 200:
+            erro = WMSAPIError(
+                f"Erro na API: Status {response.status_code}",
+                status_code=response.status_code,
+                details=response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+            response.close()
+            log_api_call(
+                "/agendamento/lista", False,
+                duration=time.perf_counter() - inicio, status_code=response.status_code
+            )
+            raise erro
+        
+        if stream:
+            return response
+        
+        # Processa a resposta
+        try:
+            with timed("json decode"):
+                data = response.json()
+        except ValueError as e:
+            raise WMSAPIError(f"Erro ao decodificar JSON da resposta: {str(e)}")
+        
+        agendamentos = parse_lista_payload(data)
+        log_api_call(
+            "/agendamento/lista", True, len(agendamentos),
+            duration=time.perf_counter() - inicio, status_code=response.status_code
+        )
+        return agendamentos
+    
+    def get_agendamentos_por_janelas(
+        self,
+        data_inicio: date,
+        data_fim: date,
+        janela: str = FETCH_WINDOW,
+        max_workers: int = FETCH_MAX_WORKERS,
+        timeout: float = FETCH_WINDOW_TIMEOUT,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca agendamentos dividindo o período em janelas concorrentes
+        
+        Cada janela vira uma requisição curta em /agendamento/lista, executada
+        num pool de threads limitado que compartilha a sessão autenticada.
+        O resultado é mesclado e deduplicado por idagendamento.
+        
+        Args:
+            data_inicio: Data inicial do período
+            data_fim: Data final do período
+            janela: Tamanho das janelas ("dia", "semana" ou "mes")
+            max_workers: Número máximo de requisições simultâneas
+            timeout: Timeout de cada requisição em segundos
+            progress_callback: Chamado a cada janela concluída com
+                (janelas concluídas, total de janelas, período da janela)
+                
+        Returns:
+            List[Dict[str, Any]]: Agendamentos únicos do período
+            
+        Raises:
+            WMSAPIError: Falha na autenticação ou em alguma das janelas
+            CircuitOpenError: API marcada como indisponível
+        """
+        if data_fim < data_inicio:
+            raise WMSAPIError("Data final não pode ser menor que a data inicial")
+        
+        # Autentica uma única vez antes de distribuir as requisições
+        self.resilience.call(self._require_token)
+        
+        periodos = [
+            format_periodo_consulta(inicio, fim)
+            for inicio, fim in split_periodo(data_inicio, data_fim, janela)
+        ]
+        resultados: List[Optional[List[Dict[str, Any]]]] = [None] * len(periodos)
+        falhas = []
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(periodos)))) as executor:
+            futures = {
+                executor.submit(self._fetch_lista, periodo, timeout): idx
+                for idx, periodo in enumerate(periodos)
+            }
+            for concluidas, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                try:
+                    resultados[idx] = future.result()
+                except Exception as e:
+                    falhas.append(f"{periodos[idx]} ({e})")
+                if progress_callback:
+                    progress_callback(concluidas, len(periodos), periodos[idx])
+        
+        if falhas:
+            raise WMSAPIError(f"Falha ao buscar {len(falhas)} de {len(periodos)} janelas", details="; ".join(falhas))
+        
+        return merge_agendamentos(resultados)
+    
     def test_connection(self) -> bool:
         """Testa a conexão com a API"""
         return self._login()
@@ -0,0 +1,362 @@
+"""
+Cliente assíncrono (asyncio + httpx) da API WMS
+"""
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+import httpx
+import streamlit as st
+from datetime import date, datetime
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional
+
+from services.api_client import (
+    WMSAPIError,
+    format_periodo_consulta,
+    merge_agendamentos,
+    parse_lista_payload,
+    parse_retry_after,
+    split_periodo,
+)
+from services.json_stream import iter_lotes
+from services.resilience import ResilientCaller
+from services.token_manager import TokenManager
+from src.core.config import API_TIMEOUT, FETCH_MAX_WORKERS, FETCH_WINDOW, STREAM_BATCH_SIZE
+from src.core.logger import log_api_call
+from src.core.timing import timed
+
+
+class AsyncWMSAPIClient:
+    """
+    Cliente assíncrono com a mesma interface do WMSAPIClient
+    
+    Usa um pool de conexões httpx, limita as requisições simultâneas com
+    um semáforo e aplica timeout por requisição. As chamadas passam pela
+    mesma camada do cliente síncrono: TokenManager (login único e renovação
+    do token) e ResilientCaller (retries com backoff, circuit breaker e
+    novo login em 401/502). Deve ser usado como gerenciador de contexto
+    assíncrono (``async with``) dentro de um único event loop; erros são
+    propagados como exceções (WMSAPIError/CircuitOpenError).
+    """
+    
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        login: Optional[str] = None,
+        password: Optional[str] = None,
+        max_concurrency: int = FETCH_MAX_WORKERS,
+        timeout: float = API_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        resilience: Optional[ResilientCaller] = None
+    ):
+        # Tenta usar as credenciais fornecidas, senão usa as do Streamlit
+        self.base_url = base_url or st.secrets["api_wms"]["BASE_URL"]
+        self.login_name = login or st.secrets["api_wms"]["LOGIN"]
+        self.password = password or st.secrets["api_wms"]["PASSWORD"]
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.token_manager = TokenManager(self._request_token)
+        self.resilience = resilience or ResilientCaller()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def __aenter__(self) -> "AsyncWMSAPIClient":
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Content-Type": "application/json",
+                "User-Agent": "Streamlit-SABESP/1.0"
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            timeout=httpx.Timeout(self.timeout),
+            transport=self._transport
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._loop = asyncio.get_running_loop()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Fecha o pool de conexões"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _post_login(self) -> Optional[str]:
+        """Faz o POST em /login e retorna o token JWT (None se recusado)"""
+        inicio = time.perf_counter()
+        async with self._semaphore:
+            response = await self._client.post(
+                "/login",
+                json={"login": self.login_name, "password": self.password}
+            )
+        response.raise_for_status()
+        data = response.json()
+        
+        duracao = time.perf_counter() - inicio
+        if data.get("autenticacao") and data.get("token"):
+            log_api_call("/login", True, duration=duracao, status_code=response.status_code)
+            return data["token"]
+        log_api_call("/login", False, duration=duracao, status_code=response.status_code)
+        return None
+    
+    def _request_token(self) -> Optional[str]:
+        """
+        Login síncrono usado pelo TokenManager
+        
+        Executa _post_login no event loop do cliente; é chamado fora da
+        thread do loop (executor em _require_token ou timer de renovação).
+        """
+        return asyncio.run_coroutine_threadsafe(self._post_login(), self._loop).result()
+    
+    async def login(self) -> bool:
+        """Força um novo login (ver TokenManager.refresh)"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.token_manager.refresh)
+    
+    async def _require_token(self) -> str:
+        """
+        Retorna um token válido (fazendo login se necessário)
+        
+        O TokenManager usa locks de thread; é consultado num executor para
+        não bloquear o event loop (logins concorrentes viram um só).
+        
+        Raises:
+            WMSAPIError: Login sem resposta válida (tratado como temporário)
+        """
+        token = await asyncio.get_running_loop().run_in_executor(None, self.token_manager.get_token)
+        if token is None:
+            raise WMSAPIError("Falha na autenticação", retryable=True)
+        return token
+    
+    async def _fetch_lista(self, data_consulta: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """POST em /agendamento/lista com retries, circuit breaker e novo login em 401/502"""
+        return await self.resilience.acall(
+            lambda: self._post_lista(data_consulta, timeout),
+            on_unauthorized=self.token_manager.invalidate
+        )
+    
+    async def _post_lista(self, data_consulta: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Uma única tentativa de POST em /agendamento/lista (limite de concorrência)
+        
+        Raises:
+            WMSAPIError: Status diferente de 200, resposta inválida ou erro de
+                conexão/timeout (este marcado como temporário)
+        """
+        token = await self._require_token()
+        payload = {"diconsulta": data_consulta} if data_consulta else {}
+        
+        inicio = time.perf_counter()
+        try:
+            async with self._semaphore:
+                response = await self._client.post(
+                    "/agendamento/lista",
+                    json=payload,
+                    headers={"Authorization": token},
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+        except httpx.TransportError as e:
+            raise WMSAPIError(f"Erro de conexão com a API WMS: {str(e)}", retryable=True) from e
+        
+        if response.status_code != 200:
+            log_api_call(
+                "/agendamento/lista", False,
+                duration=time.perf_counter() - inicio, status_code=response.status_code
+            )
+            raise WMSAPIError(
+                f"Erro na API: Status {response.status_code}",
+                status_code=response.status_code,
+                details=response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        try:
+            with timed("json decode"):
+                data = response.json()
+        except ValueError as e:
+            raise WMSAPIError(f"Erro ao decodificar JSON da resposta: {str(e)}")
+        
+        agendamentos = parse_lista_payload(data)
+        log_api_call(
+            "/agendamento/lista", True, len(agendamentos),
+            duration=time.perf_counter() - inicio, status_code=response.status_code
+        )
+        return agendamentos
+    
+    async def get_agendamentos(
+        self,
+        data_consulta: Optional[str] = None,
+        todos: bool = False,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca agendamentos da API WMS
+        
+        Args:
+            data_consulta: String no formato "dd.mm.aaaa - dd.mm.aaaa"
+                         Se None e todos=False, retorna agendamentos do dia atual
+            todos: Se True, retorna todos os agendamentos independente da data
+            timeout: Timeout da requisição em segundos
+            
+        Returns:
+            List[Dict[str, Any]]: Lista de agendamentos
+        """
+        if todos:
+            data_consulta = ""
+        elif not data_consulta:
+            hoje = datetime.now().date()
+            data_consulta = format_periodo_consulta(hoje, hoje)
+        return await self._fetch_lista(data_consulta, timeout)
+    
+    async def get_agendamentos_por_janelas(
+        self,
+        data_inicio: date,
+        data_fim: date,
+        janela: str = FETCH_WINDOW,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca o período em janelas concorrentes e deduplica por idagendamento
+        
+        Args:
+            data_inicio: Data inicial do período
+            data_fim: Data final do período
+            janela: Tamanho das janelas ("dia", "semana" ou "mes")
+            timeout: Timeout de cada requisição em segundos
+            progress_callback: Chamado a cada janela concluída com
+                (janelas concluídas, total de janelas, período da janela)
+                
+        Returns:
+            List[Dict[str, Any]]: Agendamentos únicos do período
+        """
+        if data_fim < data_inicio:
+            raise WMSAPIError("Data final não pode ser menor que a data inicial")
+        await self._require_token()
+        
+        periodos = [format_periodo_consulta(i, f) for i, f in split_periodo(data_inicio, data_fim, janela)]
+        concluidas = 0
+        
+        async def _janela(periodo: str):
+            nonlocal concluidas
+            try:
+                return await self._fetch_lista(periodo, timeout)
+            finally:
+                concluidas += 1
+                if progress_callback:
+                    progress_callback(concluidas, len(periodos), periodo)
+        
+        resultados = await asyncio.gather(*(_janela(p) for p in periodos), return_exceptions=True)
+        falhas = [f"{p} ({r})" for p, r in zip(periodos, resultados) if isinstance(r, Exception)]
+        if falhas:
+            raise WMSAPIError(f"Falha ao buscar {len(falhas)} de {len(periodos)} janelas", details="; ".join(falhas))
+        return merge_agendamentos(resultados)
+    
+    async def test_connection(self) -> bool:
+        """Testa a conexão com a API"""
+        return await self.login()
+
+
+class SyncAsyncWMSClient:
+    """
+    Fachada síncrona do AsyncWMSAPIClient para uso no app.py
+    
+    Mantém um event loop próprio numa thread em segundo plano, de modo que
+    o pool de conexões e o token sobrevivem entre as execuções do script;
+    cada chamada bloqueia apenas até o resultado da corrotina.
+    """
+    
+    def __init__(self, **client_kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="wms-async-client", daemon=True)
+        self._thread.start()
+        self._client = AsyncWMSAPIClient(**client_kwargs)
+        self._run(self._client.__aenter__())
+    
+    @property
+    def resilience(self) -> ResilientCaller:
+        """Retries e circuit breaker do cliente (estatísticas exibidas no app)"""
+        return self._client.resilience
+    
+    def _run(self, coro: Coroutine) -> Any:
+        """Executa a corrotina no loop do cliente e aguarda o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def login(self) -> bool:
+        """Faz login e obtém token JWT"""
+        return self._run(self._client.login())
+    
+    def get_agendamentos(self, data_consulta: Optional[str] = None, todos: bool = False) -> List[Dict[str, Any]]:
+        """Busca agendamentos da API WMS (ver AsyncWMSAPIClient.get_agendamentos)"""
+        return self._run(self._client.get_agendamentos(data_consulta, todos))
+
+    # Mesma interface do WMSAPIClient (erros propagados como exceções)
+    fetch_agendamentos = get_agendamentos
+    
+    def iter_agendamentos_lotes(
+        self,
+        data_consulta: Optional[str] = None,
+        todos: bool = False,
+        tamanho_lote: int = STREAM_BATCH_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Mesma interface do WMSAPIClient.iter_agendamentos_lotes
+        
+        A resposta é decodificada por completo no event loop e entregue em
+        lotes (sem leitura em streaming neste cliente).
+        """
+        return iter_lotes(self.get_agendamentos(data_consulta, todos), tamanho_lote)
+    
+    def get_agendamentos_por_janelas(
+        self,
+        data_inicio: date,
+        data_fim: date,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca o período em janelas concorrentes (ver AsyncWMSAPIClient.get_agendamentos_por_janelas)
+        
+        O progress_callback é chamado na thread de quem chamou (a thread do
+        script do Streamlit), não na thread do event loop.
+        """
+        eventos: "queue.Queue[tuple]" = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self._client.get_agendamentos_por_janelas(
+                data_inicio, data_fim, progress_callback=lambda *evento: eventos.put(evento), **kwargs
+            ),
+            self._loop
+        )
+        while True:
+            try:
+                resultado = future.result(timeout=0.1)
+                break
+            except concurrent.futures.TimeoutError:
+                pass
+            finally:
+                while progress_callback and not eventos.empty():
+                    progress_callback(*eventos.get_nowait())
+        return resultado
+    
+    def test_connection(self) -> bool:
+        """Testa a conexão com a API"""
+        return self._run(self._client.test_connection())
+    
+    def close(self):
+        """Fecha o pool de conexões e encerra o event loop"""
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+# Factory function com cache
+@st.cache_resource
+def get_wms_async_client():
+    """Retorna uma instância do cliente WMS assíncrono com fachada síncrona (cacheada)"""
+    return SyncAsyncWMSClient()
@@ -0,0 +1,198 @@
+"""
+Cache compartilhado entre sessões para os agendamentos processados
+"""
+import threading
+import time
+import streamlit as st
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.core.config import CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES
+from src.core.logger import log_error
+
+
+class AgendamentosCache:
+    """
+    Cache em memória (thread-safe) dos DataFrames processados
+    
+    As entradas são indexadas pelo período consultado, expiram após
+    ``ttl_seconds`` e, acima de ``max_entries``, a menos usada recentemente
+    é descartada. Uma única sessão carrega cada chave por vez; as demais
+    aguardam e reaproveitam o resultado.
+    """
+    
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._refreshing: Dict[Hashable, threading.Thread] = {}
+        self._errors: Dict[Hashable, Exception] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor em cache ou None se ausente/expirado
+        
+        Args:
+            key: Chave da consulta
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+    
+    def set(self, key: Hashable, value: Any):
+        """
+        Armazena um valor, descartando as entradas mais antigas se necessário
+        
+        Args:
+            key: Chave da consulta
+            value: Valor a armazenar
+        """
+        with self._lock:
+            self._entries[key] = {'value': value, 'loaded_at': time.monotonic()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                antiga, _ = self._entries.popitem(last=False)
+                self._drop_load_lock(antiga)
+                self.evictions += 1
+    
+    def contains(self, key: Hashable) -> bool:
+        """Indica se há um valor válido para a chave (sem contar hit/miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry)
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou carrega (uma única vez) usando o loader
+        
+        Args:
+            key: Chave da consulta
+            loader: Função sem argumentos que carrega o valor
+            
+        Returns:
+            Valor em cache ou recém-carregado
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        
+        with load_lock:
+            # Outra sessão pode ter carregado enquanto aguardávamos
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not self._is_expired(entry):
+                    return entry['value']
+            
+            value = loader()
+            self.set(key, value)
+            return value
+    
+    def refresh_in_background(self, key: Hashable, loader: Callable[[], Any]) -> bool:
+        """
+        Recarrega uma chave numa thread em segundo plano
+        
+        Apenas uma atualização por chave roda por vez. O loader não deve
+        usar comandos do Streamlit (não há contexto de script na thread).
+        
+        Args:
+            key: Chave da consulta
+            loader: Função sem argumentos que carrega o valor
+            
+        Returns:
+            True se uma nova atualização foi iniciada
+        """
+        def _run():
+            try:
+                with self._lock:
+                    load_lock = self._load_locks.setdefault(key, threading.Lock())
+                with load_lock:
+                    value = loader()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as e:
+                log_error(e, f"refresh_in_background({key})")
+                with self._lock:
+                    self._errors[key] = e
+            finally:
+                with self._lock:
+                    self._refreshing.pop(key, None)
+        
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            thread = threading.Thread(target=_run, name=f"cache-refresh-{key}", daemon=True)
+            self._refreshing[key] = thread
+            self._errors.pop(key, None)
+        thread.start()
+        return True
+    
+    def is_refreshing(self, key: Hashable) -> bool:
+        """Indica se há uma atualização em segundo plano para a chave"""
+        with self._lock:
+            return key in self._refreshing
+    
+    def last_error(self, key: Hashable) -> Optional[Exception]:
+        """Erro da última atualização em segundo plano da chave (None se concluiu)"""
+        with self._lock:
+            return self._errors.get(key)
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Invalida uma chave ou todo o cache
+        
+        Args:
+            key: Chave a invalidar (None invalida tudo)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                for chave in list(self._load_locks):
+                    self._drop_load_lock(chave)
+            else:
+                self._entries.pop(key, None)
+                self._drop_load_lock(key)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna contadores do cache
+        
+        Returns:
+            Dicionário com hits, misses, evictions e entradas atuais
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries)
+            }
+    
+    def _drop_load_lock(self, key: Hashable):
+        """Descarta o lock de carga da chave se nenhuma carga o usa (requer o lock)"""
+        load_lock = self._load_locks.get(key)
+        if load_lock is not None and not load_lock.locked():
+            del self._load_locks[key]
+    
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        """Verifica se a entrada passou do TTL"""
+        return time.monotonic() - entry['loaded_at'] > self.ttl_seconds
+
+
+# Factory function com cache (instância única compartilhada entre sessões)
+@st.cache_resource
+def get_agendamentos_cache():
+    """Retorna o cache compartilhado de agendamentos"""
+    return AgendamentosCache()
@@ -1,8 +1,299 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 from datetime import datetime
 
+from services.filter_engine import filter_dataframe
+from services.json_stream import iter_lotes
+from src.core.config import STREAM_BATCH_SIZE
+from src.core.utils import parse_wms_dates
+from src.core.logger import logger
+from src.core.timing import timed
+
+# Colunas de data retornadas pela API
+DATE_COLUMNS = ['dtcadastro', 'dtconfirmacao', 'dtagendamento', 'dtconfirmada']
+
+# Colunas numéricas retornadas pela API (ou geradas na expansão dos pedidos)
+NUMERIC_COLUMNS = ['qnt_volume', 'peso', 'quantidade_pedido']
+
+# Renomeia colunas (adicione mais mapeamentos conforme necessário)
+RENAME_MAP = {
+    'idagendamento': 'ID',
+    'galpao': 'Depósito',
+    'dtcadastro' : 'Data Cadastro',
+    'dtconfirmacao' : 'Data Confirmação',
+    'cnpj' : 'CNPJ',
+    'razao' : 'Fornecedor',
+    'transportadora': 'Transportadora',
+    'placa' : 'Placa do Veículo',
+    'cnh' : 'CNH',
+    'motorista' : 'Motorista',
+    'dtagendamento': 'Data Agendamento',
+    'dtalteracao': 'Data Alteração',
+    'dtconfirmada': 'Data Confirmada',
+    'status': 'Status da Entrega',
+    'tipo_veiculo': 'Tipo de Veículo',
+    'tipo_material': 'Tipo de Material',
+    'qnt_volume': 'Quantidade de Volume',
+    'peso': 'Peso (kg)',
+    'usuario' : 'Usuário',
+    'observacao' : 'Observação',
+    'justificativa_cancelamento' : 'Justificativa do Cancelamento', 
+    'pedidos' : 'Pedidos',
+    'pedido_numero': 'Documento de Compra',
+    'codigo_material': 'Código do Material',
+    'material': 'Descrição do Material',
+    'quantidade_pedido': 'Quantidade do Pedido'
+}
+
+# Colunas de texto repetitivas convertidas para category (baixa cardinalidade)
+CATEGORICAL_COLUMNS = [
+    'Depósito', 'Status da Entrega', 'Transportadora', 'Tipo de Veículo',
+    'Tipo de Material', 'Fornecedor', 'Descrição do Material'
+]
+CATEGORY_MAX_RATIO = 0.5  # valores distintos / linhas para usar category
+
+# IDs e quantidades como inteiros anuláveis; peso em float32
+INTEGER_COLUMNS = ['ID', 'Quantidade de Volume', 'Quantidade do Pedido']
+FLOAT32_COLUMNS = ['Peso (kg)']
+
+
+def _normalize_api_data(api_data: List[Dict]) -> List[Dict]:
+    """
+    Valida a entrada da API e remove itens vazios
+    
+    Args:
+        api_data: Lista de agendamentos (ou um único agendamento)
+        
+    Returns:
+        Lista de agendamentos válidos (vazia se não houver dados)
+    """
+    # Se recebemos um único dicionário, converte para lista
+    if isinstance(api_data, dict):
+        api_data = [api_data]
+    
+    # Se não é uma lista neste ponto, retorna lista vazia
+    if not isinstance(api_data, list):
+        st.error("❌ Formato de dados inválido")
+        return []
+        
+    # Remove itens None ou vazios da lista
+    api_data = [item for item in api_data if item]
+    
+    if not api_data:
+        st.warning("⚠️ Nenhum dado válido encontrado")
+    return api_data
+
+
+def _expand_pedidos_iterrows(df_main: pd.DataFrame) -> pd.DataFrame:
+    """
+    Expande os pedidos linha a linha (implementação de referência)
+    
+    Args:
+        df_main: DataFrame com um agendamento por linha
+        
+    Returns:
+        DataFrame com uma linha por pedido
+    """
+    # Lista para armazenar dados expandidos (com pedidos)
+    expanded_data = []
+    
+    for _, agendamento in df_main.iterrows():
+        base_data = agendamento.to_dict()
+        
+        # Se não houver pedidos, adiciona uma linha
+        if not agendamento.get('pedidos') or not isinstance(agendamento['pedidos'], list):
+            expanded_data.append(base_data)
+        else:
+            # Expande os pedidos (uma linha por pedido)
+            for pedido in agendamento['pedidos']:
+                combined_data = base_data.copy()
+                combined_data.update({
+                    'pedido_numero': pedido.get('peiddo', ''),
+                    'codigo_material': pedido.get('codigo', ''),
+                    'material': pedido.get('material', ''),
+                    'quantidade_pedido': pedido.get('quantidade', '')
+                })
+                expanded_data.append(combined_data)
+    
+    return pd.DataFrame(expanded_data)
+
+
+def _expand_pedidos(df_main: pd.DataFrame) -> pd.DataFrame:
+    """
+    Expande os pedidos de forma colunar (uma linha por pedido)
+    
+    Monta listas planas com a posição do agendamento de origem e os campos
+    de cada pedido, e replica as colunas do agendamento com um único
+    ``iloc`` em vez de copiar um dicionário por pedido.
+    
+    Args:
+        df_main: DataFrame com um agendamento por linha
+        
+    Returns:
+        DataFrame com uma linha por pedido
+    """
+    if 'pedidos' not in df_main.columns:
+        return df_main.reset_index(drop=True)
+    
+    positions = []
+    pedido_numero = []
+    codigo_material = []
+    material = []
+    quantidade_pedido = []
+    has_pedidos = False
+    
+    for pos, pedidos in enumerate(df_main['pedidos'].tolist()):
+        # Se não houver pedidos, mantém uma linha sem dados de pedido
+        if not isinstance(pedidos, list) or not pedidos:
+            positions.append(pos)
+            pedido_numero.append(np.nan)
+            codigo_material.append(np.nan)
+            material.append(np.nan)
+            quantidade_pedido.append(np.nan)
+            continue
+        
+        has_pedidos = True
+        for pedido in pedidos:
+            positions.append(pos)
+            pedido_numero.append(pedido.get('peiddo', ''))
+            codigo_material.append(pedido.get('codigo', ''))
+            material.append(pedido.get('material', ''))
+            quantidade_pedido.append(pedido.get('quantidade', ''))
+    
+    df_expanded = df_main.iloc[positions].reset_index(drop=True)
+    
+    # Sem nenhum pedido, as colunas de pedido não existem (como na referência)
+    if has_pedidos:
+        df_expanded['pedido_numero'] = pd.Series(pedido_numero)
+        df_expanded['codigo_material'] = pd.Series(codigo_material)
+        df_expanded['material'] = pd.Series(material)
+        df_expanded['quantidade_pedido'] = pd.Series(quantidade_pedido)
+    
+    return df_expanded
+
+
+def _prepare_agendamentos_frame(df_final: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte datas e números e renomeia as colunas do DataFrame expandido
+    
+    Não ordena nem aplica o schema tipado (feitos uma única vez sobre o
+    resultado completo).
+    
+    Args:
+        df_final: DataFrame com uma linha por pedido (nomes da API)
+        
+    Returns:
+        DataFrame com datas/números convertidos e colunas renomeadas
+    """
+    # Processa colunas de data (formato explícito detectado; ver parse_wms_dates)
+    for col in DATE_COLUMNS:
+        if col in df_final.columns:
+            df_final[col] = parse_wms_dates(df_final[col])
+    
+    # Converte colunas numéricas
+    for col in NUMERIC_COLUMNS:
+        if col in df_final.columns:
+            df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+    
+    df_final = df_final.rename(columns=RENAME_MAP)
+    
+    # Remove a coluna Pedidos pois já foi expandida em outras colunas
+    return df_final.drop(columns=['Pedidos'], errors='ignore')
+
+
+def _sort_and_type(df_final: pd.DataFrame) -> pd.DataFrame:
+    """Ordena por data de agendamento (mais recentes primeiro) e aplica o schema tipado"""
+    if 'Data Agendamento' in df_final.columns:
+        df_final = df_final.sort_values('Data Agendamento', ascending=False)
+    return apply_typed_schema(df_final)
+
+
+def _finalize_agendamentos_frame(df_final: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte tipos, ordena e renomeia as colunas do DataFrame expandido
+    
+    Args:
+        df_final: DataFrame com uma linha por pedido (nomes da API)
+        
+    Returns:
+        DataFrame com colunas tipadas e renomeadas
+    """
+    return _sort_and_type(_prepare_agendamentos_frame(df_final))
+
+
+def _to_numeric_sem_perdas(serie: pd.Series) -> Optional[pd.Series]:
+    """
+    Converte a coluna para número sem descartar valores
+    
+    Args:
+        serie: Coluna a converter
+        
+    Returns:
+        Coluna numérica ou None se algum valor não for numérico
+    """
+    valores = pd.to_numeric(serie, errors='coerce')
+    if valores.isna().sum() != serie.isna().sum():
+        return None
+    return valores
+
+
+def apply_typed_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica tipos compactos ao DataFrame processado
+    
+    Texto de baixa cardinalidade vira category, IDs e quantidades inteiras
+    viram Int64 (anulável) e o peso vira float32. Colunas com valores não
+    numéricos são mantidas como estão. O uso de memória antes e depois é
+    registrado no log.
+    
+    Args:
+        df: DataFrame processado (colunas renomeadas)
+        
+    Returns:
+        DataFrame com os tipos compactos
+    """
+    if df.empty:
+        return df
+    
+    memoria_antes = df.memory_usage(deep=True).sum()
+    colunas = {}
+    
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if df[col].nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(df):
+                colunas[col] = df[col].astype('category')
+    
+    for col in INTEGER_COLUMNS:
+        if col in df.columns and not pd.api.types.is_integer_dtype(df[col].dtype):
+            valores = _to_numeric_sem_perdas(df[col])
+            if valores is None:
+                continue
+            preenchidos = valores.dropna()
+            # Só converte se todos os valores forem inteiros
+            if (preenchidos == preenchidos.round()).all():
+                colunas[col] = valores.astype('Int64')
+    
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != np.float32:
+            valores = _to_numeric_sem_perdas(df[col])
+            if valores is not None:
+                colunas[col] = valores.astype(np.float32)
+    
+    if not colunas:
+        return df
+    
+    df = df.assign(**colunas)
+    memoria_depois = df.memory_usage(deep=True).sum()
+    logger.info(
+        "Schema tipado - Linhas: %d, Memória: %.1f MB -> %.1f MB",
+        len(df), memoria_antes / 1024 ** 2, memoria_depois / 1024 ** 2
+    )
+    return df
+
+
+@timed("processamento")
 def process_agendamentos_data(api_data: List[Dict]) -> pd.DataFrame:
     """
     Processa os dados de agendamentos da API WMS
@@ -18,105 +309,178 @@ def process_agendamentos_data(api_data: List[Dict]) -> pd.DataFrame:
         return pd.DataFrame()
     
     try:
-        # Se recebemos um único dicionário, converte para lista
-        if isinstance(api_data, dict):
-            api_data = [api_data]
-        
-        # Se não é uma lista neste ponto, retorna DataFrame vazio
-        if not isinstance(api_data, list):
-            st.error("❌ Formato de dados inválido")
-            return pd.DataFrame()
-            
-        # Remove itens None ou vazios da lista
-        api_data = [item for item in api_data if item]
-        
+        api_data = _normalize_api_data(api_data)
         if not api_data:
-            st.warning("⚠️ Nenhum dado válido encontrado")
             return pd.DataFrame()
             
-        # Cria DataFrame principal
+        # Cria DataFrame principal e expande os pedidos (uma linha por pedido)
         df_main = pd.DataFrame(api_data)
+        df_final = _expand_pedidos(df_main)
         
-        # Lista para armazenar dados expandidos (com pedidos)
-        expanded_data = []
+        return _finalize_agendamentos_frame(df_final)
         
-        for _, agendamento in df_main.iterrows():
-            base_data = agendamento.to_dict()
-            
-            # Se não houver pedidos, adiciona uma linha
-            if not agendamento.get('pedidos') or not isinstance(agendamento['pedidos'], list):
-                expanded_data.append(base_data)
-            else:
-                # Expande os pedidos (uma linha por pedido)
-                for pedido in agendamento['pedidos']:
-                    combined_data = base_data.copy()
-                    combined_data.update({
-                        'pedido_numero': pedido.get('peiddo', ''),
-                        'codigo_material': pedido.get('codigo', ''),
-                        'material': pedido.get('material', ''),
-                        'quantidade_pedido': pedido.get('quantidade', '')
-                    })
-                    expanded_data.append(combined_data)
-        
-        # Cria DataFrame final
-        df_final = pd.DataFrame(expanded_data)
-        
-        # Processa colunas de data
-        date_columns = ['dtcadastro', 'dtconfirmacao', 'dtagendamento', 'dtconfirmada']
-        for col in date_columns:
-            if col in df_final.columns:
-                df_final[col] = pd.to_datetime(df_final[col], errors='coerce', dayfirst=True)
-        
-        # Converte colunas numéricas
-        numeric_columns = ['qnt_volume', 'peso', 'quantidade_pedido']
-        for col in numeric_columns:
-            if col in df_final.columns:
-                df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-        
-        # Ordena por data de agendamento
-        if 'dtagendamento' in df_final.columns:
-            df_final = df_final.sort_values('dtagendamento', ascending=False)
-        
-        # Renomeia colunas (adicione mais mapeamentos conforme necessário)
-        rename_map = {
-            'idagendamento': 'ID',
-            'galpao': 'Depósito',
-            'dtcadastro' : 'Data Cadastro',
-            'dtconfirmacao' : 'Data Confirmação',
-            'cnpj' : 'CNPJ',
-            'razao' : 'Fornecedor',
-            'transportadora': 'Transportadora',
-            'placa' : 'Placa do Veículo',
-            'cnh' : 'CNH',
-            'motorista' : 'Motorista',
-            'dtagendamento': 'Data Agendamento',
-            'dtalteracao': 'Data Alteração',
-            'dtconfirmada': 'Data Confirmada',
-            'status': 'Status da Entrega',
-            'tipo_veiculo': 'Tipo de Veículo',
-            'tipo_material': 'Tipo de Material',
-            'qnt_volume': 'Quantidade de Volume',
-            'peso': 'Peso (kg)',
-            'usuario' : 'Usuário',
-            'observacao' : 'Observação',
-            'justificativa_cancelamento' : 'Justificativa do Cancelamento', 
-            'pedidos' : 'Pedidos',
-            'pedido_numero': 'Documento de Compra',
-            'codigo_material': 'Código do Material',
-            'material': 'Descrição do Material',
-            'quantidade_pedido': 'Quantidade do Pedido'
-        }
-        df_final = df_final.rename(columns=rename_map)
+    except Exception as e:
+        st.error(f"❌ Erro ao processar dados: {e}")
+        return pd.DataFrame()
+
+
+def iter_agendamentos_chunks(
+    agendamentos: Iterable[Dict],
+    chunk_size: int = STREAM_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Processa agendamentos em blocos, sob demanda (gerador)
+    
+    Cada bloco de até ``chunk_size`` agendamentos é expandido (uma linha por
+    pedido), tem datas e números convertidos e colunas renomeadas. Só o
+    bloco atual de dicionários brutos fica em memória. Os blocos não são
+    ordenados nem tipados; use concat_agendamentos_chunks para o resultado
+    final. Erros são propagados (pode rodar fora da thread do Streamlit).
+    
+    Args:
+        agendamentos: Agendamentos da API (lista, gerador ou stream)
+        chunk_size: Quantidade de agendamentos por bloco
         
-        # Remove a coluna Pedidos pois já foi expandida em outras colunas
-        df_final = df_final.drop(columns=['Pedidos'], errors='ignore')
+    Yields:
+        DataFrames processados, um por bloco
+    """
+    for lote in iter_lotes((item for item in agendamentos if item), chunk_size):
+        yield _prepare_agendamentos_frame(_expand_pedidos(pd.DataFrame(lote)))
+
+
+def concat_agendamentos_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Junta os blocos de iter_agendamentos_chunks no DataFrame final
+    
+    Faz uma única concatenação, uma única ordenação por data de agendamento
+    e aplica o schema tipado uma vez.
+    
+    Args:
+        chunks: DataFrames processados por bloco
+        
+    Returns:
+        DataFrame equivalente ao de process_agendamentos_data
+    """
+    frames = [chunk for chunk in chunks if not chunk.empty]
+    if not frames:
+        return pd.DataFrame()
+    
+    df_final = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return _sort_and_type(df_final)
+
+
+def process_agendamentos_stream(
+    agendamentos: Iterable[Dict],
+    chunk_size: int = STREAM_BATCH_SIZE
+) -> pd.DataFrame:
+    """
+    Processa um iterável de agendamentos em blocos (ver iter_agendamentos_chunks)
+    
+    Args:
+        agendamentos: Agendamentos da API (lista, gerador ou stream)
+        chunk_size: Quantidade de agendamentos por bloco
         
-        return df_final
+    Returns:
+        DataFrame com dados processados
+    """
+    return concat_agendamentos_chunks(iter_agendamentos_chunks(agendamentos, chunk_size))
+
+
+# Inclui a leitura do stream, consumido à medida que os lotes são processados
+@timed("processamento (streaming)")
+def process_agendamentos_lotes(lotes: Iterable[List[Dict]]) -> pd.DataFrame:
+    """
+    Processa agendamentos recebidos em lotes (leitura em streaming)
+    
+    Cada lote vira um bloco do pipeline (ver iter_agendamentos_chunks) e é
+    descartado antes do próximo; os dicionários brutos de todo o histórico
+    nunca ficam em memória ao mesmo tempo.
+    
+    Args:
+        lotes: Listas de agendamentos da API
+        
+    Returns:
+        DataFrame com dados processados
+    """
+    return concat_agendamentos_chunks(
+        chunk for lote in lotes for chunk in iter_agendamentos_chunks(lote, max(len(lote), 1))
+    )
+
+
+def process_agendamentos_data_reference(api_data: List[Dict]) -> pd.DataFrame:
+    """
+    Implementação de referência de process_agendamentos_data (iterrows)
+    
+    Mantida para validar a expansão colunar nos testes de equivalência.
+    
+    Args:
+        api_data: Lista de agendamentos da API
+        
+    Returns:
+        DataFrame com dados processados
+    """
+    if not api_data:
+        return pd.DataFrame()
+    
+    try:
+        api_data = _normalize_api_data(api_data)
+        if not api_data:
+            return pd.DataFrame()
+        
+        df_main = pd.DataFrame(api_data)
+        df_final = _expand_pedidos_iterrows(df_main)
+        
+        return _finalize_agendamentos_frame(df_final)
         
     except Exception as e:
         st.error(f"❌ Erro ao processar dados: {e}")
         return pd.DataFrame()
 
+def upsert_agendamentos(df_atual: pd.DataFrame, df_novos: pd.DataFrame, id_column: str = 'ID') -> pd.DataFrame:
+    """
+    Atualiza o DataFrame processado com agendamentos novos ou alterados
+    
+    Todas as linhas (pedidos) de um agendamento presente em ``df_novos``
+    substituem as linhas existentes com o mesmo ID.
+    
+    Args:
+        df_atual: DataFrame processado atualmente em memória
+        df_novos: DataFrame processado com os agendamentos alterados
+        id_column: Nome da coluna de ID do agendamento
+        
+    Returns:
+        DataFrame atualizado, ordenado por data de agendamento
+    """
+    if df_novos.empty:
+        return df_atual
+    if df_atual.empty or id_column not in df_atual.columns:
+        return df_novos
+    
+    mantidos = df_atual[~df_atual[id_column].isin(df_novos[id_column].unique())]
+    df_final = pd.concat([df_novos, mantidos], ignore_index=True)
+    
+    # Ordena por data de agendamento
+    if 'Data Agendamento' in df_final.columns:
+        df_final = df_final.sort_values('Data Agendamento', ascending=False, kind='stable')
+    
+    # Categorias diferentes viram object no concat; reaplica o schema
+    return apply_typed_schema(df_final)
+
+
+def value_counts_observed(series: pd.Series) -> pd.Series:
+    """
+    Contagem de valores ignorando categorias sem ocorrências
+    
+    Args:
+        series: Série (categórica ou não)
+        
+    Returns:
+        Série com as contagens em ordem decrescente
+    """
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
 def create_agendamentos_summary(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Cria um resumo dos agendamentos
@@ -143,8 +507,8 @@ def create_agendamentos_summary(df: pd.DataFrame) -> Dict[str, Any]:
         'total_agendamentos': len(df['ID'].unique()) if 'ID' in df.columns else 0,
         'total_pedidos': len(df) if 'Documento de Compra' in df.columns else 0,
         'galpoes_unicos': df['Depósito'].nunique() if 'Depósito' in df.columns else 0,
-        'status_counts': df['Status da Entrega'].value_counts().to_dict() if 'Status da Entrega' in df.columns else {},
-        'galpao_counts': df['Depósito'].value_counts().to_dict() if 'Depósito' in df.columns else {},
+        'status_counts': value_counts_observed(df['Status da Entrega']).to_dict() if 'Status da Entrega' in df.columns else {},
+        'galpao_counts': value_counts_observed(df['Depósito']).to_dict() if 'Depósito' in df.columns else {},
         'peso_total': df['Peso (kg)'].sum() if 'Peso (kg)' in df.columns else 0,
         'volume_total': df['Quantidade de Volume'].sum() if 'Quantidade de Volume' in df.columns else 0,
         'data_recente': df['Data Agendamento'].max() if 'Data Agendamento' in df.columns else None
@@ -156,36 +520,22 @@ def filter_agendamentos(df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
     """
     Filtra os agendamentos com base nos critérios
     
+    Usa o índice de filtros do dataset (services.filter_engine), o mesmo
+    usado pelo dashboard.
+    
     Args:
         df: DataFrame com dados processados
-        filters: Dicionário com filtros a aplicar
+        filters: Dicionário com filtros a aplicar (galpao, status,
+            data_inicio, data_fim, transportadora)
         
     Returns:
         DataFrame filtrado
     """
-    filtered_df = df.copy()
-    
-    # Filtro por galpão
-    if filters.get('galpao') and 'galpao' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['galpao'] == filters['galpao']]
-    
-    # Filtro por status
-    if filters.get('status') and 'status' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['status'] == filters['status']]
-    
-    # Filtro por data (período)
-    if filters.get('data_inicio') and 'dtagendamento' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['dtagendamento'] >= filters['data_inicio']]
-    
-    if filters.get('data_fim') and 'dtagendamento' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['dtagendamento'] <= filters['data_fim']]
-    
-    # Filtro por transportadora
-    if filters.get('transportadora') and 'nome_transportadora' in filtered_df.columns:
-        filtered_df = filtered_df[
-            filtered_df['nome_transportadora'].str.contains(
-                filters['transportadora'], case=False, na=False
-            )
-        ]
-    
-    return filtered_df
\ No newline at end of file
+    return filter_dataframe(
+        df,
+        data_inicio=filters.get('data_inicio') or None,
+        data_fim=filters.get('data_fim') or None,
+        status=filters.get('status') or None,
+        deposito=filters.get('galpao') or None,
+        transportadora=filters.get('transportadora') or None
+    )
@@ -0,0 +1,78 @@
+"""
+Estruturas derivadas (índices, agregados) por versão do dataset
+"""
+import itertools
+import threading
+import weakref
+import pandas as pd
+from typing import Any, Callable, Dict
+
+# id(DataFrame) -> {'version': int, 'derived': {nome: valor}, 'lock': Lock}
+_entries: Dict[int, Dict[str, Any]] = {}
+_lock = threading.Lock()
+_versions = itertools.count(1)
+
+
+def _discard(key: int):
+    """Remove as estruturas de um DataFrame coletado pelo garbage collector"""
+    with _lock:
+        _entries.pop(key, None)
+
+
+def _entry(df: pd.DataFrame) -> Dict[str, Any]:
+    """Retorna (criando se necessário) o registro do DataFrame"""
+    key = id(df)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry['ref']() is not df:
+            entry = {
+                'ref': weakref.ref(df),
+                'version': next(_versions),
+                'derived': {},
+                'lock': threading.Lock()
+            }
+            _entries[key] = entry
+            weakref.finalize(df, _discard, key)
+        return entry
+
+
+def dataset_version(df: pd.DataFrame) -> int:
+    """
+    Retorna um número de versão único para o objeto DataFrame
+    
+    O mesmo objeto (por exemplo, o DataFrame compartilhado pelo cache entre
+    sessões) sempre tem a mesma versão; cada novo DataFrame recebe outra.
+    
+    Args:
+        df: DataFrame do dataset
+        
+    Returns:
+        Versão do dataset
+    """
+    return _entry(df)['version']
+
+
+def get_derived(df: pd.DataFrame, name: str, builder: Callable[[pd.DataFrame], Any]) -> Any:
+    """
+    Retorna uma estrutura derivada do DataFrame, construída uma única vez
+    
+    A estrutura é compartilhada entre sessões e descartada junto com o
+    DataFrame. O builder não deve guardar referência ao DataFrame.
+    
+    Args:
+        df: DataFrame do dataset
+        name: Nome da estrutura derivada
+        builder: Função que recebe o DataFrame e constrói a estrutura
+        
+    Returns:
+        Estrutura derivada
+    """
+    entry = _entry(df)
+    derived = entry['derived']
+    if name in derived:
+        return derived[name]
+    
+    with entry['lock']:
+        if name not in derived:
+            derived[name] = builder(df)
+        return derived[name]
@@ -0,0 +1,182 @@
+"""
+Exportação dos agendamentos (CSV, Excel, Parquet) gerada sob demanda e cacheada
+"""
+import io
+import pandas as pd
+import streamlit as st
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from services.cache import AgendamentosCache
+from services.dataset_cache import dataset_version
+from src.core.timing import timed
+from src.core.config import CACHE_TTL_SECONDS, EXPORT_CACHE_MAX_ENTRIES, EXCEL_WRITE_ONLY_MIN_ROWS
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serializa o DataFrame em CSV (UTF-8)
+
+    Args:
+        df: DataFrame a exportar
+
+    Returns:
+        Conteúdo do arquivo
+    """
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def to_csv_gzip_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serializa o DataFrame em CSV compactado com gzip
+
+    Args:
+        df: DataFrame a exportar
+
+    Returns:
+        Conteúdo do arquivo (.csv.gz)
+    """
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8', compression={'method': 'gzip', 'compresslevel': 6, 'mtime': 0})
+    return buffer.getvalue()
+
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serializa o DataFrame em Parquet (pyarrow)
+
+    Preserva o schema tipado (datas, category, Int64, float32): o arquivo
+    é lido de volta com ``pd.read_parquet`` sem conversões.
+
+    Args:
+        df: DataFrame a exportar
+
+    Returns:
+        Conteúdo do arquivo
+    """
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine='pyarrow', index=False, compression='zstd')
+    return buffer.getvalue()
+
+
+def to_excel_bytes(df: pd.DataFrame, sheet_name: str = 'Dados') -> bytes:
+    """
+    Serializa o DataFrame em XLSX
+
+    Até EXCEL_WRITE_ONLY_MIN_ROWS linhas usa o ExcelWriter do pandas (com
+    cabeçalho formatado); acima disso grava com openpyxl em modo
+    write-only, que escreve as linhas em sequência com memória constante.
+
+    Args:
+        df: DataFrame a exportar
+        sheet_name: Nome da planilha
+
+    Returns:
+        Conteúdo do arquivo
+    """
+    buffer = io.BytesIO()
+    if len(df) < EXCEL_WRITE_ONLY_MIN_ROWS:
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+        return buffer.getvalue()
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    sheet.append([str(col) for col in df.columns])
+    # Valores nulos (NaN/NaT/NA) viram células vazias
+    colunas = [
+        df[col].astype(object).where(df[col].notna(), None).tolist()
+        for col in df.columns
+    ]
+    for linha in zip(*colunas):
+        sheet.append(linha)
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+# formato -> (extensão, MIME, função que gera o arquivo)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, Callable[..., bytes]]] = {
+    'csv': ('csv', 'text/csv', to_csv_bytes),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', to_excel_bytes),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', to_parquet_bytes),
+    'csv.gz': ('csv.gz', 'application/gzip', to_csv_gzip_bytes),
+}
+
+# Rótulos dos botões de download
+EXPORT_LABELS = {
+    'csv': "📥 Download CSV",
+    'xlsx': "📥 Download Excel",
+    'parquet': "📥 Download Parquet",
+    'csv.gz': "📥 Download CSV (gzip)",
+}
+
+
+def export_bytes(
+    df: pd.DataFrame,
+    formato: str,
+    cache_key: Optional[Hashable] = None,
+    sheet_name: str = 'Dados'
+) -> bytes:
+    """
+    Gera (ou reaproveita do cache) o arquivo de exportação
+
+    Args:
+        df: DataFrame a exportar
+        formato: Chave de EXPORT_FORMATS
+        cache_key: Identifica o conteúdo de ``df`` (ex.: versão do dataset
+            original + filtros, ver filter_cache_key). Se None, usa a
+            versão do próprio DataFrame.
+        sheet_name: Nome da planilha (apenas XLSX)
+
+    Returns:
+        Conteúdo do arquivo
+    """
+    if formato not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+
+    _, _, builder = EXPORT_FORMATS[formato]
+    chave = (cache_key if cache_key is not None else dataset_version(df), formato, sheet_name)
+
+    def _gerar() -> bytes:
+        with timed(f"exportação {formato}"):
+            if formato == 'xlsx':
+                return builder(df, sheet_name=sheet_name)
+            return builder(df)
+
+    return get_export_cache().get_or_load(chave, _gerar)
+
+
+def render_download_button(
+    df: pd.DataFrame,
+    formato: str,
+    filename_base: str,
+    cache_key: Optional[Hashable] = None,
+    sheet_name: str = 'Dados'
+):
+    """
+    Renderiza um botão de download que gera o arquivo apenas no clique
+
+    Args:
+        df: DataFrame a exportar
+        formato: Chave de EXPORT_FORMATS
+        filename_base: Nome do arquivo sem extensão
+        cache_key: Ver export_bytes
+        sheet_name: Nome da planilha (apenas XLSX)
+    """
+    extensao, mime, _ = EXPORT_FORMATS[formato]
+    st.download_button(
+        EXPORT_LABELS.get(formato, f"📥 Download {extensao.upper()}"),
+        lambda: export_bytes(df, formato, cache_key, sheet_name),
+        f"{filename_base}.{extensao}",
+        mime,
+        on_click="ignore",
+        width="stretch"
+    )
+
+
+# Factory function com cache (instância única compartilhada entre sessões)
+@st.cache_resource
+def get_export_cache():
+    """Retorna o cache compartilhado dos arquivos exportados"""
+    return AgendamentosCache(ttl_seconds=CACHE_TTL_SECONDS, max_entries=EXPORT_CACHE_MAX_ENTRIES)
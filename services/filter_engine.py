@@ -0,0 +1,193 @@
+"""
+Motor de filtros com índices pré-calculados por dataset
+"""
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from functools import reduce
+from typing import Dict, Optional
+
+from services.dataset_cache import dataset_version, get_derived
+from services.search_index import get_search_index
+from src.core.utils import ensure_datetime
+
+# Colunas usadas nos filtros do dashboard
+DATE_COLUMN = 'Data Agendamento'
+STATUS_COLUMN = 'Status da Entrega'
+DEPOSITO_COLUMN = 'Depósito'
+TRANSPORTADORA_COLUMN = 'Transportadora'
+
+
+def _value_positions(series: pd.Series) -> Dict[object, np.ndarray]:
+    """Mapeia cada valor da coluna para as posições (ordenadas) das linhas"""
+    return {
+        valor: np.asarray(posicoes, dtype=np.int64)
+        for valor, posicoes in series.groupby(series, observed=True, sort=False).indices.items()
+    }
+
+
+class FilterIndex:
+    """
+    Índices de um dataset para os filtros de período, status e depósito
+    
+    Guarda as datas ordenadas (para recortar o período com searchsorted) e
+    as posições das linhas de cada status e depósito. Filtros combinados
+    são a interseção dessas posições, sem varrer nem copiar o DataFrame.
+    Não mantém referência ao DataFrame.
+    """
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        date_column: str = DATE_COLUMN,
+        status_column: str = STATUS_COLUMN,
+        deposito_column: str = DEPOSITO_COLUMN
+    ):
+        self.n_rows = len(df)
+        self._date_values: Optional[np.ndarray] = None
+        self._date_positions: Optional[np.ndarray] = None
+        
+        if date_column in df.columns:
+            datas = ensure_datetime(df[date_column]).astype('datetime64[ns]')
+            valores = datas.to_numpy().view('i8')
+            validas = np.flatnonzero(~datas.isna().to_numpy())
+            ordem = np.argsort(valores[validas], kind='stable')
+            self._date_values = valores[validas][ordem]
+            self._date_positions = validas[ordem]
+        
+        self._status = _value_positions(df[status_column]) if status_column in df.columns else None
+        self._deposito = _value_positions(df[deposito_column]) if deposito_column in df.columns else None
+    
+    def status_values(self) -> list:
+        """Valores distintos de status (ordenados)"""
+        return sorted(self._status) if self._status is not None else []
+    
+    def deposito_values(self) -> list:
+        """Valores distintos de depósito (ordenados)"""
+        return sorted(self._deposito) if self._deposito is not None else []
+    
+    def select(
+        self,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        status: Optional[str] = None,
+        deposito: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Retorna as posições (em ordem crescente) das linhas que atendem aos filtros
+        
+        Datas (``date``) filtram o dia inteiro; ``datetime`` filtra o instante.
+        Filtros sobre colunas inexistentes são ignorados.
+        
+        Args:
+            data_inicio: Início do período (inclusivo)
+            data_fim: Fim do período (inclusivo)
+            status: Status da entrega
+            deposito: Depósito
+            
+        Returns:
+            Array de posições das linhas
+        """
+        candidatos = []
+        
+        if (data_inicio is not None or data_fim is not None) and self._date_values is not None:
+            inicio = 0
+            fim = len(self._date_values)
+            if data_inicio is not None:
+                inicio = np.searchsorted(self._date_values, _lower_bound(data_inicio), side='left')
+            if data_fim is not None:
+                fim = np.searchsorted(self._date_values, _upper_bound(data_fim), side='left')
+            candidatos.append(np.sort(self._date_positions[inicio:max(inicio, fim)]))
+        
+        vazio = np.empty(0, dtype=np.int64)
+        if status is not None and self._status is not None:
+            candidatos.append(self._status.get(status, vazio))
+        if deposito is not None and self._deposito is not None:
+            candidatos.append(self._deposito.get(deposito, vazio))
+        
+        if not candidatos:
+            return np.arange(self.n_rows)
+        
+        # Interseção começando pelo menor conjunto
+        candidatos.sort(key=len)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), candidatos)
+
+
+def _lower_bound(valor: date) -> int:
+    """Limite inferior (ns) do filtro de período"""
+    return pd.Timestamp(valor).as_unit('ns').value
+
+
+def _upper_bound(valor: date) -> int:
+    """Limite superior exclusivo (ns) do filtro de período"""
+    if isinstance(valor, datetime):
+        return pd.Timestamp(valor).as_unit('ns').value + 1
+    # Data sem horário: inclui o dia inteiro
+    return (pd.Timestamp(valor) + pd.Timedelta(days=1)).as_unit('ns').value
+
+
+def get_filter_index(df: pd.DataFrame) -> FilterIndex:
+    """
+    Retorna o índice de filtros do dataset (construído uma única vez)
+    
+    Args:
+        df: DataFrame processado
+    """
+    return get_derived(df, 'filter_index', FilterIndex)
+
+
+def filter_cache_key(df: pd.DataFrame, **filtros) -> tuple:
+    """
+    Chave que identifica o resultado de um filtro sobre o dataset
+    
+    Combina a versão do DataFrame original com os valores dos filtros, para
+    cachear estruturas derivadas do DataFrame filtrado (que é um objeto novo
+    a cada rerun).
+    
+    Args:
+        df: DataFrame original (antes de filtrar)
+        **filtros: Valores dos filtros (None = sem filtro)
+        
+    Returns:
+        Tupla hashable
+    """
+    return (dataset_version(df),) + tuple(sorted((nome, valor) for nome, valor in filtros.items()))
+
+
+def filter_dataframe(
+    df: pd.DataFrame,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    status: Optional[str] = None,
+    deposito: Optional[str] = None,
+    transportadora: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Filtra o DataFrame processado usando o índice do dataset
+    
+    Sem nenhum filtro efetivo, devolve o próprio DataFrame (sem cópia).
+    
+    Args:
+        df: DataFrame processado
+        data_inicio: Início do período (inclusivo)
+        data_fim: Fim do período (inclusivo)
+        status: Status da entrega
+        deposito: Depósito
+        transportadora: Trecho do nome da transportadora (sem distinção de
+            maiúsculas e acentos)
+        
+    Returns:
+        DataFrame filtrado
+    """
+    if df.empty:
+        return df
+    
+    posicoes = get_filter_index(df).select(data_inicio, data_fim, status, deposito)
+    
+    if transportadora and TRANSPORTADORA_COLUMN in df.columns:
+        encontradas = get_search_index(df, TRANSPORTADORA_COLUMN).search(transportadora)
+        posicoes = np.intersect1d(posicoes, encontradas, assume_unique=True)
+    
+    if len(posicoes) == len(df):
+        return df
+    return df.iloc[posicoes]
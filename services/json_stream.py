@@ -0,0 +1,147 @@
+"""
+Decodificação incremental (streaming) de respostas JSON da API WMS
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator, List
+
+# Tamanho a partir do qual o trecho já consumido do buffer é descartado
+_COMPACT_THRESHOLD = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+class _StreamBuffer:
+    """Buffer de texto alimentado por chunks de bytes (UTF-8)"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        """Lê o próximo chunk; retorna False se o stream terminou"""
+        if self.exhausted:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.pos >= _COMPACT_THRESHOLD:
+                self.text = self.text[self.pos:]
+                self.pos = 0
+            self.text += self._decoder.decode(chunk)
+            return True
+        self.text += self._decoder.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """Próximo caractere não branco (sem consumir); vazio no fim do stream"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read_more():
+                return ""
+
+    def expect(self, char: str):
+        """Consome o caractere esperado"""
+        if self.peek() != char:
+            raise ValueError(f"JSON inválido: esperado '{char}' na posição {self.pos}")
+        self.pos += 1
+
+    def decode_value(self, decoder: json.JSONDecoder) -> Any:
+        """Decodifica o próximo valor JSON completo, lendo mais dados se necessário"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            # Um número no fim do buffer pode estar incompleto ("7." de "7.25")
+            if (
+                isinstance(value, (int, float))
+                and not self.exhausted
+                and (end == len(self.text) or self.text[end] in _NUMBER_CHARS)
+            ):
+                if self.read_more():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "agendamentos") -> Iterator[Any]:
+    """
+    Decodifica os itens de um array JSON à medida que os bytes chegam
+
+    Aceita um array na raiz ou um objeto cujo campo ``key`` é o array (os
+    demais campos do objeto são ignorados). Só um item decodificado e o
+    trecho ainda não consumido do texto ficam em memória.
+
+    Args:
+        chunks: Bytes da resposta (ex.: ``response.iter_content()``)
+        key: Campo do objeto raiz que contém o array
+
+    Yields:
+        Cada item do array
+
+    Raises:
+        ValueError: JSON inválido ou campo ``key`` que não é uma lista
+    """
+    buffer = _StreamBuffer(chunks)
+    decoder = json.JSONDecoder()
+
+    inicio = buffer.peek()
+    if inicio == "{":
+        buffer.expect("{")
+        while True:
+            if buffer.peek() == "}":
+                return
+            campo = buffer.decode_value(decoder)
+            buffer.expect(":")
+            if campo == key:
+                if buffer.peek() != "[":
+                    raise ValueError(f"Campo '{key}' não é uma lista")
+                break
+            buffer.decode_value(decoder)
+            if buffer.peek() == ",":
+                buffer.pos += 1
+    elif inicio != "[":
+        raise ValueError("Formato de resposta inválido")
+
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        return
+    while True:
+        yield buffer.decode_value(decoder)
+        separador = buffer.peek()
+        if separador == "]":
+            return
+        buffer.expect(",")
+
+
+def iter_lotes(itens: Iterable[Any], tamanho: int) -> Iterator[List[Any]]:
+    """
+    Agrupa itens em listas de até ``tamanho`` elementos
+
+    Args:
+        itens: Itens a agrupar
+        tamanho: Tamanho máximo de cada lote
+
+    Yields:
+        Listas de itens
+    """
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
@@ -0,0 +1,65 @@
+"""
+Paginação no servidor dos DataFrames exibidos em tabela
+"""
+import math
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+
+def page_count(total_rows: int, page_size: int) -> int:
+    """
+    Calcula o número de páginas (mínimo 1)
+
+    Args:
+        total_rows: Total de linhas
+        page_size: Linhas por página
+
+    Returns:
+        Quantidade de páginas
+    """
+    return max(1, math.ceil(total_rows / page_size))
+
+
+def sort_positions(df: pd.DataFrame, sort_column: str, ascending: bool = True) -> np.ndarray:
+    """
+    Calcula a ordem das linhas por uma coluna, sem reordenar o DataFrame
+
+    Ordenação estável, com valores nulos no final.
+
+    Args:
+        df: DataFrame a ordenar
+        sort_column: Coluna de ordenação
+        ascending: Ordem crescente
+
+    Returns:
+        Posições das linhas na ordem desejada
+    """
+    valores = df[sort_column].reset_index(drop=True)
+    return valores.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+def paginate_dataframe(
+    df: pd.DataFrame,
+    page: int,
+    page_size: int,
+    positions: Optional[np.ndarray] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Retorna apenas as linhas de uma página
+
+    Args:
+        df: DataFrame completo (já filtrado)
+        page: Página desejada (começando em 1; limitada ao intervalo válido)
+        page_size: Linhas por página
+        positions: Ordem das linhas (ver sort_positions); None mantém a ordem atual
+
+    Returns:
+        Tupla (linhas da página, página efetivamente exibida)
+    """
+    page = min(max(1, page), page_count(len(df), page_size))
+    inicio = (page - 1) * page_size
+    fim = inicio + page_size
+    if positions is None:
+        return df.iloc[inicio:fim], page
+    return df.iloc[positions[inicio:fim]], page
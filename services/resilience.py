@@ -0,0 +1,253 @@
+"""
+Retries com backoff e circuit breaker para as chamadas à API WMS
+"""
+import asyncio
+import random
+import threading
+import time
+import requests
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.core.config import (
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+)
+from src.core.logger import logger
+
+# Status que indicam token inválido (502: erros gerados pelo JWT, segundo a documentação da API)
+REAUTH_STATUS = {401, 502}
+# Status temporários que valem nova tentativa
+RETRYABLE_STATUS = {429} | set(range(500, 600))
+
+# Retorno de ResilientCaller._on_failure: reautenticar e repetir a chamada
+_REAUTH = object()
+
+
+class CircuitOpenError(Exception):
+    """Circuito aberto: a API está indisponível e a chamada não foi feita"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker thread-safe (fechado → aberto → meio-aberto)
+    
+    Após ``failure_threshold`` falhas consecutivas o circuito abre e as
+    chamadas falham imediatamente por ``reset_timeout`` segundos. Depois
+    disso uma chamada de teste é liberada: sucesso fecha o circuito, falha
+    o reabre.
+    """
+    
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Indica se a chamada pode ser feita"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                return True
+            if self.state == "half_open":
+                # Apenas uma chamada de teste por vez
+                return False
+            return True
+    
+    def record_success(self):
+        """Registra sucesso (fecha o circuito)"""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+    
+    def record_failure(self):
+        """Registra falha (abre o circuito ao atingir o limite)"""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning("Circuit breaker aberto - Falhas consecutivas: %d", self.failures)
+
+
+class ResilientCaller:
+    """
+    Executa chamadas com retries (backoff exponencial com jitter) e circuit breaker
+    
+    - Timeout/erro de conexão, 429 e 5xx: nova tentativa (respeita Retry-After)
+    - 401/502: descarta o token (``on_unauthorized``) e tenta de novo uma vez
+    - Outros erros: propagados sem nova tentativa
+    """
+    
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.reauths = 0
+        self.short_circuits = 0
+    
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Tempo de espera antes da próxima tentativa (full jitter)
+        
+        Args:
+            attempt: Número da tentativa que falhou (0 = primeira)
+            retry_after: Valor do header Retry-After, se houver
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def call(self, fn: Callable[[], Any], on_unauthorized: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Executa ``fn`` aplicando a política de retries e o circuit breaker
+        
+        Args:
+            fn: Chamada sem argumentos
+            on_unauthorized: Chamado em 401/502 antes de tentar novamente
+            
+        Returns:
+            Resultado de ``fn``
+            
+        Raises:
+            CircuitOpenError: Circuito aberto (a chamada não foi feita)
+        """
+        self._check_circuit()
+        reautenticado = False
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                espera = self._on_failure(e, attempt, not reautenticado and on_unauthorized is not None)
+                if espera is None:
+                    raise
+                if espera is _REAUTH:
+                    reautenticado = True
+                    on_unauthorized()
+                    continue
+                self._sleep(espera)
+                attempt += 1
+                continue
+            
+            self.breaker.record_success()
+            return result
+    
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        on_unauthorized: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """
+        Versão assíncrona de ``call`` (mesma política; espera com asyncio.sleep)
+        
+        Args:
+            fn: Função sem argumentos que retorna a corrotina da chamada
+            on_unauthorized: Chamado em 401/502 antes de tentar novamente
+            
+        Returns:
+            Resultado da corrotina
+            
+        Raises:
+            CircuitOpenError: Circuito aberto (a chamada não foi feita)
+        """
+        self._check_circuit()
+        reautenticado = False
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                espera = self._on_failure(e, attempt, not reautenticado and on_unauthorized is not None)
+                if espera is None:
+                    raise
+                if espera is _REAUTH:
+                    reautenticado = True
+                    on_unauthorized()
+                    continue
+                await asyncio.sleep(espera)
+                attempt += 1
+                continue
+            
+            self.breaker.record_success()
+            return result
+    
+    def _check_circuit(self):
+        """Levanta CircuitOpenError se o circuito não permite a chamada"""
+        if not self.breaker.allow_request():
+            self._count('short_circuits')
+            raise CircuitOpenError("API WMS indisponível (circuit breaker aberto)")
+    
+    def _on_failure(self, error: Exception, attempt: int, pode_reautenticar: bool):
+        """
+        Decide o que fazer após uma tentativa que falhou
+        
+        Returns:
+            _REAUTH para reautenticar e repetir, o tempo de espera (segundos)
+            antes da próxima tentativa, ou None para propagar o erro
+        """
+        if getattr(error, 'status_code', None) in REAUTH_STATUS and pode_reautenticar:
+            self._count('reauths')
+            return _REAUTH
+        
+        if not _is_retryable(error):
+            # Erro do cliente: a API respondeu, não conta como indisponibilidade
+            self.breaker.record_success()
+            return None
+        
+        if attempt + 1 >= self.max_attempts:
+            self.breaker.record_failure()
+            return None
+        
+        self._count('retries')
+        return self.backoff(attempt, getattr(error, 'retry_after', None))
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de resiliência
+        
+        Returns:
+            Dicionário com retries, reautenticações, chamadas bloqueadas,
+            aberturas do circuito e estado atual
+        """
+        with self._lock:
+            return {
+                'retries': self.retries,
+                'reauths': self.reauths,
+                'short_circuits': self.short_circuits,
+                'breaker_trips': self.breaker.trips,
+                'breaker_state': self.breaker.state
+            }
+    
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Indica se o erro é temporário (vale nova tentativa)"""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if getattr(error, 'retryable', False):
+        return True
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS
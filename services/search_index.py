@@ -0,0 +1,72 @@
+"""
+Índice de busca por trecho de texto sobre os valores distintos de uma coluna
+"""
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from services.dataset_cache import get_derived
+
+
+def normalize_text(valor: str) -> str:
+    """
+    Normaliza texto para busca: sem acentos e em minúsculas
+    
+    Args:
+        valor: Texto original
+        
+    Returns:
+        Texto normalizado (ex.: "São Paulo" -> "sao paulo")
+    """
+    decomposto = unicodedata.normalize('NFKD', valor)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+class TextSearchIndex:
+    """
+    Busca por trecho (sem distinção de maiúsculas/acentos) numa coluna
+    
+    Guarda os valores distintos já normalizados e, para cada um, as posições
+    das linhas. Uma consulta varre apenas os valores distintos (algumas
+    centenas) em vez de todas as linhas. Não mantém referência ao DataFrame.
+    """
+    
+    def __init__(self, series: pd.Series):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.n_rows = len(series)
+        self._normalized = [normalize_text(str(valor)) for valor in uniques]
+        
+        # Posições agrupadas por valor: _order[_bounds[i]:_bounds[i + 1]] são as linhas do valor i
+        self._order = np.argsort(codes, kind='stable')
+        self._bounds = np.searchsorted(codes[self._order], np.arange(len(uniques) + 1), side='left')
+    
+    def search(self, query: str) -> np.ndarray:
+        """
+        Retorna as posições (em ordem crescente) das linhas que contêm o trecho
+        
+        Args:
+            query: Trecho buscado
+            
+        Returns:
+            Array de posições das linhas
+        """
+        trecho = normalize_text(query)
+        blocos = [
+            self._order[self._bounds[i]:self._bounds[i + 1]]
+            for i, valor in enumerate(self._normalized)
+            if trecho in valor
+        ]
+        if not blocos:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(blocos))
+
+
+def get_search_index(df: pd.DataFrame, column: str) -> TextSearchIndex:
+    """
+    Retorna o índice de busca da coluna do dataset (construído uma única vez)
+    
+    Args:
+        df: DataFrame processado
+        column: Coluna indexada (ex.: Transportadora, Fornecedor, Motorista)
+    """
+    return get_derived(df, f'search_index:{column}', lambda data: TextSearchIndex(data[column]))
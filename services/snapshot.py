@@ -0,0 +1,89 @@
+"""
+Snapshot local (Parquet) do DataFrame processado de agendamentos
+"""
+import json
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from src.core.config import SNAPSHOT_PATH, SNAPSHOT_SCHEMA_VERSION
+from src.core.logger import log_error, logger
+
+# Chave dos metadados do snapshot no schema Parquet
+SNAPSHOT_METADATA_KEY = b"wms_snapshot"
+
+
+def save_snapshot(df: pd.DataFrame, path: str = SNAPSHOT_PATH) -> bool:
+    """
+    Grava o DataFrame processado em Parquet com versão de schema e data
+    
+    A escrita é feita num arquivo temporário exclusivo e movida no final,
+    para que uma leitura concorrente nunca veja um arquivo pela metade e
+    gravações simultâneas não compartilhem o mesmo temporário.
+    
+    Args:
+        df: DataFrame processado
+        path: Caminho do arquivo Parquet
+        
+    Returns:
+        True se o snapshot foi gravado
+    """
+    if df is None or df.empty:
+        return False
+    
+    tmp_path = None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[SNAPSHOT_METADATA_KEY] = json.dumps({
+            'schema_version': SNAPSHOT_SCHEMA_VERSION,
+            'written_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': len(df)
+        }).encode()
+        table = table.replace_schema_metadata(metadata)
+        
+        diretorio = os.path.dirname(path) or "."
+        os.makedirs(diretorio, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+        os.close(fd)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        log_error(e, "save_snapshot")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    Lê o snapshot local, se existir e tiver a versão de schema atual
+    
+    Args:
+        path: Caminho do arquivo Parquet
+        
+    Returns:
+        Tupla (DataFrame, metadados) ou None se ausente/incompatível
+    """
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        table = pq.read_table(path)
+        raw_meta = (table.schema.metadata or {}).get(SNAPSHOT_METADATA_KEY)
+        meta = json.loads(raw_meta) if raw_meta else {}
+        
+        if meta.get('schema_version') != SNAPSHOT_SCHEMA_VERSION:
+            logger.info("Snapshot ignorado - versão de schema %s", meta.get('schema_version'))
+            return None
+        
+        meta['written_at'] = datetime.fromisoformat(meta['written_at'])
+        return table.to_pandas(), meta
+    except Exception as e:
+        log_error(e, "load_snapshot")
+        return None
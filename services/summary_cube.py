@@ -0,0 +1,233 @@
+"""
+Cubo pré-agregado para o resumo e os gráficos do dashboard
+"""
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from services.dataset_cache import get_derived
+from services.filter_engine import DATE_COLUMN, STATUS_COLUMN, DEPOSITO_COLUMN
+from src.core.utils import ensure_datetime
+from src.core.config import TIMESERIES_MAX_POINTS
+
+MATERIAL_COLUMN = 'Descrição do Material'
+DIMENSIONS = ['dia', 'status', 'deposito']
+
+# granularidade -> (dias por ponto, regra do resample)
+GRANULARITIES = {
+    'dia': (1, 'D'),
+    'semana': (7, 'W-MON'),
+    'mes': (31, 'MS'),
+}
+
+
+class SummaryCube:
+    """
+    Agregados por (dia, status, depósito) de um dataset
+    
+    Guarda, por célula, a quantidade de linhas (pedidos), agendamentos
+    distintos, peso, volume e a maior data de agendamento, além da contagem
+    de materiais por célula. O resumo e os gráficos de qualquer combinação
+    de filtros de período/status/depósito são reduções desse cubo, que tem
+    poucas linhas, em vez de novas varreduras do DataFrame.
+    
+    Cada agendamento pertence a uma única célula (todas as suas linhas têm
+    o mesmo dia, status e depósito), por isso a soma de agendamentos
+    distintos por célula é o total de agendamentos distintos.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self.has_status = STATUS_COLUMN in df.columns
+        self.has_deposito = DEPOSITO_COLUMN in df.columns
+        self.has_date = DATE_COLUMN in df.columns
+        self.has_documento = 'Documento de Compra' in df.columns
+        self.has_material = MATERIAL_COLUMN in df.columns
+        
+        vazio = pd.Series(np.nan, index=df.index, dtype=object)
+        datas = ensure_datetime(df[DATE_COLUMN]) if self.has_date else pd.Series(pd.NaT, index=df.index)
+        base = pd.DataFrame({
+            'dia': datas.dt.normalize(),
+            'status': df[STATUS_COLUMN] if self.has_status else vazio,
+            'deposito': df[DEPOSITO_COLUMN] if self.has_deposito else vazio,
+            'linhas': 1,
+            'peso': _as_float(df, 'Peso (kg)'),
+            'volume': _as_float(df, 'Quantidade de Volume'),
+            'id': df['ID'] if 'ID' in df.columns else vazio,
+            'data': datas,
+        })
+        
+        self.cells = base.groupby(DIMENSIONS, dropna=False, observed=True, sort=False).agg(
+            linhas=('linhas', 'sum'),
+            agendamentos=('id', 'nunique'),
+            peso=('peso', 'sum'),
+            volume=('volume', 'sum'),
+            data_max=('data', 'max'),
+        ).reset_index()
+        
+        if self.has_material:
+            material = df[MATERIAL_COLUMN]
+            validos = (material.notna() & (material != '') & (material != 'None')).to_numpy(dtype=bool)
+            self.materials = base.loc[validos, DIMENSIONS].assign(material=material[validos]).groupby(
+                DIMENSIONS + ['material'], dropna=False, observed=True, sort=False
+            ).size().reset_index(name='linhas')
+        else:
+            self.materials = pd.DataFrame(columns=DIMENSIONS + ['material', 'linhas'])
+    
+    def _mask(
+        self,
+        table: pd.DataFrame,
+        data_inicio: Optional[date],
+        data_fim: Optional[date],
+        status: Optional[str],
+        deposito: Optional[str]
+    ) -> np.ndarray:
+        """Máscara das células que atendem aos filtros (período por dia)"""
+        mask = np.ones(len(table), dtype=bool)
+        if data_inicio is not None and self.has_date:
+            mask &= (table['dia'] >= pd.Timestamp(data_inicio).normalize()).to_numpy(dtype=bool)
+        if data_fim is not None and self.has_date:
+            mask &= (table['dia'] <= pd.Timestamp(data_fim).normalize()).to_numpy(dtype=bool)
+        if status is not None and self.has_status:
+            mask &= (table['status'] == status).to_numpy(dtype=bool)
+        if deposito is not None and self.has_deposito:
+            mask &= (table['deposito'] == deposito).to_numpy(dtype=bool)
+        return mask
+    
+    def select(self, data_inicio=None, data_fim=None, status=None, deposito=None) -> pd.DataFrame:
+        """
+        Células do cubo que atendem aos filtros
+        
+        Args:
+            data_inicio: Início do período (inclusivo, por dia)
+            data_fim: Fim do período (inclusivo, por dia)
+            status: Status da entrega
+            deposito: Depósito
+        """
+        return self.cells[self._mask(self.cells, data_inicio, data_fim, status, deposito)]
+    
+    def summary(self, data_inicio=None, data_fim=None, status=None, deposito=None) -> Dict[str, Any]:
+        """
+        Resumo no mesmo formato de create_agendamentos_summary
+        
+        Returns:
+            Dicionário com métricas de resumo
+        """
+        cells = self.select(data_inicio, data_fim, status, deposito)
+        if cells.empty:
+            return {
+                'total_agendamentos': 0,
+                'total_pedidos': 0,
+                'galpoes_unicos': 0,
+                'status_counts': {},
+                'galpao_counts': {},
+                'peso_total': 0,
+                'volume_total': 0
+            }
+        
+        galpao_counts = _counts_by(cells, 'deposito') if self.has_deposito else pd.Series(dtype='int64')
+        return {
+            'total_agendamentos': int(cells['agendamentos'].sum()),
+            'total_pedidos': int(cells['linhas'].sum()) if self.has_documento else 0,
+            'galpoes_unicos': len(galpao_counts),
+            'status_counts': _counts_by(cells, 'status').to_dict() if self.has_status else {},
+            'galpao_counts': galpao_counts.to_dict(),
+            'peso_total': cells['peso'].sum(),
+            'volume_total': cells['volume'].sum(),
+            'data_recente': cells['data_max'].max() if self.has_date else None
+        }
+    
+    def deposito_counts(self, data_inicio=None, data_fim=None, status=None, deposito=None) -> pd.Series:
+        """Quantidade de linhas por depósito (ordem decrescente)"""
+        return _counts_by(self.select(data_inicio, data_fim, status, deposito), 'deposito')
+    
+    def daily_counts(self, data_inicio=None, data_fim=None, status=None, deposito=None) -> pd.Series:
+        """Quantidade de linhas por dia (índice de datas em ordem crescente)"""
+        cells = self.select(data_inicio, data_fim, status, deposito)
+        cells = cells[cells['dia'].notna()]
+        return cells.groupby('dia')['linhas'].sum().sort_index()
+    
+    def timeseries_counts(
+        self,
+        max_points: int = TIMESERIES_MAX_POINTS,
+        data_inicio=None,
+        data_fim=None,
+        status=None,
+        deposito=None
+    ) -> Tuple[pd.Series, str]:
+        """Série de linhas por dia/semana/mês com no máximo ~max_points pontos (ver bucket_counts)"""
+        serie_diaria = self.daily_counts(data_inicio, data_fim, status, deposito)
+        return bucket_counts(serie_diaria, data_inicio, data_fim, max_points)
+    
+    def top_materials(self, n: int = 5, data_inicio=None, data_fim=None, status=None, deposito=None) -> pd.Series:
+        """Materiais com mais linhas (ordem decrescente)"""
+        materials = self.materials[self._mask(self.materials, data_inicio, data_fim, status, deposito)]
+        return _counts_by(materials, 'material').head(n)
+
+
+def bucket_counts(
+    serie_diaria: pd.Series,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    max_points: int = TIMESERIES_MAX_POINTS
+) -> Tuple[pd.Series, str]:
+    """
+    Agrupa a série diária em dia, semana ou mês conforme o período
+    
+    Escolhe a menor granularidade em que o período selecionado (ou o da
+    série, se não houver seleção) cabe em ``max_points`` pontos. Semanas
+    começam na segunda-feira e meses no dia 1; cada ponto é a soma do
+    período, rotulado pela data inicial.
+    
+    Args:
+        serie_diaria: Contagens por dia (índice de datas em ordem crescente)
+        data_inicio: Início do período selecionado
+        data_fim: Fim do período selecionado
+        max_points: Número máximo de pontos desejado
+        
+    Returns:
+        Tupla (série agrupada, granularidade: "dia", "semana" ou "mes")
+    """
+    if serie_diaria.empty:
+        return serie_diaria, 'dia'
+    
+    inicio = pd.Timestamp(data_inicio) if data_inicio is not None else serie_diaria.index.min()
+    fim = pd.Timestamp(data_fim) if data_fim is not None else serie_diaria.index.max()
+    dias = max(1, (fim - inicio).days + 1)
+    
+    for granularidade, (dias_por_ponto, regra) in GRANULARITIES.items():
+        if dias / dias_por_ponto <= max_points or granularidade == 'mes':
+            break
+    
+    if granularidade == 'dia':
+        return serie_diaria, granularidade
+    if regra == 'W-MON':
+        agrupada = serie_diaria.resample(regra, label='left', closed='left').sum()
+    else:
+        agrupada = serie_diaria.resample(regra).sum()
+    return agrupada, granularidade
+
+
+def _as_float(df: pd.DataFrame, column: str) -> pd.Series:
+    """Coluna numérica em float64 (0 se não existir) para somas exatas"""
+    if column not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce').astype('float64')
+
+
+def _counts_by(table: pd.DataFrame, column: str) -> pd.Series:
+    """Soma de linhas por valor da coluna, sem nulos/zeros, em ordem decrescente"""
+    counts = table.groupby(column, observed=True)['linhas'].sum()
+    counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+    counts.index.name = None
+    return counts.astype('int64')
+
+
+def get_summary_cube(df: pd.DataFrame) -> SummaryCube:
+    """
+    Retorna o cubo de resumo do dataset (construído uma única vez)
+    
+    Args:
+        df: DataFrame processado
+    """
+    return get_derived(df, 'summary_cube', SummaryCube)
@@ -0,0 +1,184 @@
+"""
+Sincronização incremental dos agendamentos com a API WMS
+"""
+import threading
+import pandas as pd
+import streamlit as st
+from typing import Dict, Any, List, Optional, Set, Callable, Tuple
+from datetime import datetime, date, timedelta
+
+from services.api_client import WMSAPIClient, get_wms_client
+from services.data_processor import process_agendamentos_data, process_agendamentos_lotes, upsert_agendamentos
+from src.core.utils import parse_wms_dates
+from src.core.config import INCREMENTAL_OVERLAP_DAYS, INCREMENTAL_LOOKAHEAD_DAYS, USE_ASYNC_CLIENT
+
+
+class AgendamentosSync:
+    """
+    Mantém o DataFrame processado atualizado a partir da API
+    
+    A primeira sincronização baixa todo o histórico. As seguintes consultam
+    apenas a janela entre a última ``dtalteracao`` conhecida (menos uma
+    margem de segurança) e alguns dias à frente de hoje, e fazem o upsert
+    por ID dos agendamentos novos ou alterados.
+    
+    A instância é compartilhada entre sessões; as sincronizações são
+    serializadas e ``df`` é sempre substituído (nunca alterado no lugar).
+    """
+    
+    def __init__(
+        self,
+        client: WMSAPIClient,
+        overlap_days: int = INCREMENTAL_OVERLAP_DAYS,
+        lookahead_days: int = INCREMENTAL_LOOKAHEAD_DAYS
+    ):
+        self.client = client
+        self.overlap_days = overlap_days
+        self.lookahead_days = lookahead_days
+        self.df = pd.DataFrame()
+        self.high_water_mark: Optional[datetime] = None
+        self.known_ids: Set[Any] = set()
+        self.last_sync: Optional[datetime] = None
+        self._lock = threading.RLock()
+    
+    @property
+    def has_data(self) -> bool:
+        """Indica se já houve uma sincronização completa"""
+        return self.last_sync is not None
+    
+    def full_sync(self) -> pd.DataFrame:
+        """
+        Baixa todo o histórico e reinicia o estado da sincronização
+        
+        Returns:
+            DataFrame processado com todos os agendamentos
+        """
+        with self._lock:
+            # Resposta lida em streaming e processada em lotes; erros são
+            # propagados e o DataFrame anterior é mantido
+            df = process_agendamentos_lotes(self.client.iter_agendamentos_lotes(todos=True))
+            self._reset_state(df, datetime.now())
+            return self.df
+    
+    def restore(self, df: pd.DataFrame, synced_at: datetime) -> bool:
+        """
+        Restaura o estado a partir de um DataFrame já processado (snapshot)
+        
+        Não sobrescreve um estado existente. A próxima sincronização
+        incremental parte da maior "Data Alteração" do DataFrame (ou da data
+        do snapshot, se a coluna não existir).
+        
+        Args:
+            df: DataFrame processado
+            synced_at: Momento em que os dados foram obtidos da API
+            
+        Returns:
+            True se o estado foi restaurado
+        """
+        with self._lock:
+            if self.has_data or df.empty:
+                return False
+            
+            self._reset_state(df, synced_at)
+            return True
+    
+    def incremental_sync(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, int]:
+        """
+        Busca apenas a janela recente e faz upsert dos agendamentos alterados
+        
+        Sem sincronização anterior, faz uma sincronização completa. O período
+        recente é buscado em janelas concorrentes (ver
+        WMSAPIClient.get_agendamentos_por_janelas).
+        
+        Args:
+            progress_callback: Repassado ao cliente a cada janela concluída
+        
+        Returns:
+            Dicionário com a quantidade de agendamentos novos e atualizados
+        """
+        with self._lock:
+            if not self.has_data:
+                self.full_sync()
+                return {'novos': len(self.known_ids), 'atualizados': 0}
+            
+            inicio, fim = self.periodo_incremental()
+            dados_brutos = self.client.get_agendamentos_por_janelas(inicio, fim, progress_callback=progress_callback)
+            alterados = self._select_changed(dados_brutos or [])
+            
+            novos = sum(1 for item in alterados if item.get('idagendamento') not in self.known_ids)
+            resumo = {'novos': novos, 'atualizados': len(alterados) - novos}
+            
+            if alterados:
+                self.df = upsert_agendamentos(self.df, process_agendamentos_data(alterados))
+                self._update_state(alterados)
+            
+            self.last_sync = datetime.now()
+            return resumo
+    
+    def periodo_incremental(self) -> Tuple[date, date]:
+        """
+        Calcula o período consultado na próxima sincronização incremental
+        
+        Returns:
+            Tupla (data inicial, data final)
+        """
+        hoje = datetime.now().date()
+        referencia = self.high_water_mark.date() if self.high_water_mark else (self.last_sync or datetime.now()).date()
+        inicio = min(referencia, hoje) - timedelta(days=self.overlap_days)
+        fim = hoje + timedelta(days=self.lookahead_days)
+        return inicio, fim
+    
+    def _reset_state(self, df: pd.DataFrame, synced_at: datetime):
+        """Redefine o estado (IDs e high-water mark) a partir do DataFrame processado"""
+        self.df = df
+        self.known_ids = set(df['ID'].dropna().unique().tolist()) if 'ID' in df.columns else set()
+        self.high_water_mark = None
+        if 'Data Alteração' in df.columns:
+            alteracoes = parse_wms_dates(df['Data Alteração']).dropna()
+            if not alteracoes.empty:
+                self.high_water_mark = alteracoes.max().to_pydatetime()
+        self.last_sync = synced_at
+    
+    def _select_changed(self, dados_brutos: List[Dict]) -> List[Dict]:
+        """Mantém agendamentos novos ou alterados desde o high-water mark"""
+        alterados = []
+        alteracoes = _parse_dtalteracao(dados_brutos)
+        for item, alteracao in zip(dados_brutos, alteracoes):
+            if not item:
+                continue
+            if (
+                item.get('idagendamento') not in self.known_ids
+                or pd.isna(alteracao)
+                or self.high_water_mark is None
+                or alteracao >= self.high_water_mark
+            ):
+                alterados.append(item)
+        return alterados
+    
+    def _update_state(self, dados_brutos: List[Dict]):
+        """Atualiza os IDs conhecidos e o high-water mark de dtalteracao"""
+        dados_brutos = [item for item in dados_brutos if item]
+        self.known_ids.update(item.get('idagendamento') for item in dados_brutos)
+        
+        alteracoes = _parse_dtalteracao(dados_brutos).dropna()
+        if not alteracoes.empty:
+            maior = alteracoes.max().to_pydatetime()
+            if self.high_water_mark is None or maior > self.high_water_mark:
+                self.high_water_mark = maior
+
+
+def _parse_dtalteracao(dados_brutos: List[Dict]) -> pd.Series:
+    """Converte o campo dtalteracao dos agendamentos brutos em datetime"""
+    valores = [item.get('dtalteracao') if item else None for item in dados_brutos]
+    return parse_wms_dates(pd.Series(valores, dtype=object)).astype('datetime64[ns]')
+
+
+# Factory function com cache (estado compartilhado entre sessões)
+@st.cache_resource
+def get_agendamentos_sync():
+    """Retorna o estado de sincronização compartilhado"""
+    if USE_ASYNC_CLIENT:
+        # httpx só é importado quando o cliente assíncrono está habilitado
+        from services.async_api_client import get_wms_async_client
+    client = get_wms_async_client() if USE_ASYNC_CLIENT else get_wms_client()
+    return AgendamentosSync(client)
@@ -0,0 +1,134 @@
+"""
+Gerenciamento do token JWT da API WMS com renovação em segundo plano
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from src.core.config import TOKEN_EXPIRY_MINUTES, TOKEN_REFRESH_MARGIN_SECONDS
+from src.core.logger import log_error
+
+
+class TokenManager:
+    """
+    Mantém o token JWT válido, thread-safe entre sessões
+    
+    Após cada login é agendada uma renovação em segundo plano
+    ``refresh_margin`` segundos antes da expiração, feita apenas se o token
+    foi usado desde o último login (sem uso, a renovação fica para o próximo
+    ``get_token``). Enquanto o token atual for válido, ``get_token`` responde
+    sem bloquear; só espera por um login quando não há token ou ele realmente
+    expirou. Não exibe mensagens na interface.
+    """
+    
+    def __init__(
+        self,
+        login_fn: Callable[[], Optional[str]],
+        ttl_seconds: float = TOKEN_EXPIRY_MINUTES * 60,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN_SECONDS
+    ):
+        self._login_fn = login_fn
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = min(refresh_margin, ttl_seconds / 2)
+        self._token: Optional[str] = None
+        self._expiry = 0.0
+        self._used = False
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._background: Optional[threading.Thread] = None
+        self._background_lock = threading.Lock()
+    
+    @property
+    def token(self) -> Optional[str]:
+        """Token atual (sem validar nem renovar)"""
+        return self._token
+    
+    def is_valid(self) -> bool:
+        """Verifica se o token ainda é válido"""
+        return self._token is not None and time.time() < self._expiry
+    
+    def get_token(self) -> Optional[str]:
+        """
+        Retorna um token válido, fazendo login apenas se necessário
+        
+        Returns:
+            Token JWT ou None se o login falhar
+        """
+        if self.is_valid():
+            self._used = True
+            # Perto de expirar: renova em segundo plano e usa o atual
+            if time.time() >= self._expiry - self.refresh_margin:
+                self._refresh_in_background()
+            return self._token
+        
+        with self._lock:
+            # Outra thread pode ter renovado enquanto aguardávamos
+            if not self.is_valid():
+                self._refresh_locked()
+            return self._token if self.is_valid() else None
+    
+    def refresh(self) -> bool:
+        """
+        Força um novo login
+        
+        Returns:
+            True se o login foi bem-sucedido
+        """
+        with self._lock:
+            return self._refresh_locked()
+    
+    def invalidate(self):
+        """Descarta o token atual (ex.: após resposta 401)"""
+        with self._lock:
+            self._token = None
+            self._expiry = 0.0
+    
+    def set_token(self, token: str, ttl_seconds: Optional[float] = None):
+        """
+        Define o token manualmente (sem agendar renovação)
+        
+        Args:
+            token: Token JWT
+            ttl_seconds: Validade em segundos (padrão: ttl do gerenciador)
+        """
+        with self._lock:
+            self._token = token
+            self._expiry = time.time() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+    
+    def _refresh_locked(self) -> bool:
+        """Faz login (com o lock adquirido) e agenda a próxima renovação"""
+        try:
+            token = self._login_fn()
+        except Exception as e:
+            log_error(e, "TokenManager login")
+            token = None
+        
+        if not token:
+            return False
+        
+        self._token = token
+        self._expiry = time.time() + self.ttl_seconds
+        self._used = False
+        self._schedule_refresh()
+        return True
+    
+    def _schedule_refresh(self):
+        """Agenda a renovação proativa antes da expiração"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.ttl_seconds - self.refresh_margin, self._refresh_if_used)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _refresh_if_used(self):
+        """Renovação agendada: só renova se o token foi usado desde o login"""
+        if self._used:
+            self._refresh_in_background()
+    
+    def _refresh_in_background(self):
+        """Renova o token numa thread, sem bloquear quem pediu o token"""
+        with self._background_lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(target=self.refresh, name="wms-token-refresh", daemon=True)
+            self._background.start()
@@ -0,0 +1,36 @@
+"""
+Cache das figuras e agregados dos gráficos por dataset + filtros
+"""
+import streamlit as st
+from typing import Any, Callable, Hashable, Optional
+
+from services.cache import AgendamentosCache
+from src.core.config import CACHE_TTL_SECONDS, VIEW_CACHE_MAX_ENTRIES
+
+
+def cached_view(cache_key: Optional[Hashable], name: Hashable, builder: Callable[[], Any]) -> Any:
+    """
+    Retorna o objeto (figura, agregado) construído uma vez por chave
+
+    As figuras são compartilhadas entre sessões: não devem ser alteradas
+    depois de construídas.
+
+    Args:
+        cache_key: Identifica os dados exibidos (ver filter_cache_key);
+            None desativa o cache
+        name: Identifica o objeto (ex.: nome e título do gráfico)
+        builder: Função sem argumentos que constrói o objeto
+
+    Returns:
+        Objeto construído ou reaproveitado do cache
+    """
+    if cache_key is None:
+        return builder()
+    return get_view_cache().get_or_load((cache_key, name), builder)
+
+
+# Factory function com cache (instância única compartilhada entre sessões)
+@st.cache_resource
+def get_view_cache():
+    """Retorna o cache compartilhado das figuras"""
+    return AgendamentosCache(ttl_seconds=CACHE_TTL_SECONDS, max_entries=VIEW_CACHE_MAX_ENTRIES)
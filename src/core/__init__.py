@@ -1,27 +1,49 @@
 """
 Módulo core - Funcionalidades centrais do aplicativo
+
+Os nomes exportados são carregados sob demanda (PEP 562): importar
+``src.core.config`` ou ``src.core.utils`` não carrega os demais submódulos.
 """
-from .config import *
-from .utils import *
-from .logger import *
+import importlib
 
-__all__ = [
+# Nome exportado -> submódulo que o define
+_EXPORTS = {
     # Config
-    'PAGE_TITLE',
-    'PAGE_ICON',
-    'DEFAULT_START_DATE_YEAR',
-    
+    'PAGE_TITLE': 'config',
+    'PAGE_ICON': 'config',
+    'DEFAULT_START_DATE_YEAR': 'config',
+
     # Utils
-    'get_base64_image',
-    'format_date_br',
-    'format_number',
-    'safe_get_column_values',
-    'filter_dataframe_by_date',
-    'remove_null_values',
-    
+    'get_base64_image': 'utils',
+    'get_image_url': 'utils',
+    'format_date_br': 'utils',
+    'format_number': 'utils',
+    'safe_get_column_values': 'utils',
+    'filter_dataframe_by_date': 'utils',
+    'remove_null_values': 'utils',
+
     # Logger
-    'logger',
-    'log_api_call',
-    'log_error',
-    'log_user_action',
-]
+    'logger': 'logger',
+    'log_api_call': 'logger',
+    'log_error': 'logger',
+    'log_user_action': 'logger',
+
+    # Timing
+    'timed': 'timing',
+    'record_stage': 'timing',
+    'stage_timings': 'timing',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -11,12 +11,33 @@ LAYOUT = "wide"
 DEFAULT_START_DATE_YEAR = 2025
 DEFAULT_START_DATE_MONTH = 1
 DEFAULT_START_DATE_DAY = 1
+# Formatos das datas retornadas pela API WMS (o primeiro é o padrão documentado)
+WMS_DATE_FORMATS = ["%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y"]
 
 # Configurações de timeout
 API_TIMEOUT = 30  # segundos
 TOKEN_EXPIRY_MINUTES = 25
+TOKEN_REFRESH_MARGIN_SECONDS = 120  # renova o token em segundo plano antes de expirar
+
+# Carga inicial em segundo plano: intervalo entre verificações do término
+PROGRESSIVE_POLL_SECONDS = 1.0
+
+# Logs (arquivo em JSON, uma linha por registro, com rotação por tamanho)
+LOG_FILE = "logs/app.log"
+LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 10 MB por arquivo
+LOG_BACKUP_COUNT = 5              # arquivos rotacionados mantidos
+
+# Tempo por etapa (busca, processamento, filtro, renderização)
+TIMING_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]  # faixas do histograma
+TIMING_MAX_SESSIONS = 200   # sessões com histograma próprio mantidas em memória
+SHOW_TIMING_PANEL = False   # painel "Tempo por etapa" na barra lateral para todos
+TIMING_PANEL_QUERY_PARAM = "timing"  # ?timing=1 exibe o painel só para quem abriu a URL
 
 # Configurações de UI
+BACKGROUND_IMAGE_PATH = "assets/background.png"
+STATIC_DIR = "static"  # servido em app/static/ com server.enableStaticServing
+SERVE_STATIC_ASSETS = False  # imagem de fundo como arquivo estático (em vez de data URI)
 CONTAINER_MAX_WIDTH = "98%"
 CONTAINER_PADDING = "2rem"
 CONTAINER_MARGIN = "2rem auto"
@@ -33,3 +54,48 @@ TOP_N_MATERIALS = 5
 
 # Status padrão (caso não haja dados carregados)
 DEFAULT_STATUS_OPTIONS = ["AGENDADO", "CONFIRMADO", "CANCELADO", "FINALIZADO"]
+
+# Sincronização incremental (janela de consulta em torno da última alteração)
+INCREMENTAL_OVERLAP_DAYS = 2     # dias antes da última dtalteracao conhecida
+INCREMENTAL_LOOKAHEAD_DAYS = 30  # dias à frente de hoje (agendamentos futuros)
+
+# Busca concorrente por janelas de data (diconsulta)
+FETCH_WINDOW = "semana"        # "dia", "semana" ou "mes"
+FETCH_MAX_WORKERS = 4          # requisições simultâneas
+FETCH_WINDOW_TIMEOUT = 15      # segundos por janela
+
+# Cache compartilhado entre sessões
+CACHE_TTL_SECONDS = 300  # 5 minutos
+CACHE_MAX_ENTRIES = 8    # períodos de consulta distintos mantidos em memória
+
+# Snapshot local do DataFrame processado (cold start)
+SNAPSHOT_PATH = "data/agendamentos_snapshot.parquet"
+SNAPSHOT_SCHEMA_VERSION = 2  # incrementar ao mudar colunas/tipos do DataFrame processado
+
+# Cliente HTTP assíncrono (httpx) para as buscas da sincronização
+USE_ASYNC_CLIENT = False
+
+# Resiliência das chamadas à API (retries e circuit breaker)
+RETRY_MAX_ATTEMPTS = 3            # tentativas por requisição
+RETRY_BASE_DELAY = 0.5            # segundos (backoff exponencial com jitter)
+RETRY_MAX_DELAY = 8.0             # segundos
+CIRCUIT_FAILURE_THRESHOLD = 5     # falhas consecutivas para abrir o circuito
+CIRCUIT_RESET_TIMEOUT = 60        # segundos com o circuito aberto antes de testar de novo
+
+# Leitura em streaming da resposta de /agendamento/lista
+STREAM_CHUNK_BYTES = 64 * 1024    # bytes lidos por vez do corpo da resposta
+STREAM_BATCH_SIZE = 2000          # agendamentos processados por lote
+
+# Exportação (arquivos gerados sob demanda e cacheados por dataset + filtros)
+EXPORT_CACHE_MAX_ENTRIES = 6      # arquivos mantidos em memória
+EXCEL_WRITE_ONLY_MIN_ROWS = 5000  # a partir daqui usa openpyxl write-only (memória constante)
+
+# Paginação da tabela de dados
+PAGE_SIZE_OPTIONS = [50, 100, 250, 500]
+DEFAULT_PAGE_SIZE = 100
+
+# Figuras e agregados dos gráficos mantidos em memória (por dataset + filtros)
+VIEW_CACHE_MAX_ENTRIES = 64
+
+# Série temporal dos gráficos: agrupa em semana/mês acima deste número de pontos
+TIMESERIES_MAX_POINTS = 120
@@ -1,37 +1,171 @@
 """
 Configuração de logging para o aplicativo
+
+Os registros são enfileirados (QueueHandler) na thread que loga e gravados
+por uma thread própria (QueueListener): o arquivo em JSON, uma linha por
+registro, com rotação por tamanho, e o stdout em texto. Nada é aberto na
+importação; o arquivo é criado quando o primeiro registro é emitido.
 """
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from src.core.config import LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+from src.core.timing import current_session_id, record_stage
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Atributos padrão do LogRecord (o restante veio de ``extra``)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata o registro como um objeto JSON (campos de ``extra`` incluídos)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        payload.update(
+            (chave, valor) for chave, valor in vars(record).items()
+            if chave not in _RECORD_ATTRS and valor is not None
+        )
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _SessionFilter(logging.Filter):
+    """Anota o registro com o ID da sessão do Streamlit (na thread que loga)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'session_id', None) is None:
+            record.session_id = current_session_id()
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Enfileira os registros e inicia o listener no primeiro registro"""
+
+    def emit(self, record: logging.LogRecord):
+        _start_listener()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Mantém a mensagem e o traceback em campos separados (para o JSON)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _build_handlers():
+    """Cria os handlers de saída (arquivo JSON com rotação e stdout em texto)"""
+    diretorio = os.path.dirname(LOG_FILE)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    arquivo = RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+    )
+    arquivo.setFormatter(JsonFormatter())
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return arquivo, console
+
+
+def _start_listener():
+    """Inicia a thread de gravação dos logs (uma vez por processo)"""
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is not None:
+            return
+        listener = QueueListener(_queue, *_build_handlers(), respect_handler_level=True)
+        listener.start()
+        _listener = listener
+
+
+def shutdown_logging():
+    """Grava os registros pendentes e encerra a thread de gravação"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
 
-# Configuração básica de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'logs/app_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 
 # Logger principal
 logger = logging.getLogger('wms_sigma')
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+if not any(isinstance(h, _LazyQueueHandler) for h in logger.handlers):
+    _handler = _LazyQueueHandler(_queue)
+    _handler.addFilter(_SessionFilter())
+    logger.addHandler(_handler)
 
 
-def log_api_call(endpoint: str, success: bool, records_count: int = 0):
+def log_api_call(
+    endpoint: str,
+    success: bool,
+    records_count: int = 0,
+    duration: Optional[float] = None,
+    status_code: Optional[int] = None
+):
     """
     Registra chamada à API
     
+    Com ``duration``, a chamada também entra no tempo por etapa
+    (etapa "api <endpoint>", ver src.core.timing).
+    
     Args:
         endpoint: Endpoint chamado
         success: Se foi bem-sucedida
         records_count: Número de registros retornados
+        duration: Duração da chamada em segundos
+        status_code: Status HTTP da resposta
     """
+    extra = {
+        'event': 'api_call',
+        'endpoint': endpoint,
+        'success': success,
+        'records': records_count,
+        'duration_ms': round(duration * 1000, 1) if duration is not None else None,
+        'status_code': status_code,
+    }
+    if duration is not None:
+        record_stage(f"api {endpoint}", duration)
     if success:
-        logger.info(f"API call successful - Endpoint: {endpoint}, Records: {records_count}")
+        logger.info("API call successful - Endpoint: %s, Records: %s", endpoint, records_count, extra=extra)
     else:
-        logger.error(f"API call failed - Endpoint: {endpoint}")
+        logger.error("API call failed - Endpoint: %s", endpoint, extra=extra)
 
 
 def log_error(error: Exception, context: str = ""):
@@ -42,7 +176,10 @@ def log_error(error: Exception, context: str = ""):
         error: Exceção ocorrida
         context: Contexto adicional
     """
-    logger.error(f"Error in {context}: {str(error)}", exc_info=True)
+    logger.error(
+        "Error in %s: %s", context, error, exc_info=error,
+        extra={'event': 'error', 'context': context, 'error_type': type(error).__name__}
+    )
 
 
 def log_user_action(action: str, details: str = ""):
@@ -53,4 +190,4 @@ def log_user_action(action: str, details: str = ""):
         action: Ação realizada
         details: Detalhes adicionais
     """
-    logger.info(f"User action - {action}: {details}")
+    logger.info("User action - %s: %s", action, details, extra={'event': 'user_action', 'action': action})
@@ -0,0 +1,143 @@
+"""
+Perfil do tempo de importação na inicialização do aplicativo (cold start)
+
+Uso:
+    python -m src.core.startup_profile [--top N] [modulo ...]
+
+Importa os módulos de nível superior de app.py (lidos com ``ast``) num
+processo novo com ``python -X importtime`` e lista os módulos mais lentos (tempo acumulado, incluindo dependências).
+Retorna código 1 se algum módulo de carga sob demanda (LAZY_MODULES) for
+importado na inicialização.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Módulos pesados que só devem ser carregados no primeiro uso
+LAZY_MODULES = ['plotly.express', 'openpyxl', 'httpx']
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+APP_PATH = os.path.join(_ROOT, 'app.py')
+
+
+def startup_modules(app_path: str = APP_PATH) -> List[str]:
+    """
+    Módulos importados no nível superior do script (sem os de dentro de funções)
+
+    Args:
+        app_path: Caminho do script do aplicativo
+
+    Returns:
+        Nomes dos módulos, na ordem em que aparecem
+    """
+    with open(app_path, encoding='utf-8') as arquivo:
+        arvore = ast.parse(arquivo.read(), filename=app_path)
+
+    modulos = []
+    for node in arvore.body:
+        if isinstance(node, ast.Import):
+            modulos += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modulos.append(node.module)
+    return list(dict.fromkeys(modulos))
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Interpreta a saída de ``python -X importtime``
+
+    Args:
+        output: Texto do stderr
+
+    Returns:
+        Lista de dicionários com module, depth (0 = importação direta),
+        self_ms e cumulative_ms
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        campos = line[len('import time:'):].split('|')
+        if len(campos) != 3 or not campos[0].strip().isdigit():
+            continue  # cabeçalho
+        nome = campos[2][1:].rstrip()  # dois espaços de recuo por nível
+        entries.append({
+            'module': nome.strip(),
+            'depth': (len(nome) - len(nome.lstrip())) // 2,
+            'self_ms': int(campos[0]) / 1000,
+            'cumulative_ms': int(campos[1]) / 1000,
+        })
+    return entries
+
+
+def profile_imports(modules: Optional[List[str]] = None, cwd: str = _ROOT) -> List[Dict]:
+    """
+    Importa os módulos num processo novo e mede o tempo de cada importação
+
+    Args:
+        modules: Módulos a importar (padrão: os de app.py, ver startup_modules)
+        cwd: Diretório de trabalho do processo (a raiz do projeto vai no
+            PYTHONPATH, então pode ser um diretório vazio)
+
+    Returns:
+        Entradas de parse_importtime
+    """
+    codigo = "; ".join(f"import {m}" for m in (modules or startup_modules()))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [_ROOT, env.get('PYTHONPATH')]))
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(resultado.stderr)
+
+
+def format_report(entries: List[Dict], top: int = 20) -> str:
+    """
+    Monta o relatório: total, módulos mais lentos e cargas indevidas
+
+    Args:
+        entries: Entradas de parse_importtime
+        top: Quantidade de módulos listados
+
+    Returns:
+        Relatório em texto
+    """
+    total = sum(e['cumulative_ms'] for e in entries if e['depth'] == 0)
+    linhas = [f"Tempo total de importação: {total:.0f} ms ({len(entries)} módulos)", ""]
+    linhas.append(f"{'acumulado':>10} {'próprio':>9}  módulo")
+    for e in sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:top]:
+        linhas.append(f"{e['cumulative_ms']:>8.1f}ms {e['self_ms']:>7.1f}ms  {e['module']}")
+
+    carregados = eager_lazy_modules(entries)
+    if carregados:
+        linhas += ["", "Módulos de carga sob demanda importados na inicialização: " + ", ".join(carregados)]
+    return "\n".join(linhas)
+
+
+def eager_lazy_modules(entries: List[Dict]) -> List[str]:
+    """Módulos de LAZY_MODULES presentes nas importações"""
+    importados = {e['module'] for e in entries}
+    return [m for m in LAZY_MODULES if m in importados]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Perfil do tempo de importação na inicialização")
+    parser.add_argument('modules', nargs='*', help="Módulos a importar (padrão: os de app.py)")
+    parser.add_argument('--top', type=int, default=20, help="Quantidade de módulos listados")
+    args = parser.parse_args(argv)
+
+    entries = profile_imports(args.modules or None)
+    print(format_report(entries, args.top))
+    return 1 if eager_lazy_modules(entries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Medição do tempo de cada etapa (busca → processamento → filtro → renderização)
+
+Uso:
+    with timed("filtro"):
+        ...
+
+    @timed("graficos")
+    def render_graficos(...):
+        ...
+
+Cada medição entra no histograma agregado do processo e, quando feita na
+thread de uma sessão do Streamlit, no histograma da sessão e no detalhamento
+da execução atual do script (ver start_run).
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from src.core.config import TIMING_BUCKETS_MS, TIMING_MAX_SESSIONS
+
+
+def current_session_id() -> Optional[str]:
+    """ID da sessão do Streamlit da thread atual (None fora de uma execução do script)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+class StageHistogram:
+    """Histograma de durações (ms) de uma etapa, em faixas fixas"""
+
+    def __init__(self, buckets_ms: List[float] = TIMING_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # última faixa: acima do maior limite
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        Estima o percentil pelo limite superior da faixa
+
+        Args:
+            q: Percentil entre 0 e 1
+
+        Returns:
+            Duração em ms (0 sem medições)
+        """
+        if not self.count:
+            return 0.0
+        alvo = q * self.count
+        acumulado = 0
+        for indice, quantidade in enumerate(self.counts):
+            acumulado += quantidade
+            if acumulado >= alvo and quantidade:
+                if indice < len(self.buckets_ms):
+                    return min(self.buckets_ms[indice], self.max_ms)
+                break
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        """Resumo: quantidade, média, p50, p95 e máximo (ms)"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max_ms,
+        }
+
+
+class StageTimings:
+    """
+    Registro thread-safe das durações por etapa
+
+    Mantém o histograma agregado de cada etapa, os histogramas de até
+    ``max_sessions`` sessões (as menos recentes são descartadas) e o
+    detalhamento da execução atual de cada sessão.
+    """
+
+    def __init__(self, max_sessions: int = TIMING_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._aggregate: Dict[str, StageHistogram] = {}
+        self._sessions: "OrderedDict[str, Dict[str, StageHistogram]]" = OrderedDict()
+        self._runs: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: str, ms: float, session_id: Optional[str] = None):
+        """
+        Registra a duração de uma etapa
+
+        Args:
+            stage: Nome da etapa
+            ms: Duração em milissegundos
+            session_id: Sessão do Streamlit (None para threads em segundo plano)
+        """
+        with self._lock:
+            self._aggregate.setdefault(stage, StageHistogram()).add(ms)
+            if session_id is None:
+                return
+            self._session(session_id).setdefault(stage, StageHistogram()).add(ms)
+            execucao = self._runs.setdefault(session_id, {})
+            execucao[stage] = execucao.get(stage, 0.0) + ms
+
+    def start_run(self, session_id: Optional[str]):
+        """Inicia o detalhamento de uma nova execução do script da sessão"""
+        if session_id is None:
+            return
+        with self._lock:
+            self._session(session_id)
+            self._runs[session_id] = {}
+
+    def last_run(self, session_id: Optional[str]) -> Dict[str, float]:
+        """Duração (ms) de cada etapa na execução atual da sessão, na ordem medida"""
+        with self._lock:
+            return dict(self._runs.get(session_id, {}))
+
+    def summary(self, session_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Resumo dos histogramas por etapa
+
+        Args:
+            session_id: Sessão a resumir (None para o agregado do processo)
+
+        Returns:
+            Dicionário etapa -> resumo (ver StageHistogram.summary)
+        """
+        with self._lock:
+            if session_id is None:
+                histogramas = self._aggregate
+            else:
+                histogramas = self._sessions.get(session_id, {})
+            return {stage: hist.summary() for stage, hist in histogramas.items()}
+
+    def reset(self):
+        """Descarta todas as medições"""
+        with self._lock:
+            self._aggregate.clear()
+            self._sessions.clear()
+            self._runs.clear()
+
+    def _session(self, session_id: str) -> Dict[str, StageHistogram]:
+        """Histogramas da sessão (marca como usada recentemente; requer o lock)"""
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+        else:
+            self._sessions[session_id] = {}
+            while len(self._sessions) > self.max_sessions:
+                antiga, _ = self._sessions.popitem(last=False)
+                self._runs.pop(antiga, None)
+        return self._sessions[session_id]
+
+
+# Registro compartilhado pelo processo (todas as sessões)
+stage_timings = StageTimings()
+
+
+def record_stage(stage: str, seconds: float):
+    """
+    Registra a duração de uma etapa medida externamente
+
+    Args:
+        stage: Nome da etapa
+        seconds: Duração em segundos
+    """
+    stage_timings.record(stage, seconds * 1000, current_session_id())
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Mede o bloco (ou a função, usado como decorator) como uma etapa
+
+    A duração é registrada mesmo se o bloco levantar exceção.
+
+    Args:
+        stage: Nome da etapa
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - inicio)
+
+
+def start_run():
+    """Marca o início de uma execução do script (zera o detalhamento da sessão)"""
+    stage_timings.start_run(current_session_id())
@@ -2,15 +2,34 @@
 Funções utilitárias para o aplicativo WMS
 """
 import base64
-from typing import Optional
+import mimetypes
+import os
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from src.core.config import WMS_DATE_FORMATS, STATIC_DIR
+
+# Quantidade de valores distintos usados para detectar o formato das datas
+DATE_FORMAT_SAMPLE_SIZE = 20
+
+
+@lru_cache(maxsize=8)
+def _encode_base64_file(image_path: str, mtime_ns: int) -> str:
+    """Lê e codifica o arquivo (memoizado por caminho e data de modificação)"""
+    with open(image_path, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode()
+
 
 def get_base64_image(image_path: str) -> str:
     """
     Converte uma imagem em string base64
     
+    O resultado é reaproveitado enquanto o arquivo não for modificado
+    (apenas um ``stat`` por chamada).
+    
     Args:
         image_path: Caminho para a imagem
         
@@ -18,12 +37,133 @@ def get_base64_image(image_path: str) -> str:
         String base64 da imagem
     """
     try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
+        return _encode_base64_file(image_path, os.stat(image_path).st_mtime_ns)
     except FileNotFoundError:
         return ""
 
 
+def get_image_url(image_path: str, serve_static: bool = False) -> str:
+    """
+    Retorna a URL da imagem para uso em CSS
+    
+    Com ``serve_static``, se o arquivo existir em STATIC_DIR, usa a URL do
+    arquivo estático servido pelo Streamlit (``app/static/<nome>``, requer
+    ``server.enableStaticServing``); caso contrário, um data URI em base64.
+    
+    Args:
+        image_path: Caminho para a imagem
+        serve_static: Usa o arquivo estático, se disponível
+        
+    Returns:
+        URL da imagem (vazia se o arquivo não existir)
+    """
+    nome = os.path.basename(image_path)
+    if serve_static and os.path.isfile(os.path.join(STATIC_DIR, nome)):
+        return f"app/static/{nome}"
+    
+    conteudo = get_base64_image(image_path)
+    if not conteudo:
+        return ""
+    mime = mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+    return f"data:{mime};base64,{conteudo}"
+
+
+def detect_date_format(values: Iterable[Any], formats: Optional[list] = None) -> Optional[str]:
+    """
+    Detecta o formato de data de uma amostra de valores
+    
+    Args:
+        values: Valores (strings) de uma coluna de data
+        formats: Formatos candidatos, em ordem de preferência
+        
+    Returns:
+        Formato que interpreta mais valores da amostra (em empate, o
+        primeiro da lista) ou None se nenhum servir
+    """
+    amostra = []
+    for valor in values:
+        if isinstance(valor, str) and valor.strip():
+            amostra.append(valor.strip())
+            if len(amostra) >= DATE_FORMAT_SAMPLE_SIZE:
+                break
+    if not amostra:
+        return None
+    
+    melhor, acertos_melhor = None, 0
+    for fmt in formats or WMS_DATE_FORMATS:
+        acertos = 0
+        for valor in amostra:
+            try:
+                datetime.strptime(valor, fmt)
+                acertos += 1
+            except ValueError:
+                pass
+        if acertos == len(amostra):
+            return fmt
+        if acertos > acertos_melhor:
+            melhor, acertos_melhor = fmt, acertos
+    return melhor
+
+
+def parse_wms_dates(values: Any) -> pd.Series:
+    """
+    Converte uma coluna de datas da API WMS para datetime
+    
+    O formato é detectado uma vez numa amostra e a conversão usa formato
+    explícito (sem inferência por elemento). Cada string distinta é
+    convertida uma única vez e o resultado é replicado para as repetições.
+    Valores fora do formato detectado caem na inferência com dayfirst;
+    valores inválidos viram NaT. Colunas já em datetime são retornadas
+    sem alteração.
+    
+    Args:
+        values: Series (ou lista) com as datas em texto
+        
+    Returns:
+        Series datetime64 com o mesmo índice
+    """
+    serie = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie
+    
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return pd.to_datetime(serie, errors='coerce')
+    textos = pd.Index(unicos).astype(str).str.strip()
+    
+    fmt = detect_date_format(textos)
+    if fmt is not None:
+        datas = pd.to_datetime(textos, format=fmt, errors='coerce')
+        # Valores fora do formato detectado (ex.: só a data): inferência
+        pendentes = datas.isna() & (textos != '')
+        if pendentes.any():
+            datas = datas.where(
+                ~pendentes,
+                pd.to_datetime(textos.where(pendentes), errors='coerce', dayfirst=True, format='mixed')
+            )
+    else:
+        datas = pd.to_datetime(textos, errors='coerce', dayfirst=True, format='mixed')
+    
+    valores = datas.to_numpy()[np.maximum(codigos, 0)]
+    valores[codigos < 0] = np.datetime64('NaT')
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def ensure_datetime(values: pd.Series) -> pd.Series:
+    """
+    Garante uma coluna datetime sem reconverter colunas já tipadas
+    
+    Args:
+        values: Coluna de datas (datetime ou texto da API)
+        
+    Returns:
+        Series datetime64
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return parse_wms_dates(values)
+
+
 def format_date_br(date: Optional[datetime]) -> str:
     """
     Formata data no padrão brasileiro
@@ -97,13 +237,13 @@ def filter_dataframe_by_date(
     if date_column not in df.columns:
         return df
     
-    # Garante que a coluna está em formato datetime
-    df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+    # Garante que a coluna está em formato datetime (sem alterar o DataFrame)
+    datas = ensure_datetime(df[date_column])
     
     # Filtra
     mask = (
-        (df[date_column].dt.date >= start_date) &
-        (df[date_column].dt.date <= end_date)
+        (datas.dt.date >= start_date) &
+        (datas.dt.date <= end_date)
     )
     return df[mask]
 
@@ -10,5 +10,8 @@ __all__ = [
     'render_bar_chart',
     'render_line_chart',
     'render_export_buttons',
+    'render_paginated_table',
     'render_filter_sidebar',
+    'render_app_styles',
+    'render_timing_panel',
 ]
@@ -2,9 +2,97 @@
 Componentes de UI reutilizáveis
 """
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Hashable, Optional
+
+from services.view_cache import cached_view
+from src.core.timing import current_session_id, stage_timings, timed
+
+
+def _plotly_express():
+    """Importa o plotly.express apenas quando a primeira figura é construída"""
+    import plotly.express as px
+    return px
+
+
+# Estilo da página; {background_url} é substituído pela URL da imagem de fundo
+APP_CSS_TEMPLATE = """
+<style>
+    /* Imagem de fundo */
+    .stApp {
+        background-image: url("{background_url}");
+        background-size: cover;
+        background-position: center;
+        background-repeat: no-repeat;
+        background-attachment: fixed;
+    }
+    
+    /* Sidebar com fundo branco */
+    section[data-testid="stSidebar"] {
+        background-color: white;
+    }
+    
+    /* Container principal - UM ÚNICO BLOCO BRANCO */
+    .block-container {
+        background-color: white;
+        padding: 2rem;
+        margin: 2rem auto;
+        border-radius: 15px;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+        max-width: 98%;
+    }
+    
+    /* Remove padding extra */
+    .main {
+        padding: 0;
+    }
+    
+    /* Centraliza o título */
+    h1 {
+        text-align: center;
+    }
+    
+    /* Ajusta tamanho dos títulos e valores das métricas */
+    div[data-testid="stMetric"] label {
+        font-size: 1.2rem !important;
+        font-weight: 600 !important;
+    }
+    
+    div[data-testid="stMetric"] div[data-testid="stMetricValue"] {
+        font-size: 2rem !important;
+    }
+    
+    /* Botões */
+    div.stButton > button {
+        width: 100%;
+    }
+</style>
+"""
+
+
+@lru_cache(maxsize=4)
+def build_app_css(background_url: str) -> str:
+    """
+    Monta o bloco de estilo da página (memoizado por URL da imagem de fundo)
+    
+    Args:
+        background_url: URL da imagem de fundo (data URI ou arquivo estático)
+        
+    Returns:
+        HTML com o bloco <style>
+    """
+    return APP_CSS_TEMPLATE.replace("{background_url}", background_url)
+
+
+def render_app_styles(background_url: str):
+    """
+    Injeta o estilo personalizado da página
+    
+    Args:
+        background_url: URL da imagem de fundo (ver get_image_url)
+    """
+    st.markdown(build_app_css(background_url), unsafe_allow_html=True)
 
 
 def render_metrics_card(title: str, value: str):
@@ -38,7 +126,8 @@ def render_pie_chart(
     data: Dict[str, int],
     title: str,
     labels_name: str = "Status",
-    values_name: str = "Quantidade"
+    values_name: str = "Quantidade",
+    cache_key: Optional[Hashable] = None
 ):
     """
     Renderiza gráfico de pizza
@@ -48,17 +137,20 @@ def render_pie_chart(
         title: Título do gráfico
         labels_name: Nome para labels
         values_name: Nome para valores
+        cache_key: Identifica os dados (versão do dataset + filtros); a
+            figura é construída uma vez por chave (ver services.view_cache)
     """
     if not data:
         st.info("Nenhum dado disponível")
         return
     
-    fig = px.pie(
-        names=list(data.keys()),
-        values=list(data.values()),
-        title=title
-    )
-    st.plotly_chart(fig, width="stretch")
+    with timed("gráficos"):
+        fig = cached_view(cache_key, ('pie', title), lambda: _plotly_express().pie(
+            names=list(data.keys()),
+            values=list(data.values()),
+            title=title
+        ))
+        st.plotly_chart(fig, width="stretch")
 
 
 def render_bar_chart(
@@ -67,7 +159,8 @@ def render_bar_chart(
     title: str,
     x_label: str = "Categoria",
     y_label: str = "Quantidade",
-    orientation: str = "v"
+    orientation: str = "v",
+    cache_key: Optional[Hashable] = None
 ):
     """
     Renderiza gráfico de barras
@@ -79,22 +172,25 @@ def render_bar_chart(
         x_label: Label do eixo X
         y_label: Label do eixo Y
         orientation: 'v' vertical ou 'h' horizontal
+        cache_key: Identifica os dados (ver render_pie_chart)
     """
-    fig = px.bar(
-        x=x_data,
-        y=y_data,
-        orientation=orientation,
-        title=title,
-        labels={'x': x_label, 'y': y_label}
-    )
-    st.plotly_chart(fig, width="stretch")
+    with timed("gráficos"):
+        fig = cached_view(cache_key, ('bar', title), lambda: _plotly_express().bar(
+            x=x_data,
+            y=y_data,
+            orientation=orientation,
+            title=title,
+            labels={'x': x_label, 'y': y_label}
+        ))
+        st.plotly_chart(fig, width="stretch")
 
 
 def render_line_chart(
     df: pd.DataFrame,
     x_column: str,
     y_column: str,
-    title: str
+    title: str,
+    cache_key: Optional[Hashable] = None
 ):
     """
     Renderiza gráfico de linha
@@ -104,51 +200,117 @@ def render_line_chart(
         x_column: Nome da coluna X
         y_column: Nome da coluna Y
         title: Título do gráfico
+        cache_key: Identifica os dados (ver render_pie_chart)
     """
-    fig = px.line(
-        df,
-        x=x_column,
-        y=y_column,
-        title=title
-    )
-    st.plotly_chart(fig, width="stretch")
+    with timed("gráficos"):
+        fig = cached_view(cache_key, ('line', title), lambda: _plotly_express().line(
+            df,
+            x=x_column,
+            y=y_column,
+            title=title
+        ))
+        st.plotly_chart(fig, width="stretch")
 
 
-def render_export_buttons(df: pd.DataFrame, filename_base: str = "dados"):
+def render_export_buttons(
+    df: pd.DataFrame,
+    filename_base: str = "dados",
+    cache_key: Optional[Hashable] = None,
+    sheet_name: str = "Dados"
+):
     """
-    Renderiza botões de exportação CSV e Excel
+    Renderiza botões de exportação (CSV, Excel, Parquet e CSV gzip)
+    
+    Os arquivos são gerados apenas quando o usuário clica e ficam em cache
+    por ``cache_key`` (ver services.export).
     
     Args:
         df: DataFrame para exportar
         filename_base: Nome base dos arquivos
+        cache_key: Identifica o conteúdo de ``df`` (versão do dataset + filtros)
+        sheet_name: Nome da planilha do Excel
     """
-    import io
+    from services.export import EXPORT_FORMATS, render_download_button
     
     st.markdown("---")
     st.subheader("📥 Exportar")
     
-    # CSV
-    csv_bytes = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "📥 Download CSV",
-        csv_bytes,
-        f"{filename_base}.csv",
-        "text/csv",
-        width="stretch"
-    )
+    for formato in EXPORT_FORMATS:
+        render_download_button(df, formato, filename_base, cache_key, sheet_name)
+
+
+@timed("tabela")
+def render_paginated_table(
+    df: pd.DataFrame,
+    key: str = "tabela",
+    cache_key: Optional[Hashable] = None,
+    column_config: Optional[Dict] = None
+):
+    """
+    Renderiza a tabela paginada no servidor
+    
+    Apenas as linhas da página atual são enviadas ao navegador. A ordem
+    calculada para a coluna escolhida fica guardada na sessão (por
+    ``cache_key`` e coluna), então trocar de página não reordena os dados.
+    A página volta para a primeira quando os filtros mudam.
+    
+    Args:
+        df: DataFrame filtrado
+        key: Prefixo das chaves dos widgets na sessão
+        cache_key: Identifica o conteúdo de ``df`` (versão do dataset + filtros)
+        column_config: Configuração das colunas do st.dataframe
+    """
+    from services.pagination import page_count, paginate_dataframe, sort_positions
+    from ..core.config import PAGE_SIZE_OPTIONS, DEFAULT_PAGE_SIZE
+    
+    page_key = f"{key}_pagina"
+    ordem_key = f"{key}_ordem"
     
-    # Excel
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Dados')
-    
-    st.download_button(
-        "📥 Download Excel",
-        buffer.getvalue(),
-        f"{filename_base}.xlsx",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        width="stretch"
+    # Filtros alterados: volta para a primeira página
+    if st.session_state.get(f"{key}_cache_key") != cache_key:
+        st.session_state[f"{key}_cache_key"] = cache_key
+        st.session_state[page_key] = 1
+    
+    col1, col2, col3 = st.columns([3, 2, 2])
+    with col1:
+        sort_column = st.selectbox(
+            "Ordenar por",
+            ["(padrão)"] + [str(col) for col in df.columns],
+            key=f"{key}_coluna"
+        )
+    with col2:
+        crescente = st.selectbox("Ordem", ["Decrescente", "Crescente"], key=f"{key}_direcao") == "Crescente"
+    with col3:
+        page_size = st.selectbox(
+            "Linhas por página",
+            PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+            key=f"{key}_tamanho"
+        )
+    
+    positions = None
+    if sort_column != "(padrão)":
+        chave_ordem = (cache_key, sort_column, crescente)
+        ordem = st.session_state.get(ordem_key)
+        if cache_key is None or ordem is None or ordem[0] != chave_ordem:
+            ordem = (chave_ordem, sort_positions(df, sort_column, ascending=crescente))
+            st.session_state[ordem_key] = ordem
+        positions = ordem[1]
+    
+    total_paginas = page_count(len(df), page_size)
+    if st.session_state.get(page_key, 1) > total_paginas:
+        st.session_state[page_key] = total_paginas
+    
+    pagina = st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key=page_key)
+    df_pagina, pagina = paginate_dataframe(df, int(pagina), page_size, positions)
+    
+    inicio = (pagina - 1) * page_size + 1 if len(df) else 0
+    fim = inicio + len(df_pagina) - 1 if len(df) else 0
+    st.caption(
+        f"Mostrando {inicio:,}–{fim:,} de {len(df):,} registros "
+        f"(página {pagina} de {total_paginas})".replace(",", ".")
     )
+    st.dataframe(df_pagina, width="stretch", column_config=column_config)
 
 
 def render_filter_sidebar(
@@ -200,3 +362,41 @@ def render_filter_sidebar(
     filtro_transportadora = st.text_input("Transportadora", placeholder="Digite para filtrar...")
     
     return data_inicio, data_fim, filtro_status, filtro_depot, filtro_transportadora
+
+
+def render_timing_panel():
+    """
+    Renderiza na sidebar o tempo por etapa (ver src.core.timing)
+    
+    Mostra o detalhamento da execução atual do script e os histogramas
+    resumidos (média, p50, p95, máximo) da sessão e de todas as sessões.
+    """
+    sessao = current_session_id()
+    with st.sidebar.expander("⏱️ Tempo por etapa"):
+        execucao = stage_timings.last_run(sessao)
+        if execucao:
+            st.caption("Última execução")
+            st.dataframe(
+                pd.DataFrame({'Etapa': list(execucao), 'ms': list(execucao.values())}),
+                hide_index=True,
+                column_config={'ms': st.column_config.NumberColumn('ms', format="%.1f")}
+            )
+        else:
+            st.caption("Nenhuma etapa medida nesta execução")
+        
+        for titulo, resumo in (("Sessão", stage_timings.summary(sessao)), ("Todas as sessões", stage_timings.summary())):
+            if not resumo:
+                continue
+            st.caption(titulo)
+            tabela = pd.DataFrame.from_dict(resumo, orient='index').rename_axis('Etapa').reset_index()
+            st.dataframe(
+                tabela.rename(columns={
+                    'count': 'N', 'mean_ms': 'média (ms)', 'p50_ms': 'p50 (ms)',
+                    'p95_ms': 'p95 (ms)', 'max_ms': 'máx (ms)'
+                }),
+                hide_index=True,
+                column_config={
+                    coluna: st.column_config.NumberColumn(coluna, format="%.1f")
+                    for coluna in ('média (ms)', 'p50 (ms)', 'p95 (ms)', 'máx (ms)')
+                }
+            )
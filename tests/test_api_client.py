@@ -0,0 +1,146 @@
+"""
+Testes para api_client.py
+"""
+import json
+import pytest
+from datetime import date
+from services.api_client import WMSAPIClient, WMSAPIError, split_periodo
+from services.resilience import ResilientCaller
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = ""
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        corpo = json.dumps(self._payload).encode("utf-8")
+        for inicio in range(0, len(corpo), chunk_size):
+            yield corpo[inicio:inicio + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _client_autenticado():
+    client = WMSAPIClient(base_url="http://wms", login="user", password="pass")
+    client.token_manager.set_token("token", ttl_seconds=600)
+    # Retries sem espera nos testes
+    client.resilience = ResilientCaller(sleep=lambda segundos: None)
+    return client
+
+
+def test_split_periodo_semana():
+    """Testa divisão de período em semanas"""
+    janelas = split_periodo(date(2025, 1, 1), date(2025, 1, 16), "semana")
+    assert janelas == [
+        (date(2025, 1, 1), date(2025, 1, 7)),
+        (date(2025, 1, 8), date(2025, 1, 14)),
+        (date(2025, 1, 15), date(2025, 1, 16)),
+    ]
+
+
+def test_split_periodo_mes():
+    """Testa divisão de período em meses"""
+    janelas = split_periodo(date(2025, 1, 20), date(2025, 3, 5), "mes")
+    assert janelas == [
+        (date(2025, 1, 20), date(2025, 1, 31)),
+        (date(2025, 2, 1), date(2025, 2, 28)),
+        (date(2025, 3, 1), date(2025, 3, 5)),
+    ]
+
+
+def test_split_periodo_janela_invalida():
+    """Testa janela inválida"""
+    with pytest.raises(ValueError):
+        split_periodo(date(2025, 1, 1), date(2025, 1, 2), "ano")
+
+
+def test_get_agendamentos_por_janelas_mescla_e_deduplica(monkeypatch):
+    """Testa busca concorrente por janelas com deduplicação por ID"""
+    client = _client_autenticado()
+    respostas = {
+        "01.01.2025 - 01.01.2025": [{"idagendamento": 1, "status": "Agendado"}],
+        "02.01.2025 - 02.01.2025": {"agendamentos": [{"idagendamento": 1, "status": "Confirmado"},
+                                                     {"idagendamento": 2}]},
+        "03.01.2025 - 03.01.2025": [],
+    }
+    monkeypatch.setattr(
+        client.session, "post",
+        lambda url, json, headers, timeout, **kwargs: FakeResponse(respostas[json["diconsulta"]])
+    )
+    progresso = []
+
+    result = client.get_agendamentos_por_janelas(
+        date(2025, 1, 1), date(2025, 1, 3), janela="dia",
+        progress_callback=lambda concluidas, total, periodo: progresso.append((concluidas, total))
+    )
+
+    assert sorted(item["idagendamento"] for item in result) == [1, 2]
+    assert next(item for item in result if item["idagendamento"] == 1)["status"] == "Confirmado"
+    assert sorted(progresso) == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_get_agendamentos_por_janelas_falha_em_janela(monkeypatch):
+    """Testa que falha em uma janela é reportada"""
+    client = _client_autenticado()
+    monkeypatch.setattr(client.session, "post", lambda url, json, headers, timeout, **kwargs: FakeResponse(None, 500))
+
+    with pytest.raises(WMSAPIError):
+        client.get_agendamentos_por_janelas(date(2025, 1, 1), date(2025, 1, 2), janela="dia")
+
+
+def test_fetch_lista_reautentica_em_401(monkeypatch):
+    """Testa que 401 descarta o token, refaz o login e repete a requisição"""
+    client = _client_autenticado()
+    tokens = []
+
+    def _post(url, json, headers=None, timeout=None, **kwargs):
+        if url.endswith("/login"):
+            return FakeResponse({"autenticacao": True, "token": "novo"})
+        tokens.append(headers["Authorization"])
+        if headers["Authorization"] == "token":
+            return FakeResponse(None, 401)
+        return FakeResponse([{"idagendamento": 1}])
+    monkeypatch.setattr(client.session, "post", _post)
+
+    result = client.fetch_agendamentos(todos=True)
+
+    assert result == [{"idagendamento": 1}]
+    assert tokens == ["token", "novo"]
+    assert client.resilience.stats()["reauths"] == 1
+
+
+def test_iter_agendamentos_lotes_em_streaming(monkeypatch):
+    """Testa leitura em streaming da resposta em lotes"""
+    client = _client_autenticado()
+    payload = {"agendamentos": [{"idagendamento": i} for i in range(5)] + [None]}
+    chamadas = []
+
+    def _post(url, json, headers=None, timeout=None, stream=False):
+        chamadas.append(stream)
+        return FakeResponse(payload)
+    monkeypatch.setattr(client.session, "post", _post)
+
+    lotes = list(client.iter_agendamentos_lotes(todos=True, tamanho_lote=2))
+
+    assert chamadas == [True]
+    assert [[item["idagendamento"] for item in lote] for lote in lotes] == [[0, 1], [2, 3], [4]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""
+Testes para async_api_client.py
+"""
+import asyncio
+import json
+import pytest
+import httpx
+from datetime import date
+from services.api_client import WMSAPIError
+from services.async_api_client import AsyncWMSAPIClient, SyncAsyncWMSClient
+from services.resilience import ResilientCaller
+
+
+def _transport(respostas, chamadas):
+    """Transporte httpx falso: /login e /agendamento/lista por diconsulta"""
+    def handler(request):
+        chamadas.append(request.url.path)
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"autenticacao": True, "token": "tok"})
+        assert request.headers["Authorization"] == "tok"
+        consulta = json.loads(request.content).get("diconsulta", "")
+        return httpx.Response(200, json=respostas[consulta])
+    return httpx.MockTransport(handler)
+
+
+def _kwargs(transport):
+    # Backoff sem espera para os testes
+    return dict(
+        base_url="http://wms", login="user", password="pass", transport=transport,
+        resilience=ResilientCaller(base_delay=0)
+    )
+
+
+def test_get_agendamentos_por_janelas_async():
+    """Testa busca concorrente por janelas com um único login"""
+    chamadas = []
+    respostas = {
+        "01.01.2025 - 01.01.2025": [{"idagendamento": 1}],
+        "02.01.2025 - 02.01.2025": {"agendamentos": [{"idagendamento": 1}, {"idagendamento": 2}]},
+    }
+
+    async def run():
+        async with AsyncWMSAPIClient(**_kwargs(_transport(respostas, chamadas)), max_concurrency=2) as client:
+            return await client.get_agendamentos_por_janelas(date(2025, 1, 1), date(2025, 1, 2), janela="dia")
+
+    result = asyncio.run(run())
+
+    assert sorted(item["idagendamento"] for item in result) == [1, 2]
+    assert chamadas.count("/login") == 1
+
+
+def test_sync_wrapper_get_agendamentos_e_progresso():
+    """Testa a fachada síncrona reaproveitando o token entre chamadas"""
+    chamadas = []
+    respostas = {
+        "": [{"idagendamento": 1}, {"idagendamento": 2}],
+        "01.01.2025 - 01.01.2025": [],
+        "02.01.2025 - 02.01.2025": [{"idagendamento": 3}],
+    }
+    client = SyncAsyncWMSClient(**_kwargs(_transport(respostas, chamadas)))
+    progresso = []
+    try:
+        assert len(client.get_agendamentos(todos=True)) == 2
+        result = client.get_agendamentos_por_janelas(
+            date(2025, 1, 1), date(2025, 1, 2), janela="dia",
+            progress_callback=lambda concluidas, total, periodo: progresso.append(concluidas)
+        )
+    finally:
+        client.close()
+
+    assert [item["idagendamento"] for item in result] == [3]
+    assert sorted(progresso) == [1, 2]
+    assert chamadas.count("/login") == 1
+
+
+def test_status_de_erro_gera_excecao():
+    """Testa que status diferente de 200 gera WMSAPIError"""
+    def handler(request):
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"autenticacao": True, "token": "tok"})
+        return httpx.Response(500, text="erro")
+
+    async def run():
+        async with AsyncWMSAPIClient(**_kwargs(httpx.MockTransport(handler))) as client:
+            await client.get_agendamentos(todos=True)
+
+    with pytest.raises(WMSAPIError):
+        asyncio.run(run())
+
+
+def test_401_refaz_login_e_repete():
+    """Testa novo login e nova tentativa após 401 (mesma política do cliente síncrono)"""
+    chamadas = []
+    tokens = iter(["tok1", "tok2"])
+
+    def handler(request):
+        chamadas.append(request.url.path)
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"autenticacao": True, "token": next(tokens)})
+        if request.headers["Authorization"] == "tok1":
+            return httpx.Response(401, text="token expirado")
+        return httpx.Response(200, json=[{"idagendamento": 1}])
+
+    async def run():
+        async with AsyncWMSAPIClient(**_kwargs(httpx.MockTransport(handler))) as client:
+            result = await client.get_agendamentos(todos=True)
+            return result, client.resilience.stats()
+
+    result, stats = asyncio.run(run())
+
+    assert result == [{"idagendamento": 1}]
+    assert chamadas.count("/login") == 2
+    assert stats['reauths'] == 1
+
+
+def test_erro_de_conexao_e_repetido():
+    """Testa retry de erro de transporte do httpx"""
+    tentativas = []
+
+    def handler(request):
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"autenticacao": True, "token": "tok"})
+        tentativas.append(1)
+        if len(tentativas) == 1:
+            raise httpx.ConnectError("conexão recusada")
+        return httpx.Response(200, json=[{"idagendamento": 1}])
+
+    async def run():
+        async with AsyncWMSAPIClient(**_kwargs(httpx.MockTransport(handler))) as client:
+            result = await client.get_agendamentos(todos=True)
+            return result, client.resilience.stats()
+
+    result, stats = asyncio.run(run())
+
+    assert result == [{"idagendamento": 1}]
+    assert stats['retries'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+"""
+Testes para cache.py
+"""
+import time
+import pytest
+from services.cache import AgendamentosCache
+
+
+def test_get_or_load_carrega_uma_vez():
+    """Testa que o loader só é chamado em cache miss"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=4)
+    chamadas = []
+
+    def loader():
+        chamadas.append(1)
+        return "dados"
+
+    assert cache.get_or_load("todos", loader) == "dados"
+    assert cache.get_or_load("todos", loader) == "dados"
+    assert len(chamadas) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_ttl_expira_entrada():
+    """Testa expiração por TTL"""
+    cache = AgendamentosCache(ttl_seconds=0, max_entries=4)
+    cache.set("todos", "dados")
+    assert cache.get("todos") is None
+
+
+def test_max_entries_descarta_menos_usada():
+    """Testa descarte da entrada menos usada recentemente"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate():
+    """Testa invalidação manual"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+
+
+def test_contains_nao_altera_estatisticas():
+    """Testa que contains não conta hit/miss e respeita o TTL"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=4)
+    cache.set("todos", "dados")
+    assert cache.contains("todos")
+    assert not cache.contains("outro")
+    assert cache.stats()['hits'] == 0 and cache.stats()['misses'] == 0
+    assert not AgendamentosCache(ttl_seconds=0).contains("todos")
+
+
+def test_locks_de_carga_descartados_com_a_entrada():
+    """Testa que os locks de carga não crescem com chaves descartadas"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=2)
+    for chave in ["a", "b", "c", "d"]:
+        cache.get_or_load(chave, lambda: chave.upper())
+
+    assert set(cache._load_locks) == {"c", "d"}
+    cache.invalidate("c")
+    assert set(cache._load_locks) == {"d"}
+    cache.invalidate()
+    assert cache._load_locks == {}
+
+
+def test_lock_de_carga_em_uso_nao_e_descartado():
+    """Testa que a invalidação durante a carga mantém o lock da chave"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=4)
+
+    def carregar():
+        cache.invalidate("todos")
+        assert "todos" in cache._load_locks
+        return "dados"
+
+    assert cache.get_or_load("todos", carregar) == "dados"
+
+
+def _aguardar_refresh(cache, key, timeout=5.0):
+    """Aguarda o término da atualização em segundo plano"""
+    limite = time.monotonic() + timeout
+    while cache.is_refreshing(key) and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def test_refresh_in_background_registra_erro():
+    """Testa que a falha da atualização em segundo plano fica registrada"""
+    cache = AgendamentosCache(ttl_seconds=60, max_entries=4)
+
+    def falha():
+        raise RuntimeError("API fora")
+
+    cache.refresh_in_background("todos", falha)
+    _aguardar_refresh(cache, "todos")
+    assert not cache.is_refreshing("todos")
+    assert isinstance(cache.last_error("todos"), RuntimeError)
+
+    cache.refresh_in_background("todos", lambda: "dados")
+    _aguardar_refresh(cache, "todos")
+    assert cache.last_error("todos") is None
+    assert cache.get("todos") == "dados"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
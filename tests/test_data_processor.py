@@ -3,7 +3,44 @@ Testes para data_processor.py
 """
 import pytest
 import pandas as pd
-from services.data_processor import process_agendamentos_data, create_agendamentos_summary
+from services.data_processor import (
+    process_agendamentos_data,
+    process_agendamentos_data_reference,
+    process_agendamentos_lotes,
+    process_agendamentos_stream,
+    iter_agendamentos_chunks,
+    create_agendamentos_summary,
+    apply_typed_schema
+)
+
+
+def _agendamentos_exemplo():
+    """Agendamentos no formato retornado pela API WMS"""
+    return [
+        {
+            'idagendamento': 2138, 'galpao': 'LINS', 'dtcadastro': '06.08.2025 16:01:52',
+            'dtconfirmacao': None, 'razao': 'LAO INDUSTRIA LTDA', 'transportadora': 'RODOMAXLOG',
+            'dtagendamento': '15.08.2025 11:00:00', 'dtconfirmada': '', 'status': 'Agendado',
+            'qnt_volume': '6', 'peso': 2025,
+            'pedidos': [
+                {'peiddo': '4501673473', 'codigo': '50000108', 'material': 'HIDRO VEL DN20', 'quantidade': '2000'},
+                {'peiddo': '4501673474', 'codigo': '50000108', 'material': 'HIDRO VEL DN20', 'quantidade': '1000'},
+            ]
+        },
+        {
+            'idagendamento': 2139, 'galpao': 'BARUERI', 'dtcadastro': '07.08.2025 09:00:00',
+            'dtconfirmacao': '08.08.2025 10:00:00', 'razao': 'ACME', 'transportadora': 'TRANS SP',
+            'dtagendamento': '20.08.2025 08:30:00', 'dtconfirmada': '20.08.2025 08:30:00',
+            'status': 'Confirmado', 'qnt_volume': '1', 'peso': 10.5, 'pedidos': []
+        },
+        {
+            'idagendamento': 2140, 'galpao': 'LINS', 'dtcadastro': '07.08.2025 09:00:00',
+            'dtconfirmacao': None, 'razao': 'ACME', 'transportadora': None,
+            'dtagendamento': '01.08.2025 14:00:00', 'dtconfirmada': '', 'status': 'Cancelado',
+            'qnt_volume': None, 'peso': None,
+            'pedidos': [{'peiddo': '4501673480', 'material': 'TUBO PVC', 'quantidade': 'x'}]
+        },
+    ]
 
 
 def test_process_agendamentos_data_empty():
@@ -44,5 +81,113 @@ def test_create_agendamentos_summary_with_data():
     assert result['status_counts']['Confirmado'] == 2
 
 
+def test_process_agendamentos_data_expande_pedidos():
+    """Testa expansão de uma linha por pedido"""
+    result = process_agendamentos_data(_agendamentos_exemplo())
+    
+    assert len(result) == 4
+    assert 'Pedidos' not in result.columns
+    assert sorted(result['Documento de Compra'].dropna()) == ['4501673473', '4501673474', '4501673480']
+    assert result['Código do Material'].isin(['']).sum() == 1
+
+
+def test_process_agendamentos_data_equivalente_a_referencia():
+    """Testa equivalência da expansão colunar com a implementação iterrows"""
+    data = _agendamentos_exemplo()
+    result = process_agendamentos_data(data)
+    expected = process_agendamentos_data_reference(data)
+    
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_process_agendamentos_data_sem_pedidos_equivalente():
+    """Testa equivalência quando nenhum agendamento possui pedidos"""
+    data = [{'idagendamento': 1, 'status': 'CONFIRMADO', 'pedidos': []},
+            {'idagendamento': 2, 'status': 'AGENDADO'}]
+    result = process_agendamentos_data(data)
+    expected = process_agendamentos_data_reference(data)
+    
+    pd.testing.assert_frame_equal(result, expected)
+    assert 'Documento de Compra' not in result.columns
+
+
+def test_process_agendamentos_lotes_equivalente():
+    """Testa que o processamento em lotes equivale ao processamento único"""
+    data = _agendamentos_exemplo()
+    result = process_agendamentos_lotes([data[:1], data[1:]])
+    expected = process_agendamentos_data(data)
+    
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+    assert process_agendamentos_lotes([]).empty
+
+
+def test_iter_agendamentos_chunks_gera_blocos():
+    """Testa que o pipeline consome um gerador e produz um bloco por chunk"""
+    data = _agendamentos_exemplo()
+    chunks = list(iter_agendamentos_chunks(iter(data + [None]), chunk_size=2))
+    
+    assert len(chunks) == 2
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert 'Data Agendamento' in chunks[0].columns
+    assert 'Pedidos' not in chunks[0].columns
+
+
+def test_process_agendamentos_stream_equivalente():
+    """Testa equivalência do pipeline em blocos com o processamento único"""
+    data = _agendamentos_exemplo()
+    result = process_agendamentos_stream(iter(data), chunk_size=1)
+    expected = process_agendamentos_data(data)
+    
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+    assert process_agendamentos_stream(iter([])).empty
+
+
+def test_apply_typed_schema():
+    """Testa tipos compactos no DataFrame processado"""
+    df = pd.DataFrame({
+        'ID': [1.0, 1.0, 2.0, None],
+        'Status da Entrega': ['Agendado', 'Agendado', 'Agendado', 'Confirmado'],
+        'Peso (kg)': [10.5, 10.5, 3.0, None],
+        'Quantidade do Pedido': [2000.0, 1000.0, 1.5, None],
+    })
+
+    result = apply_typed_schema(df)
+
+    assert isinstance(result['Status da Entrega'].dtype, pd.CategoricalDtype)
+    assert str(result['ID'].dtype) == 'Int64'
+    assert result['ID'].isna().sum() == 1
+    assert result['Peso (kg)'].dtype == 'float32'
+    # Quantidade não inteira permanece float
+    assert result['Quantidade do Pedido'].dtype == 'float64'
+
+
+def test_apply_typed_schema_mantem_coluna_com_texto():
+    """Testa que valores não numéricos não viram nulos silenciosamente"""
+    df = pd.DataFrame({
+        'ID': [1, 2, 3],
+        'Quantidade de Volume': ['6', 'N/D', None],
+        'Quantidade do Pedido': ['2000', '1000', None],
+        'Peso (kg)': ['10.5', 'sem peso', '3'],
+    })
+
+    result = apply_typed_schema(df)
+
+    assert result['Quantidade de Volume'].equals(df['Quantidade de Volume'])
+    assert result['Peso (kg)'].equals(df['Peso (kg)'])
+    # Coluna só com números (e nulos) continua sendo convertida
+    assert str(result['Quantidade do Pedido'].dtype) == 'Int64'
+    assert result['Quantidade do Pedido'].isna().sum() == 1
+
+
+def test_summary_ignora_categorias_sem_ocorrencias():
+    """Testa que categorias filtradas não aparecem no resumo"""
+    df = apply_typed_schema(process_agendamentos_data(_agendamentos_exemplo() * 3))
+    filtrado = df[df['Status da Entrega'] == 'Agendado']
+
+    result = create_agendamentos_summary(filtrado)
+
+    assert result['status_counts'] == {'Agendado': len(filtrado)}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+"""
+Testes para export.py
+"""
+import io
+import pytest
+import pandas as pd
+import services.export as export
+from services.export import export_bytes, to_csv_bytes, to_csv_gzip_bytes, to_excel_bytes, to_parquet_bytes
+
+
+def _df():
+    return pd.DataFrame({
+        'ID': pd.array([1, 2, None], dtype='Int64'),
+        'Status da Entrega': pd.Categorical(['Agendado', 'Confirmado', 'Agendado']),
+        'Data Agendamento': pd.to_datetime(['2025-08-15 11:00', None, '2025-08-20 08:30']),
+        'Peso (kg)': pd.array([1.5, None, 3.0], dtype='float32'),
+    })
+
+
+def test_to_csv_bytes():
+    """Testa exportação CSV"""
+    conteudo = to_csv_bytes(_df()).decode('utf-8')
+    assert conteudo.splitlines()[0] == 'ID,Status da Entrega,Data Agendamento,Peso (kg)'
+    assert len(conteudo.splitlines()) == 4
+
+
+def test_to_parquet_bytes_preserva_schema():
+    """Testa que o Parquet preserva os tipos (category, Int64, datas, float32)"""
+    df = _df()
+
+    lido = pd.read_parquet(io.BytesIO(to_parquet_bytes(df)))
+
+    pd.testing.assert_frame_equal(lido, df)
+
+
+def test_to_csv_gzip_bytes():
+    """Testa CSV compactado com o mesmo conteúdo do CSV"""
+    df = _df()
+
+    lido = pd.read_csv(io.BytesIO(to_csv_gzip_bytes(df)), compression='gzip')
+
+    assert lido.equals(pd.read_csv(io.BytesIO(to_csv_bytes(df))))
+
+
+@pytest.mark.parametrize("min_rows", [0, 10 ** 6])
+def test_to_excel_bytes_write_only_equivalente(monkeypatch, min_rows):
+    """Testa que os dois caminhos do Excel (pandas e write-only) geram o mesmo conteúdo"""
+    monkeypatch.setattr(export, 'EXCEL_WRITE_ONLY_MIN_ROWS', min_rows)
+    df = _df()
+
+    lido = pd.read_excel(io.BytesIO(to_excel_bytes(df, sheet_name='Agendamentos')), sheet_name='Agendamentos')
+
+    assert list(lido.columns) == list(df.columns)
+    assert lido['Status da Entrega'].tolist() == ['Agendado', 'Confirmado', 'Agendado']
+    assert lido['ID'].isna().tolist() == [False, False, True]
+    assert lido['Data Agendamento'].iloc[0] == pd.Timestamp('2025-08-15 11:00')
+    assert pd.isna(lido['Peso (kg)'].iloc[1])
+
+
+def test_export_bytes_cacheia_por_chave(monkeypatch):
+    """Testa que o arquivo é gerado uma vez por chave"""
+    chamadas = []
+
+    def _builder(df):
+        chamadas.append(len(df))
+        return b'x'
+    monkeypatch.setitem(export.EXPORT_FORMATS, 'csv', ('csv', 'text/csv', _builder))
+    export.get_export_cache().invalidate()
+
+    assert export_bytes(_df(), 'csv', cache_key=('v1', 'filtro')) == b'x'
+    assert export_bytes(_df(), 'csv', cache_key=('v1', 'filtro')) == b'x'
+    export_bytes(_df(), 'csv', cache_key=('v1', 'outro filtro'))
+
+    assert chamadas == [3, 3]
+
+
+def test_export_bytes_formato_invalido():
+    """Testa formato não suportado"""
+    with pytest.raises(ValueError):
+        export_bytes(_df(), 'pdf')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
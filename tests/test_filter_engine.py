@@ -0,0 +1,82 @@
+"""
+Testes para filter_engine.py
+"""
+import pytest
+import pandas as pd
+from datetime import date, datetime
+from services.filter_engine import FilterIndex, filter_dataframe
+from services.data_processor import filter_agendamentos
+
+
+def _df_exemplo():
+    return pd.DataFrame({
+        'ID': [1, 2, 3, 4, 5, 6],
+        'Data Agendamento': pd.to_datetime([
+            '2025-03-10 08:00', '2025-03-01 09:00', '2025-02-28 23:59',
+            None, '2025-03-10 17:30', '2025-01-15 10:00'
+        ]),
+        'Status da Entrega': ['Agendado', 'Confirmado', 'Agendado', 'Agendado', 'Cancelado', 'Confirmado'],
+        'Depósito': pd.Categorical(['LINS', 'LINS', 'BARUERI', 'LINS', 'BARUERI', 'FRANCA']),
+        'Transportadora': ['Rodomax', 'RODOMAX LOG', 'Trans SP', None, 'rodo', 'Trans SP'],
+    })
+
+
+def _filtro_mascara(df, data_inicio, data_fim, status=None, deposito=None, transportadora=None):
+    """Implementação por máscara booleana (comportamento anterior do app)"""
+    mask = (df['Data Agendamento'].dt.date >= data_inicio) & (df['Data Agendamento'].dt.date <= data_fim)
+    if status:
+        mask &= df['Status da Entrega'] == status
+    if deposito:
+        mask &= df['Depósito'] == deposito
+    if transportadora:
+        mask &= df['Transportadora'].str.contains(transportadora, case=False, na=False)
+    return df[mask]
+
+
+@pytest.mark.parametrize("filtros", [
+    dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31)),
+    dict(data_inicio=date(2025, 3, 1), data_fim=date(2025, 3, 10)),
+    dict(data_inicio=date(2025, 2, 28), data_fim=date(2025, 2, 28)),
+    dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31), status='Agendado'),
+    dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31), status='Agendado', deposito='LINS'),
+    dict(data_inicio=date(2025, 3, 1), data_fim=date(2025, 3, 31), deposito='BARUERI'),
+    dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31), transportadora='rodo'),
+    dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31), status='Inexistente'),
+])
+def test_filter_dataframe_equivalente_a_mascara(filtros):
+    """Testa equivalência do índice com o filtro por máscara booleana"""
+    df = _df_exemplo()
+    result = filter_dataframe(df, **filtros)
+    expected = _filtro_mascara(df, **filtros)
+
+    assert list(result['ID']) == list(expected['ID'])
+
+
+def test_filter_dataframe_sem_filtros_nao_copia():
+    """Testa que sem filtros efetivos o próprio DataFrame é retornado"""
+    df = _df_exemplo()
+    assert filter_dataframe(df) is df
+
+
+def test_filter_index_datetime_filtra_instante():
+    """Testa limites com datetime (instante exato)"""
+    index = FilterIndex(_df_exemplo())
+    posicoes = index.select(data_inicio=datetime(2025, 3, 10, 8, 0), data_fim=datetime(2025, 3, 10, 12, 0))
+    assert list(posicoes) == [0]
+
+
+def test_filter_index_valores_distintos():
+    """Testa valores distintos para as opções dos filtros"""
+    index = FilterIndex(_df_exemplo())
+    assert index.status_values() == ['Agendado', 'Cancelado', 'Confirmado']
+    assert index.deposito_values() == ['BARUERI', 'FRANCA', 'LINS']
+
+
+def test_filter_agendamentos_usa_colunas_processadas():
+    """Testa filter_agendamentos com os nomes de colunas do DataFrame processado"""
+    result = filter_agendamentos(_df_exemplo(), {'galpao': 'LINS', 'status': 'Agendado'})
+    assert list(result['ID']) == [1, 4]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
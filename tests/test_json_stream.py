@@ -0,0 +1,54 @@
+"""
+Testes para json_stream.py
+"""
+import json
+import pytest
+from services.json_stream import iter_json_array, iter_lotes
+
+
+def _chunks(payload, tamanho):
+    corpo = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+    return [corpo[i:i + tamanho] for i in range(0, len(corpo), tamanho)]
+
+
+AGENDAMENTOS = [
+    {"idagendamento": 1, "razao": "Fornecedor São João", "peso": 12.5, "pedidos": [{"peiddo": "10"}]},
+    {"idagendamento": 2, "razao": "Ação \"Ltda\"", "peso": 1000, "pedidos": []},
+    {"idagendamento": 3, "razao": None, "peso": 7, "pedidos": None},
+]
+
+
+@pytest.mark.parametrize("tamanho", [1, 3, 7, 4096])
+def test_iter_json_array_objeto_com_agendamentos(tamanho):
+    """Testa decodificação do campo agendamentos em chunks de qualquer tamanho"""
+    payload = {"total": 3, "agendamentos": AGENDAMENTOS, "extra": {"a": [1, 2]}}
+    assert list(iter_json_array(_chunks(payload, tamanho))) == AGENDAMENTOS
+
+
+@pytest.mark.parametrize("tamanho", [1, 5])
+def test_iter_json_array_lista_na_raiz(tamanho):
+    """Testa array na raiz, incluindo números divididos entre chunks"""
+    assert list(iter_json_array(_chunks("[123456, 7.25, \"x\"]", tamanho))) == [123456, 7.25, "x"]
+
+
+def test_iter_json_array_vazio():
+    """Testa arrays e objetos sem agendamentos"""
+    assert list(iter_json_array(_chunks({"agendamentos": []}, 2))) == []
+    assert list(iter_json_array(_chunks({"mensagem": "ok"}, 2))) == []
+
+
+def test_iter_json_array_invalido():
+    """Testa JSON truncado e campo que não é lista"""
+    with pytest.raises(ValueError):
+        list(iter_json_array(_chunks('{"agendamentos": [{"idagendamento": 1}', 4)))
+    with pytest.raises(ValueError):
+        list(iter_json_array(_chunks({"agendamentos": "erro"}, 4)))
+
+
+def test_iter_lotes():
+    """Testa agrupamento em lotes"""
+    assert list(iter_lotes(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+"""
+Testes para logger.py
+"""
+import json
+import logging
+import pytest
+import src.core.logger as logger_mod
+from src.core.logger import JsonFormatter, log_api_call, log_error, shutdown_logging
+
+
+@pytest.fixture
+def arquivo_log(tmp_path, monkeypatch):
+    """Redireciona o arquivo de log e retorna as linhas gravadas (em JSON)"""
+    caminho = tmp_path / "logs" / "app.log"
+    shutdown_logging()
+    monkeypatch.setattr(logger_mod, "LOG_FILE", str(caminho))
+
+    def ler():
+        shutdown_logging()
+        return [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines()]
+
+    yield ler
+    shutdown_logging()
+
+
+def test_log_api_call_grava_json_estruturado(arquivo_log):
+    """Testa os campos estruturados da chamada à API"""
+    log_api_call("/agendamento/lista", True, 42, duration=0.25, status_code=200)
+
+    registros = arquivo_log()
+
+    assert len(registros) == 1
+    registro = registros[0]
+    assert registro["message"] == "API call successful - Endpoint: /agendamento/lista, Records: 42"
+    assert registro["event"] == "api_call"
+    assert registro["endpoint"] == "/agendamento/lista"
+    assert registro["records"] == 42
+    assert registro["duration_ms"] == 250.0
+    assert registro["status_code"] == 200
+    assert registro["level"] == "INFO"
+    # Fora de uma sessão do Streamlit não há session_id
+    assert "session_id" not in registro
+
+
+def test_log_error_inclui_traceback(arquivo_log):
+    """Testa que o traceback vai num campo separado da mensagem"""
+    try:
+        raise ValueError("resposta inválida")
+    except ValueError as e:
+        log_error(e, "login WMS")
+
+    registro = arquivo_log()[0]
+
+    assert registro["message"] == "Error in login WMS: resposta inválida"
+    assert registro["error_type"] == "ValueError"
+    assert "Traceback" in registro["exception"]
+
+
+def test_json_formatter_inclui_campos_extra():
+    """Testa que campos de ``extra`` entram no JSON e os nulos são omitidos"""
+    record = logging.makeLogRecord({
+        "name": "wms_sigma", "levelname": "INFO", "msg": "Sync %s",
+        "args": ("ok",), "session_id": "abc", "duration_ms": None,
+    })
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "Sync ok"
+    assert payload["session_id"] == "abc"
+    assert "duration_ms" not in payload
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,49 @@
+"""
+Testes para pagination.py
+"""
+import numpy as np
+import pytest
+import pandas as pd
+from services.pagination import page_count, paginate_dataframe, sort_positions
+
+
+def _df():
+    return pd.DataFrame({'ID': range(10), 'Peso (kg)': [5.0, np.nan, 1.0, 3.0, 2.0, 9.0, np.nan, 4.0, 7.0, 6.0]},
+                        index=[f"r{i}" for i in range(10)])
+
+
+def test_page_count():
+    """Testa cálculo do número de páginas"""
+    assert page_count(0, 100) == 1
+    assert page_count(100, 100) == 1
+    assert page_count(101, 100) == 2
+
+
+def test_paginate_dataframe_limita_pagina():
+    """Testa fatiamento e limite da página"""
+    df = _df()
+
+    pagina, numero = paginate_dataframe(df, 2, 4)
+    assert pagina['ID'].tolist() == [4, 5, 6, 7]
+    assert numero == 2
+
+    pagina, numero = paginate_dataframe(df, 99, 4)
+    assert pagina['ID'].tolist() == [8, 9]
+    assert numero == 3
+
+
+def test_paginate_dataframe_ordenado():
+    """Testa paginação sobre a ordem calculada (nulos no final)"""
+    df = _df()
+    positions = sort_positions(df, 'Peso (kg)', ascending=False)
+
+    primeira, _ = paginate_dataframe(df, 1, 3, positions)
+    ultima, _ = paginate_dataframe(df, 4, 3, positions)
+
+    assert primeira['Peso (kg)'].tolist() == [9.0, 7.0, 6.0]
+    assert ultima['Peso (kg)'].isna().all()
+    assert len(df) == 10  # DataFrame original não é alterado
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
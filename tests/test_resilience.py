@@ -0,0 +1,104 @@
+"""
+Testes para resilience.py
+"""
+import pytest
+import requests
+from services.api_client import WMSAPIError
+from services.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def _caller(**kwargs):
+    esperas = []
+    caller = ResilientCaller(sleep=esperas.append, **kwargs)
+    return caller, esperas
+
+
+def _falha_n_vezes(n, erro):
+    chamadas = []
+
+    def fn():
+        chamadas.append(1)
+        if len(chamadas) <= n:
+            raise erro
+        return "ok"
+    return fn, chamadas
+
+
+def test_retry_em_erro_temporario():
+    """Testa nova tentativa com backoff em timeout"""
+    caller, esperas = _caller(max_attempts=3, base_delay=1.0, max_delay=10.0)
+    fn, chamadas = _falha_n_vezes(2, requests.exceptions.Timeout())
+
+    assert caller.call(fn) == "ok"
+    assert len(chamadas) == 3
+    assert len(esperas) == 2
+    assert 0 <= esperas[0] <= 1.0 and 0 <= esperas[1] <= 2.0
+    assert caller.stats()["retries"] == 2
+
+
+def test_retry_respeita_retry_after():
+    """Testa que o header Retry-After define a espera (limitada ao máximo)"""
+    caller, esperas = _caller(max_attempts=2, max_delay=5.0)
+    fn, _ = _falha_n_vezes(1, WMSAPIError("Status 429", status_code=429, retry_after=30))
+
+    assert caller.call(fn) == "ok"
+    assert esperas == [5.0]
+
+
+def test_erro_do_cliente_nao_repete():
+    """Testa que erros 4xx (exceto 401/429) não são repetidos"""
+    caller, esperas = _caller()
+    fn, chamadas = _falha_n_vezes(1, WMSAPIError("Status 400", status_code=400))
+
+    with pytest.raises(WMSAPIError):
+        caller.call(fn)
+    assert len(chamadas) == 1
+    assert esperas == []
+
+
+def test_401_reautentica_uma_vez():
+    """Testa que 401 chama on_unauthorized e repete apenas uma vez"""
+    caller, _ = _caller()
+    invalidacoes = []
+    fn, chamadas = _falha_n_vezes(5, WMSAPIError("Status 401", status_code=401))
+
+    with pytest.raises(WMSAPIError):
+        caller.call(fn, on_unauthorized=lambda: invalidacoes.append(1))
+    assert invalidacoes == [1]
+    assert len(chamadas) == 2
+
+
+def test_circuit_breaker_abre_e_bloqueia_chamadas():
+    """Testa abertura do circuito após falhas consecutivas"""
+    caller, _ = _caller(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60), max_attempts=1)
+    fn, chamadas = _falha_n_vezes(10, requests.exceptions.ConnectionError())
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            caller.call(fn)
+    with pytest.raises(CircuitOpenError):
+        caller.call(fn)
+
+    assert len(chamadas) == 2
+    stats = caller.stats()
+    assert stats["breaker_trips"] == 1
+    assert stats["short_circuits"] == 1
+    assert stats["breaker_state"] == "open"
+
+
+def test_circuit_breaker_meio_aberto_fecha_com_sucesso():
+    """Testa que, passado o reset_timeout, uma chamada de teste fecha o circuito"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    caller, _ = _caller(breaker=breaker, max_attempts=1)
+    fn, _ = _falha_n_vezes(1, requests.exceptions.ConnectionError())
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        caller.call(fn)
+    assert breaker.state == "open"
+
+    assert caller.call(fn) == "ok"
+    assert breaker.state == "closed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,38 @@
+"""
+Testes para search_index.py
+"""
+import pytest
+import pandas as pd
+from services.search_index import TextSearchIndex, normalize_text
+
+
+def test_normalize_text():
+    """Testa remoção de acentos e minúsculas"""
+    assert normalize_text("São Paulo LOGÍSTICA") == "sao paulo logistica"
+
+
+def test_search_sem_distincao_de_maiusculas():
+    """Testa busca por trecho equivalente a str.contains(case=False)"""
+    series = pd.Series(['Rodomax', 'RODOMAX LOG', None, 'Trans SP', 'rodo', 'Rodomax'])
+    index = TextSearchIndex(series)
+
+    expected = series.str.contains('rodo', case=False, na=False)
+    assert list(index.search('rodo')) == list(expected[expected].index)
+    assert list(index.search('RODOMAX')) == [0, 1, 5]
+
+
+def test_search_ignora_acentos():
+    """Testa busca sem acentos encontrando valores acentuados"""
+    index = TextSearchIndex(pd.Series(['Trans Ágil', 'São José Log', 'Outra']))
+    assert list(index.search('agil')) == [0]
+    assert list(index.search('SÃO')) == [1]
+
+
+def test_search_sem_resultado():
+    """Testa busca sem ocorrências"""
+    index = TextSearchIndex(pd.Series(['A', 'B']))
+    assert len(index.search('zzz')) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,68 @@
+"""
+Testes para snapshot.py
+"""
+import os
+import threading
+import pytest
+import pandas as pd
+from services import snapshot
+from services.snapshot import save_snapshot, load_snapshot
+
+
+def _df_exemplo():
+    return pd.DataFrame({
+        'ID': [1, 2],
+        'Status da Entrega': ['Agendado', 'Confirmado'],
+        'Data Agendamento': pd.to_datetime(['2025-08-15 11:00', '2025-08-20 08:30']),
+        'Peso (kg)': [2025.0, 10.5],
+    })
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """Testa gravação e leitura do snapshot preservando tipos"""
+    path = str(tmp_path / "snapshot.parquet")
+    df = _df_exemplo()
+
+    assert save_snapshot(df, path)
+    result, meta = load_snapshot(path)
+
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+    assert pd.api.types.is_datetime64_any_dtype(result['Data Agendamento'])
+    assert meta['rows'] == 2
+    assert meta['written_at'] is not None
+
+
+def test_snapshot_versao_diferente_e_ignorado(tmp_path, monkeypatch):
+    """Testa que snapshot com outra versão de schema não é carregado"""
+    path = str(tmp_path / "snapshot.parquet")
+    save_snapshot(_df_exemplo(), path)
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_SCHEMA_VERSION', -1)
+
+    assert load_snapshot(path) is None
+
+
+def test_snapshot_inexistente(tmp_path):
+    """Testa leitura de snapshot inexistente"""
+    assert load_snapshot(str(tmp_path / "nao_existe.parquet")) is None
+
+
+def test_snapshot_gravacoes_simultaneas(tmp_path):
+    """Testa gravações concorrentes sem temporário compartilhado nem sobras"""
+    path = str(tmp_path / "snapshot.parquet")
+    resultados = []
+    threads = [
+        threading.Thread(target=lambda: resultados.append(save_snapshot(_df_exemplo(), path)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert resultados == [True] * 8
+    assert load_snapshot(path)[1]['rows'] == 2
+    assert os.listdir(tmp_path) == ["snapshot.parquet"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,80 @@
+"""
+Testes para startup_profile.py
+"""
+import pytest
+from src.core.startup_profile import (
+    LAZY_MODULES,
+    eager_lazy_modules,
+    format_report,
+    parse_importtime,
+    profile_imports,
+    startup_modules,
+)
+
+
+SAIDA_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       652 |       1610 |   json.decoder
+import time:       697 |        697 |   json.encoder
+import time:       401 |       2707 | json
+import time:      2100 |       2100 | httpx
+"""
+
+
+def test_parse_importtime():
+    """Testa a leitura da saída de -X importtime"""
+    entries = parse_importtime(SAIDA_IMPORTTIME)
+
+    assert [e['module'] for e in entries] == ['json.decoder', 'json.encoder', 'json', 'httpx']
+    assert [e['depth'] for e in entries] == [1, 1, 0, 0]
+    assert entries[2]['self_ms'] == pytest.approx(0.401)
+    assert entries[2]['cumulative_ms'] == pytest.approx(2.707)
+
+
+def test_format_report_aponta_carga_indevida():
+    """Testa o total (importações diretas) e o aviso de módulo sob demanda"""
+    entries = parse_importtime(SAIDA_IMPORTTIME)
+
+    relatorio = format_report(entries, top=2)
+
+    assert "Tempo total de importação: 5 ms (4 módulos)" in relatorio
+    assert eager_lazy_modules(entries) == ['httpx']
+    assert relatorio.endswith("httpx")
+
+
+def test_startup_modules_le_importacoes_de_nivel_superior(tmp_path):
+    """Testa que só as importações de nível superior do script são listadas"""
+    app = tmp_path / "app.py"
+    app.write_text(
+        "import streamlit as st\n"
+        "from services.cache import get_agendamentos_cache\n"
+        "from services import sync\n"
+        "from services.cache import AgendamentosCache\n"
+        "\n"
+        "def exportar():\n"
+        "    import openpyxl\n",
+        encoding="utf-8",
+    )
+
+    assert startup_modules(str(app)) == ['streamlit', 'services.cache', 'services']
+
+
+def test_startup_modules_de_app():
+    """Testa que a lista derivada de app.py inclui os serviços da inicialização"""
+    modulos = startup_modules()
+
+    assert {'streamlit', 'services.sync', 'src.ui.components'} <= set(modulos)
+    assert not set(modulos) & set(LAZY_MODULES)
+
+
+def test_inicializacao_nao_carrega_modulos_sob_demanda(tmp_path):
+    """Testa que os módulos de app.py não importam plotly.express, openpyxl nem httpx"""
+    # Diretório vazio: a importação não depende de logs/ nem data/ existirem
+    entries = profile_imports(cwd=str(tmp_path))
+
+    assert entries
+    assert list(tmp_path.iterdir()) == []
+    assert eager_lazy_modules(entries) == [], LAZY_MODULES
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
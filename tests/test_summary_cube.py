@@ -0,0 +1,97 @@
+"""
+Testes para summary_cube.py
+"""
+import pytest
+import pandas as pd
+from datetime import date
+from services.data_processor import process_agendamentos_data, create_agendamentos_summary, value_counts_observed
+from services.filter_engine import filter_dataframe
+from services.summary_cube import SummaryCube, bucket_counts
+
+
+def _df_exemplo():
+    agendamentos = []
+    for i in range(40):
+        agendamentos.append({
+            'idagendamento': i,
+            'galpao': ['LINS', 'BARUERI', 'FRANCA'][i % 3],
+            'status': ['Agendado', 'Confirmado', 'Cancelado', 'Agendado'][i % 4],
+            'dtagendamento': f'{1 + i % 20:02d}.03.2025 {8 + i % 9:02d}:00:00' if i != 7 else None,
+            'qnt_volume': str(i % 5),
+            'peso': 10.5 * i,
+            'pedidos': [
+                {'peiddo': str(j), 'codigo': 'C', 'material': ['TUBO', 'HIDRO', '', 'VALVULA'][j % 4], 'quantidade': '1'}
+                for j in range(i % 4)
+            ]
+        })
+    return process_agendamentos_data(agendamentos)
+
+
+@pytest.mark.parametrize("filtros", [
+    dict(),
+    dict(data_inicio=date(2025, 3, 1), data_fim=date(2025, 3, 31)),
+    dict(data_inicio=date(2025, 3, 5), data_fim=date(2025, 3, 12), status='Agendado'),
+    dict(data_inicio=date(2025, 3, 1), data_fim=date(2025, 3, 31), deposito='LINS'),
+    dict(status='Confirmado', deposito='BARUERI'),
+    dict(status='Inexistente'),
+])
+def test_cubo_equivalente_ao_resumo_por_linhas(filtros):
+    """Testa que o cubo reproduz o resumo e os gráficos calculados por linhas"""
+    df = _df_exemplo()
+    cubo = SummaryCube(df)
+    filtrado = filter_dataframe(df, **filtros)
+
+    result = cubo.summary(**filtros)
+    expected = create_agendamentos_summary(filtrado)
+
+    assert result['total_agendamentos'] == expected['total_agendamentos']
+    assert result['total_pedidos'] == expected['total_pedidos']
+    assert result['galpoes_unicos'] == expected['galpoes_unicos']
+    assert result['status_counts'] == expected['status_counts']
+    assert result['galpao_counts'] == expected['galpao_counts']
+    assert result['peso_total'] == pytest.approx(float(expected['peso_total']))
+    assert result['volume_total'] == pytest.approx(float(expected['volume_total']))
+    if not filtrado.empty:
+        assert result['data_recente'] == expected['data_recente']
+
+    diario = filtrado.dropna(subset=['Data Agendamento']).groupby(
+        filtrado['Data Agendamento'].dt.normalize()
+    ).size()
+    assert cubo.daily_counts(**filtros).to_dict() == diario.to_dict()
+
+    materiais = filtrado[filtrado['Descrição do Material'].notna() & (filtrado['Descrição do Material'] != '')]
+    assert cubo.top_materials(5, **filtros).to_dict() == value_counts_observed(materiais['Descrição do Material']).head(5).to_dict()
+
+
+def test_bucket_counts_escolhe_granularidade():
+    """Testa agrupamento por dia/semana/mês conforme o período selecionado"""
+    serie = pd.Series(1, index=pd.date_range('2025-01-01', '2026-06-30', freq='D'))
+
+    diaria, granularidade = bucket_counts(serie.loc[:'2025-03-31'], date(2025, 1, 1), date(2025, 3, 31), max_points=120)
+    assert granularidade == 'dia' and len(diaria) == 90
+
+    semanal, granularidade = bucket_counts(serie, date(2025, 1, 1), date(2026, 6, 30), max_points=120)
+    assert granularidade == 'semana'
+    assert len(semanal) <= 120
+    assert (semanal.index.dayofweek == 0).all()
+    assert semanal.sum() == serie.sum()
+
+    mensal, granularidade = bucket_counts(serie, date(2025, 1, 1), date(2026, 6, 30), max_points=20)
+    assert granularidade == 'mes'
+    assert len(mensal) == 18
+    assert mensal.iloc[0] == 31
+
+
+def test_timeseries_counts_usa_serie_diaria_do_cubo():
+    """Testa que a série agrupada preserva o total da série diária"""
+    cubo = SummaryCube(_df_exemplo())
+    filtros = dict(data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31))
+
+    serie, granularidade = cubo.timeseries_counts(max_points=10, **filtros)
+
+    assert granularidade == 'mes'
+    assert serie.sum() == cubo.daily_counts(**filtros).sum()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+Testes para sync.py
+"""
+import pytest
+from services.sync import AgendamentosSync
+
+
+class FakeClient:
+    """Cliente falso que registra as consultas feitas"""
+
+    def __init__(self, todos, recentes):
+        self.todos = todos
+        self.recentes = recentes
+        self.consultas = []
+
+    def fetch_agendamentos(self, data_consulta=None, todos=False):
+        self.consultas.append('todos' if todos else data_consulta)
+        return self.todos if todos else self.recentes
+
+    def iter_agendamentos_lotes(self, data_consulta=None, todos=False):
+        yield self.fetch_agendamentos(data_consulta, todos)
+
+    def get_agendamentos_por_janelas(self, data_inicio, data_fim, progress_callback=None):
+        self.consultas.append((data_inicio, data_fim))
+        return self.recentes
+
+
+def _agendamento(id_, status, dtalteracao, pedidos=None):
+    return {
+        'idagendamento': id_,
+        'galpao': 'LINS',
+        'status': status,
+        'dtagendamento': '15.08.2025 11:00:00',
+        'dtalteracao': dtalteracao,
+        'pedidos': pedidos or [],
+    }
+
+
+def test_incremental_sync_sem_estado_faz_carga_completa():
+    """Testa que a primeira sincronização baixa todo o histórico"""
+    client = FakeClient([_agendamento(1, 'Agendado', '01.08.2025 10:00:00')], [])
+    sync = AgendamentosSync(client)
+
+    resumo = sync.incremental_sync()
+
+    assert client.consultas == ['todos']
+    assert resumo == {'novos': 1, 'atualizados': 0}
+    assert len(sync.df) == 1
+
+
+def test_incremental_sync_faz_upsert_por_id():
+    """Testa upsert de agendamentos alterados e novos"""
+    pedidos = [{'peiddo': '1', 'codigo': 'A', 'material': 'X', 'quantidade': '1'},
+               {'peiddo': '2', 'codigo': 'B', 'material': 'Y', 'quantidade': '2'}]
+    todos = [
+        _agendamento(1, 'Agendado', '01.08.2025 10:00:00', pedidos),
+        _agendamento(2, 'Agendado', '02.08.2025 10:00:00'),
+    ]
+    recentes = [
+        _agendamento(1, 'Confirmado', '05.08.2025 09:00:00', pedidos[:1]),
+        _agendamento(2, 'Agendado', '01.08.2025 08:00:00'),  # sem alteração
+        _agendamento(3, 'Agendado', '05.08.2025 09:30:00'),
+    ]
+    client = FakeClient(todos, recentes)
+    sync = AgendamentosSync(client)
+    sync.full_sync()
+    periodo = sync.periodo_incremental()
+
+    resumo = sync.incremental_sync()
+
+    assert resumo == {'novos': 1, 'atualizados': 1}
+    assert client.consultas[-1] == periodo
+    assert sorted(sync.df['ID'].unique()) == [1, 2, 3]
+    linhas_1 = sync.df[sync.df['ID'] == 1]
+    assert len(linhas_1) == 1
+    assert linhas_1['Status da Entrega'].iloc[0] == 'Confirmado'
+    assert sync.high_water_mark.day == 5
+    assert sync.known_ids == {1, 2, 3}
+
+
+def test_incremental_sync_com_falha_mantem_dados_anteriores():
+    """Testa que uma falha da API preserva o último DataFrame válido"""
+    client = FakeClient([_agendamento(1, 'Agendado', '01.08.2025 10:00:00')], [])
+    sync = AgendamentosSync(client)
+    sync.full_sync()
+    df_anterior = sync.df
+    last_sync = sync.last_sync
+
+    def _falha(*args, **kwargs):
+        raise ConnectionError("API fora do ar")
+    client.get_agendamentos_por_janelas = _falha
+
+    with pytest.raises(ConnectionError):
+        sync.incremental_sync()
+
+    assert sync.df is df_anterior
+    assert sync.last_sync == last_sync
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+"""
+Testes para timing.py
+"""
+import pytest
+from src.core.timing import StageHistogram, StageTimings, stage_timings, timed
+from src.core.logger import log_api_call
+
+
+def test_histogram_resumo_e_percentis():
+    """Testa contagem, média e percentis estimados pelas faixas"""
+    hist = StageHistogram([10, 100, 1000])
+    for ms in [5, 8, 50, 60, 70, 80, 90, 95, 99, 2000]:
+        hist.add(ms)
+
+    resumo = hist.summary()
+
+    assert hist.counts == [2, 7, 0, 1]
+    assert resumo['count'] == 10
+    assert resumo['mean_ms'] == pytest.approx(255.7)
+    assert resumo['p50_ms'] == 100
+    assert resumo['p95_ms'] == 2000
+    assert resumo['max_ms'] == 2000
+    assert StageHistogram().summary()['p95_ms'] == 0.0
+
+
+def test_stage_timings_sessao_e_agregado():
+    """Testa o detalhamento da execução, o histograma da sessão e o agregado"""
+    timings = StageTimings(max_sessions=2)
+    timings.start_run("s1")
+    timings.record("filtro", 5.0, "s1")
+    timings.record("gráficos", 20.0, "s1")
+    timings.record("gráficos", 10.0, "s1")
+    timings.record("api /login", 50.0)  # thread em segundo plano
+
+    assert timings.last_run("s1") == {"filtro": 5.0, "gráficos": 30.0}
+    assert timings.summary("s1")["gráficos"]["count"] == 2
+    assert "api /login" not in timings.summary("s1")
+    assert timings.summary()["api /login"]["count"] == 1
+
+    timings.start_run("s1")
+    assert timings.last_run("s1") == {}
+    assert timings.summary("s1")["filtro"]["count"] == 1
+
+
+def test_stage_timings_descarta_sessoes_antigas():
+    """Testa o limite de sessões mantidas em memória"""
+    timings = StageTimings(max_sessions=2)
+    for sessao in ["s1", "s2", "s3"]:
+        timings.record("filtro", 1.0, sessao)
+
+    assert timings.summary("s1") == {}
+    assert timings.summary("s3")["filtro"]["count"] == 1
+    assert timings.summary()["filtro"]["count"] == 3
+
+
+def test_timed_como_context_manager_e_decorator():
+    """Testa o registro da etapa, inclusive quando o bloco levanta exceção"""
+    stage_timings.reset()
+
+    @timed("decorada")
+    def etapa():
+        return 42
+
+    assert etapa() == 42
+    with pytest.raises(ValueError):
+        with timed("com erro"):
+            raise ValueError("falhou")
+
+    resumo = stage_timings.summary()
+    assert resumo["decorada"]["count"] == 1
+    assert resumo["com erro"]["count"] == 1
+
+
+def test_log_api_call_registra_etapa():
+    """Testa que a chamada com duração entra no tempo por etapa"""
+    stage_timings.reset()
+
+    log_api_call("/login", True, duration=0.12)
+    log_api_call("/login", True)
+
+    resumo = stage_timings.summary()["api /login"]
+    assert resumo["count"] == 1
+    assert resumo["max_ms"] == pytest.approx(120.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
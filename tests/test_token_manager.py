@@ -0,0 +1,88 @@
+"""
+Testes para token_manager.py
+"""
+import threading
+import time
+import pytest
+from services.token_manager import TokenManager
+
+
+class FakeLogin:
+    """Login falso que conta as chamadas"""
+
+    def __init__(self, token="tok", delay=0.0):
+        self.token = token
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"{self.token}{self.calls}" if self.token else None
+
+
+def test_get_token_faz_login_uma_vez():
+    """Testa que logins concorrentes são serializados"""
+    login = FakeLogin(delay=0.05)
+    manager = TokenManager(login, ttl_seconds=60, refresh_margin=1)
+    tokens = []
+
+    threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert login.calls == 1
+    assert set(tokens) == {"tok1"}
+
+
+def test_get_token_renova_em_segundo_plano_perto_de_expirar():
+    """Testa que um token perto de expirar é usado enquanto renova"""
+    login = FakeLogin(delay=0.05)
+    manager = TokenManager(login, ttl_seconds=60, refresh_margin=30)
+    manager.set_token("antigo", ttl_seconds=10)
+
+    inicio = time.time()
+    assert manager.get_token() == "antigo"
+    assert time.time() - inicio < 0.05
+
+    manager._background.join()
+    assert manager.get_token() == "tok1"
+
+
+def test_get_token_expirado_renova_imediatamente():
+    """Testa que token expirado exige login antes de responder"""
+    login = FakeLogin()
+    manager = TokenManager(login, ttl_seconds=60, refresh_margin=1)
+    manager.set_token("antigo", ttl_seconds=-1)
+
+    assert manager.get_token() == "tok1"
+
+
+def test_login_invalido_retorna_none():
+    """Testa falha na autenticação"""
+    manager = TokenManager(FakeLogin(token=None), ttl_seconds=60)
+    assert manager.get_token() is None
+    assert not manager.refresh()
+
+
+def test_renovacao_agendada_so_com_uso():
+    """Testa que o servidor ocioso não renova o token indefinidamente"""
+    login = FakeLogin()
+    manager = TokenManager(login, ttl_seconds=0.2, refresh_margin=0.1)
+
+    assert manager.refresh()
+    time.sleep(0.3)
+    assert login.calls == 1  # sem uso desde o login: nada de renovação
+
+    assert manager.get_token() == "tok2"  # expirado: renova sob demanda
+    manager.get_token()  # uso do token atual
+    time.sleep(0.15)
+    if manager._background is not None:
+        manager._background.join()
+    assert login.calls == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
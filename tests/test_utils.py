@@ -1,14 +1,20 @@
 """
 Testes unitários para utils.py
 """
+import os
 import pytest
 import pandas as pd
 from datetime import datetime
-from utils import (
+from src.core.utils import (
     format_date_br,
     format_number,
     safe_get_column_values,
-    remove_null_values
+    remove_null_values,
+    detect_date_format,
+    parse_wms_dates,
+    ensure_datetime,
+    get_base64_image,
+    get_image_url
 )
 
 
@@ -52,5 +58,58 @@ def test_remove_null_values():
     assert list(result['col']) == ['A', 'B']
 
 
+def test_detect_date_format():
+    """Testa detecção do formato das datas da API"""
+    assert detect_date_format(['15.08.2025 11:00:00', '', None]) == "%d.%m.%Y %H:%M:%S"
+    assert detect_date_format(['15.08.2025', '01.02.2025']) == "%d.%m.%Y"
+    assert detect_date_format(['', None]) is None
+
+
+def test_parse_wms_dates():
+    """Testa conversão com formato explícito, repetições e valores inválidos"""
+    serie = pd.Series(['15.08.2025 11:00:00', '15.08.2025 11:00:00', None, '', '01.02.2025', 'lixo'])
+    
+    result = parse_wms_dates(serie)
+    
+    assert list(result) == [
+        pd.Timestamp(2025, 8, 15, 11), pd.Timestamp(2025, 8, 15, 11),
+        pd.NaT, pd.NaT, pd.Timestamp(2025, 2, 1), pd.NaT
+    ]
+    assert result.index.equals(serie.index)
+
+
+def test_ensure_datetime_nao_reconverte():
+    """Testa que colunas já em datetime são retornadas sem conversão"""
+    datas = pd.Series(pd.to_datetime(['2025-01-15']))
+    assert ensure_datetime(datas) is datas
+
+
+def test_get_base64_image_memoiza_por_mtime(tmp_path):
+    """Testa que a imagem só é relida quando o arquivo muda"""
+    imagem = tmp_path / "fundo.png"
+    imagem.write_bytes(b"abc")
+    assert get_base64_image(str(imagem)) == "YWJj"
+    
+    imagem.write_bytes(b"xyz")
+    os.utime(imagem, ns=(0, 10**9))
+    assert get_base64_image(str(imagem)) == "eHl6"
+    assert get_base64_image(str(tmp_path / "inexistente.png")) == ""
+
+
+def test_get_image_url(tmp_path, monkeypatch):
+    """Testa data URI e URL de arquivo estático"""
+    imagem = tmp_path / "fundo.png"
+    imagem.write_bytes(b"abc")
+    monkeypatch.chdir(tmp_path)
+    
+    assert get_image_url(str(imagem)) == "data:image/png;base64,YWJj"
+    # Sem o arquivo em static/, volta para o data URI
+    assert get_image_url(str(imagem), serve_static=True) == "data:image/png;base64,YWJj"
+    
+    (tmp_path / "static").mkdir()
+    (tmp_path / "static" / "fundo.png").write_bytes(b"abc")
+    assert get_image_url(str(imagem), serve_static=True) == "app/static/fundo.png"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
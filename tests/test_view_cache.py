@@ -0,0 +1,34 @@
+"""
+Testes para view_cache.py
+"""
+import pytest
+from services.view_cache import cached_view, get_view_cache
+
+
+def test_cached_view_constroi_uma_vez_por_chave():
+    """Testa memoização por (chave do filtro, nome)"""
+    get_view_cache().invalidate()
+    construcoes = []
+
+    def _builder():
+        construcoes.append(1)
+        return object()
+
+    primeira = cached_view((1, ('status', None)), ('pie', 'Status'), _builder)
+    segunda = cached_view((1, ('status', None)), ('pie', 'Status'), _builder)
+    cached_view((2, ('status', None)), ('pie', 'Status'), _builder)
+
+    assert primeira is segunda
+    assert len(construcoes) == 2
+
+
+def test_cached_view_sem_chave_nao_cacheia():
+    """Testa que cache_key None sempre constrói"""
+    construcoes = []
+    cached_view(None, 'fig', lambda: construcoes.append(1))
+    cached_view(None, 'fig', lambda: construcoes.append(1))
+    assert len(construcoes) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])